@@ -0,0 +1,30 @@
+"""
+Shared fixtures for Zenith integration tests.
+"""
+
+import httpx
+import pytest_asyncio
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def raw_client_factory():
+    """
+    Return one lifespan-free HTTP client per app, shared across the module.
+
+    The clients talk to the app over httpx's ASGI transport without running
+    startup or shutdown, so use them only for apps that need no lifespan hooks.
+    Tests using this fixture must run on the module event loop.
+    """
+    clients: dict[int, httpx.AsyncClient] = {}
+
+    async def make(app) -> httpx.AsyncClient:
+        if id(app) not in clients:
+            clients[id(app)] = httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://testserver"
+            )
+        return clients[id(app)]
+
+    yield make
+
+    for client in clients.values():
+        await client.aclose()
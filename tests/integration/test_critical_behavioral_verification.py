@@ -7,78 +7,96 @@ in real-world scenarios to prevent regressions like those found in v0.0.1.
 These are HIGH-PRIORITY tests that should always pass.
 """
 
-import asyncio
-
 import pytest
+import pytest_asyncio
 
 from zenith import Zenith
-from zenith.middleware.rate_limit import RateLimit, RateLimitMiddleware
+from zenith.core import Config
+from zenith.middleware.rate_limit import (
+    MemoryRateLimitStorage,
+    RateLimit,
+    RateLimitMiddleware,
+)
 from zenith.testing import TestClient
 
+# One event loop for the module so the module-scoped clients below can be shared
+pytestmark = pytest.mark.asyncio(loop_scope="module")
 
-class TestCriticalBehavior:
-    """Critical behavior verification tests."""
+TEST_SECRET_KEY = "test-secret-key-32-characters-long"
 
-    @pytest.mark.asyncio
-    async def test_jwt_authentication_end_to_end(self):
-        """Test complete JWT authentication flow works end-to-end."""
-        from zenith.core import Config
 
-        config = Config(debug=True)
-        config.secret_key = "test-secret-key-32-characters-long"
-        app = Zenith(config=config)
-        app.add_auth()
+def _replace_rate_limiter(app: Zenith, limits: list[RateLimit], **kwargs) -> None:
+    """Install a rate limiter with fresh in-memory storage, replacing any existing one."""
+    # add_middleware replaces a same-class entry in place, so no filtering needed
+    app.add_middleware(
+        RateLimitMiddleware,
+        default_limits=limits,
+        storage=MemoryRateLimitStorage(),
+        **kwargs,
+    )
 
-        # Add a protected endpoint
-        @app.get("/protected")
-        async def protected_endpoint():
-            # This should automatically get the authenticated user
-            from zenith.auth.dependencies import require_auth
 
-            user = require_auth(app.request)  # This would be injected in real scenario
-            return {"message": "success", "user_id": user["id"]}
+def _make_jwt_app(**auth_kwargs) -> Zenith:
+    """Build a debug app with JWT auth configured."""
+    config = Config(debug=True)
+    config.secret_key = TEST_SECRET_KEY
+    app = Zenith(config=config)
+    app.add_auth(**auth_kwargs)
+    return app
 
-        async with TestClient(app) as client:
-            # Step 1: Login to get token (using demo credentials in dev mode)
-            login_response = await client.post(
-                "/auth/login", json={"username": "demo", "password": "demo"}
-            )
-            assert login_response.status_code == 200
 
-            token_data = login_response.json()
-            assert "access_token" in token_data
-            assert "token_type" in token_data
-            assert "expires_in" in token_data  # OAuth2 compliance
-            assert token_data["token_type"] == "bearer"
-            assert isinstance(token_data["expires_in"], int)
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def jwt_client():
+    """Client for an app with default JWT auth, started once per module."""
+    async with TestClient(_make_jwt_app()) as client:
+        yield client
 
-            token = token_data["access_token"]
 
-            # Step 2: Access protected endpoint with token should work
-            # Note: In a real test, we'd need to properly set up the auth dependency injection
-            # For now, we're testing that tokens can be generated and are valid
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def jwt_client_45_minutes():
+    """Client for an app whose tokens expire after 45 minutes."""
+    async with TestClient(_make_jwt_app(expire_minutes=45)) as client:
+        yield client
 
-            # Verify token is valid by decoding it
-            from zenith.auth.jwt import extract_user_from_token
 
-            user_info = extract_user_from_token(token)
-            assert user_info is not None
-            assert user_info["id"] == 999  # Demo user ID
-            assert user_info["email"] == "demo@example.com"
+class TestCriticalBehavior:
+    """Critical behavior verification tests."""
+
+    async def test_jwt_authentication_end_to_end(self, jwt_client):
+        """Test complete JWT authentication flow works end-to-end."""
+        # Step 1: Login to get token (using demo credentials in dev mode)
+        login_response = await jwt_client.post(
+            "/auth/login", json={"username": "demo", "password": "demo"}
+        )
+        assert login_response.status_code == 200
+
+        token_data = login_response.json()
+        assert "access_token" in token_data
+        assert "token_type" in token_data
+        assert "expires_in" in token_data  # OAuth2 compliance
+        assert token_data["token_type"] == "bearer"
+        assert isinstance(token_data["expires_in"], int)
+
+        token = token_data["access_token"]
+
+        # Step 2: Access protected endpoint with token should work
+        # Note: In a real test, we'd need to properly set up the auth dependency injection
+        # For now, we're testing that tokens can be generated and are valid
+
+        # Verify token is valid by decoding it
+        from zenith.auth.jwt import extract_user_from_token
+
+        user_info = extract_user_from_token(token)
+        assert user_info is not None
+        assert user_info["id"] == 999  # Demo user ID
+        assert user_info["email"] == "demo@example.com"
 
-    @pytest.mark.asyncio
     async def test_rate_limiting_enforces_limits(self):
         """Test rate limiting actually blocks requests when limits are exceeded."""
         app = Zenith()
 
-        # Remove existing rate limiting middleware and add strict one
-        app.middleware = [m for m in app.middleware if m.cls != RateLimitMiddleware]
-
-        # Add very restrictive rate limiting: 2 requests per 60 seconds
-        app.add_middleware(
-            RateLimitMiddleware,
-            default_limits=[RateLimit(requests=2, window=60, per="ip")],
-        )
+        # Very restrictive rate limiting: 2 requests per 60 seconds
+        _replace_rate_limiter(app, [RateLimit(requests=2, window=60, per="ip")])
 
         @app.get("/test")
         async def test_endpoint():
@@ -105,18 +123,14 @@ class TestCriticalBehavior:
             assert error_data["window"] == 60
             assert error_data["current"] == 3
 
-    @pytest.mark.asyncio
     async def test_rate_limiting_localhost_not_exempt(self):
         """Verify that localhost is not automatically exempt from rate limiting."""
         app = Zenith()
 
-        # Remove existing rate limiting and add new one
-        app.middleware = [m for m in app.middleware if m.cls != RateLimitMiddleware]
-
-        # Add rate limiting with no exemptions
-        app.add_middleware(
-            RateLimitMiddleware,
-            default_limits=[RateLimit(requests=1, window=10, per="ip")],
+        # Rate limiting with no exemptions
+        _replace_rate_limiter(
+            app,
+            [RateLimit(requests=1, window=10, per="ip")],
             exempt_ips=[],  # Explicitly no exemptions
         )
 
@@ -137,52 +151,35 @@ class TestCriticalBehavior:
             error_data = response2.json()
             assert "rate_limit_exceeded" in error_data["error"]
 
-    @pytest.mark.asyncio
-    async def test_oauth2_compliance_fields(self):
+    async def test_oauth2_compliance_fields(self, jwt_client_45_minutes):
         """Test OAuth2 response includes all required fields per RFC 6749."""
-        from zenith.core import Config
-
-        config = Config(debug=True)
-        config.secret_key = "test-secret-key-32-characters-long"
-        app = Zenith(config=config)
-        app.add_auth(expire_minutes=45)  # Custom expiration
-
-        async with TestClient(app) as client:
-            response = await client.post(
-                "/auth/login", json={"username": "demo", "password": "demo"}
-            )
+        # jwt_client_45_minutes uses a custom expire_minutes=45
+        response = await jwt_client_45_minutes.post(
+            "/auth/login", json={"username": "demo", "password": "demo"}
+        )
 
-            assert response.status_code == 200
+        assert response.status_code == 200
 
-            data = response.json()
+        data = response.json()
 
-            # Required OAuth2 fields per RFC 6749
-            assert "access_token" in data
-            assert "token_type" in data
-            assert "expires_in" in data
+        # Required OAuth2 fields per RFC 6749
+        assert "access_token" in data
+        assert "token_type" in data
+        assert "expires_in" in data
 
-            # Verify correct values
-            assert data["token_type"] == "bearer"
-            assert data["expires_in"] == 45 * 60  # Convert minutes to seconds
-            assert isinstance(data["access_token"], str)
-            assert len(data["access_token"]) > 50  # JWT tokens are long
+        # Verify correct values
+        assert data["token_type"] == "bearer"
+        assert data["expires_in"] == 45 * 60  # Convert minutes to seconds
+        assert isinstance(data["access_token"], str)
+        assert len(data["access_token"]) > 50  # JWT tokens are long
 
-    @pytest.mark.asyncio
     async def test_all_fixes_together(self):
         """Integration test: All fixes working together in one app."""
-        from zenith.core import Config
-
-        config = Config(debug=True)
-        config.secret_key = "test-secret-key-32-characters-long"
-        app = Zenith(config=config)
-        app.add_auth()
+        # Own app: the rate limiter below must only count this test's requests
+        app = _make_jwt_app()
 
         # Add strict rate limiting
-        app.middleware = [m for m in app.middleware if m.cls != RateLimitMiddleware]
-        app.add_middleware(
-            RateLimitMiddleware,
-            default_limits=[RateLimit(requests=3, window=60, per="ip")],
-        )
+        _replace_rate_limiter(app, [RateLimit(requests=3, window=60, per="ip")])
 
         @app.get("/protected")
         async def protected_endpoint():
@@ -223,7 +220,6 @@ class TestCriticalBehavior:
             error_data = rate_limited_response.json()
             assert "rate_limit_exceeded" in error_data["error"]
 
-    @pytest.mark.asyncio
     async def test_cache_performance_still_works(self):
         """Verify cache performance wasn't broken by our fixes."""
         app = Zenith()
@@ -234,8 +230,6 @@ class TestCriticalBehavior:
         async def cached_endpoint():
             nonlocal call_count
             call_count += 1
-            # Simulate expensive operation
-            await asyncio.sleep(0.001)  # 1ms delay
             return {
                 "result": f"expensive_computation_{call_count}",
                 "call_count": call_count,
@@ -248,9 +242,11 @@ class TestCriticalBehavior:
             data1 = response1.json()
             assert data1["call_count"] == 1
 
-            # Without caching, second call would increment counter
-            # This test confirms caching still works as designed
-            # (Note: This doesn't test actual caching since we'd need to add @cache decorator)
+            # Without a @cache decorator every call reaches the handler exactly once
+            response2 = await client.get("/cached")
+            assert response2.status_code == 200
+            assert response2.json()["call_count"] == 2
+            assert call_count == 2
 
 
 if __name__ == "__main__":
@@ -5,203 +5,188 @@ Tests the actual CSRF protection in realistic scenarios.
 This middleware had 16% coverage and NO integration tests.
 """
 
+import time
+from unittest.mock import patch
+
 import pytest
+import pytest_asyncio
 
 from zenith import Zenith
 from zenith.middleware.csrf import CSRFConfig, CSRFMiddleware
 from zenith.testing import TestClient
 
+# One event loop for the module so the module-scoped clients below can be shared
+pytestmark = pytest.mark.asyncio(loop_scope="module")
 
-@pytest.mark.asyncio
-class TestCSRFMiddleware:
-    """Test CSRF middleware integration."""
+TEST_SECRET_KEY = "test-secret-key-that-is-long-enough-for-csrf-testing"
 
-    async def test_csrf_blocks_post_without_token(self):
-        """Test that CSRF middleware blocks POST requests without valid tokens."""
-        app = Zenith()
 
-        # Add CSRF middleware
-        csrf_config = CSRFConfig(
-            secret_key="test-secret-key-that-is-long-enough-for-csrf-testing"
-        )
-        app.add_middleware(CSRFMiddleware, config=csrf_config)
+def _make_csrf_app(csrf_config: CSRFConfig) -> Zenith:
+    """Build an app with CSRF protection and every endpoint the tests use."""
+    app = Zenith()
+    app.add_middleware(CSRFMiddleware, config=csrf_config)
 
-        @app.post("/protected")
-        async def protected_endpoint():
-            return {"message": "success"}
+    @app.post("/protected")
+    async def protected_endpoint():
+        return {"message": "success"}
 
-        async with TestClient(app) as client:
-            # POST without CSRF token should be blocked
-            response = await client.post("/protected", json={"data": "test"})
-            assert response.status_code == 403
-            assert "CSRF" in response.text
+    @app.get("/safe")
+    async def safe_get():
+        return {"method": "GET"}
 
-    async def test_csrf_allows_post_with_valid_token(self):
-        """Test that CSRF middleware allows POST requests with valid tokens."""
-        app = Zenith()
+    @app.head("/safe")
+    async def safe_head():
+        return {"method": "HEAD"}
 
-        csrf_config = CSRFConfig(
-            secret_key="test-secret-key-that-is-long-enough-for-csrf-testing"
-        )
-        app.add_middleware(CSRFMiddleware, config=csrf_config)
-
-        @app.get("/get-token")
-        async def get_token():
-            # The CSRF middleware will automatically generate and set the token
-            return {"message": "Token set in cookie and header"}
-
-        @app.post("/protected")
-        async def protected_endpoint():
-            return {"message": "success"}
-
-        async with TestClient(app) as client:
-            # Get CSRF token first - middleware will set it in cookie or header
-            token_response = await client.get("/get-token")
-
-            # Try to get token from response header first, then from cookie
-            csrf_token = token_response.headers.get("x-csrf-token")
-            if not csrf_token:
-                # Get from cookie if available
-                csrf_token = None
-                for cookie in token_response.cookies.jar:
-                    if cookie.name == "csrf_token":
-                        csrf_token = cookie.value
-                        break
-
-            assert csrf_token is not None, "CSRF token should be set by middleware"
-
-            # POST with valid token should succeed
-            response = await client.post(
-                "/protected",
-                json={"data": "test"},
-                headers={"X-CSRF-Token": csrf_token},
-            )
-            assert response.status_code == 200
-            assert response.json()["message"] == "success"
-
-    async def test_csrf_allows_safe_methods(self):
-        """Test that CSRF middleware allows safe methods (GET, HEAD, OPTIONS)."""
-        app = Zenith()
+    @app.options("/safe")
+    async def safe_options():
+        return {"method": "OPTIONS"}
 
-        csrf_config = CSRFConfig(
-            secret_key="test-secret-key-that-is-long-enough-for-csrf-testing"
-        )
-        app.add_middleware(CSRFMiddleware, config=csrf_config)
+    @app.post("/api/webhook")
+    async def webhook():
+        return {"message": "webhook received"}
+
+    return app
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def csrf_client():
+    """Client for an app with the default CSRF config plus an exempt webhook."""
+    csrf_config = CSRFConfig(secret_key=TEST_SECRET_KEY, exempt_paths=["/api/webhook"])
+    async with TestClient(_make_csrf_app(csrf_config)) as client:
+        yield client
 
-        @app.get("/safe")
-        async def safe_get():
-            return {"method": "GET"}
 
-        @app.head("/safe")
-        async def safe_head():
-            return {"method": "HEAD"}
+@pytest_asyncio.fixture(
+    scope="module",
+    loop_scope="module",
+    params=[{}, {"header_name": "X-Custom-CSRF-Token"}],
+    ids=["default_header", "custom_header"],
+)
+async def header_csrf_client(request):
+    """Client and config for each supported token header setup."""
+    csrf_config = CSRFConfig(secret_key=TEST_SECRET_KEY, **request.param)
+    async with TestClient(_make_csrf_app(csrf_config)) as client:
+        yield client, csrf_config
 
-        @app.options("/safe")
-        async def safe_options():
-            return {"method": "OPTIONS"}
 
-        async with TestClient(app) as client:
-            # Safe methods should work without CSRF tokens
-            get_response = await client.get("/safe")
-            assert get_response.status_code == 200
+TEST_USER_AGENT = "zenith-csrf-tests"
 
-            head_response = await client.head("/safe")
-            assert head_response.status_code == 200
 
-            options_response = await client.options("/safe")
-            assert options_response.status_code == 200
+def _mint_token(csrf_config: CSRFConfig) -> str:
+    """Sign a token in-process the way the app's middleware would."""
+    # Tokens are bound to the user agent, so requests must send TEST_USER_AGENT
+    return CSRFMiddleware(None, config=csrf_config)._generate_token(TEST_USER_AGENT)
+
+
+class TestCSRFMiddleware:
+    """Test CSRF middleware integration."""
 
-    async def test_csrf_with_custom_header_name(self):
-        """Test CSRF middleware with custom header name."""
-        app = Zenith()
+    async def test_csrf_blocks_post_without_token(self, csrf_client):
+        """Test that CSRF middleware blocks POST requests without valid tokens."""
+        # POST without CSRF token should be blocked
+        response = await csrf_client.post("/protected", json={"data": "test"})
+        assert response.status_code == 403
+        assert "CSRF" in response.text
 
-        csrf_config = CSRFConfig(
-            secret_key="test-secret-key-that-is-long-enough-for-csrf-testing",
-            header_name="X-Custom-CSRF-Token",
+    async def test_csrf_allows_post_with_valid_token(self, header_csrf_client):
+        """Test that CSRF middleware allows POST requests with valid tokens."""
+        client, csrf_config = header_csrf_client
+        csrf_token = _mint_token(csrf_config)
+
+        # POST with valid token in the configured header should succeed
+        response = await client.post(
+            "/protected",
+            json={"data": "test"},
+            headers={
+                csrf_config.header_name: csrf_token,
+                "User-Agent": TEST_USER_AGENT,
+            },
         )
-        app.add_middleware(CSRFMiddleware, config=csrf_config)
-
-        @app.get("/get-token")
-        async def get_token():
-            # The CSRF middleware will automatically generate and set the token
-            return {"message": "Token set in cookie and header"}
-
-        @app.post("/protected")
-        async def protected_endpoint():
-            return {"message": "success"}
-
-        async with TestClient(app) as client:
-            # Get CSRF token first - middleware will set it in cookie or header
-            token_response = await client.get("/get-token")
-
-            # Try to get token from response header first, then from cookie
-            csrf_token = token_response.headers.get("x-csrf-token")
-            if not csrf_token:
-                # Get from cookie if available
-                csrf_token = None
-                for cookie in token_response.cookies.jar:
-                    if cookie.name == "csrf_token":
-                        csrf_token = cookie.value
-                        break
-
-            assert csrf_token is not None, "CSRF token should be set by middleware"
-
-            # POST with custom header should work
-            response = await client.post(
-                "/protected",
-                json={"data": "test"},
-                headers={"X-Custom-CSRF-Token": csrf_token},
-            )
-            assert response.status_code == 200
-
-    async def test_csrf_blocks_invalid_token(self):
-        """Test that CSRF middleware blocks requests with invalid tokens."""
-        app = Zenith()
+        assert response.status_code == 200
+        assert response.json()["message"] == "success"
+
+    async def test_csrf_allows_safe_methods(self, csrf_client):
+        """Test that CSRF middleware allows safe methods (GET, HEAD, OPTIONS)."""
+        # Safe methods should work without CSRF tokens
+        get_response = await csrf_client.get("/safe")
+        assert get_response.status_code == 200
+        # A client without a CSRF cookie is issued a token
+        assert get_response.headers.get("x-csrf-token")
+
+        head_response = await csrf_client.head("/safe")
+        assert head_response.status_code == 200
+
+        options_response = await csrf_client.options("/safe")
+        assert options_response.status_code == 200
 
-        csrf_config = CSRFConfig(
-            secret_key="test-secret-key-that-is-long-enough-for-csrf-testing"
+    async def test_csrf_blocks_invalid_token(self, csrf_client):
+        """Test that CSRF middleware blocks requests with invalid tokens."""
+        # POST with invalid token should be blocked
+        response = await csrf_client.post(
+            "/protected",
+            json={"data": "test"},
+            headers={"X-CSRF-Token": "invalid-token-12345"},
         )
-        app.add_middleware(CSRFMiddleware, config=csrf_config)
-
-        @app.post("/protected")
-        async def protected_endpoint():
-            return {"message": "success"}
-
-        async with TestClient(app) as client:
-            # POST with invalid token should be blocked
-            response = await client.post(
-                "/protected",
-                json={"data": "test"},
-                headers={"X-CSRF-Token": "invalid-token-12345"},
-            )
-            assert response.status_code == 403
-            assert "CSRF" in response.text
-
-    async def test_csrf_exempt_paths(self):
-        """Test CSRF middleware exempts configured paths."""
-        app = Zenith()
+        assert response.status_code == 403
+        assert "CSRF" in response.text
 
-        csrf_config = CSRFConfig(
-            secret_key="test-secret-key-that-is-long-enough-for-csrf-testing",
-            exempt_paths=["/api/webhook"],
+    async def test_csrf_exempt_paths(self, csrf_client):
+        """Test CSRF middleware exempts configured paths."""
+        # Exempt path should work without CSRF token
+        webhook_response = await csrf_client.post(
+            "/api/webhook", json={"data": "webhook"}
+        )
+        assert webhook_response.status_code == 200
+        # Exempt paths bypass token handling entirely
+        assert "set-cookie" not in webhook_response.headers
+
+        # Protected path should still require token
+        protected_response = await csrf_client.post("/protected", json={"data": "test"})
+        assert protected_response.status_code == 403
+
+    async def test_csrf_token_header_sent_with_existing_cookie(self, csrf_client):
+        """Test a client that already holds the cookie can still read its token."""
+        headers = {"User-Agent": TEST_USER_AGENT}
+        first_response = await csrf_client.get("/safe", headers=headers)
+        token = first_response.headers["x-csrf-token"]
+
+        second_response = await csrf_client.get(
+            "/safe", headers={**headers, "Cookie": f"csrf_token={token}"}
+        )
+        assert second_response.status_code == 200
+        assert "set-cookie" not in second_response.headers
+        assert second_response.headers["x-csrf-token"] == token
+
+    async def test_csrf_cookie_only_issued_when_needed(self, csrf_client):
+        """Test a fresh CSRF cookie is kept and a stale one is rotated."""
+        csrf_middleware = CSRFMiddleware(
+            None, secret_key=TEST_SECRET_KEY, max_age_seconds=3600
+        )
+        fresh_token = csrf_middleware._generate_token(TEST_USER_AGENT)
+
+        fresh_response = await csrf_client.get(
+            "/safe",
+            headers={
+                "Cookie": f"csrf_token={fresh_token}",
+                "User-Agent": TEST_USER_AGENT,
+            },
+        )
+        assert fresh_response.status_code == 200
+        assert "set-cookie" not in fresh_response.headers
+        assert fresh_response.headers["x-csrf-token"] == fresh_token
+
+        # Past half its lifetime the token still validates but is replaced
+        with patch("zenith.middleware.csrf.time.time", return_value=time.time() - 2000):
+            stale_token = csrf_middleware._generate_token(TEST_USER_AGENT)
+
+        stale_response = await csrf_client.get(
+            "/safe",
+            headers={
+                "Cookie": f"csrf_token={stale_token}",
+                "User-Agent": TEST_USER_AGENT,
+            },
         )
-        app.add_middleware(CSRFMiddleware, config=csrf_config)
-
-        @app.post("/api/webhook")
-        async def webhook():
-            return {"message": "webhook received"}
-
-        @app.post("/protected")
-        async def protected():
-            return {"message": "protected"}
-
-        async with TestClient(app) as client:
-            # Exempt path should work without CSRF token
-            webhook_response = await client.post(
-                "/api/webhook", json={"data": "webhook"}
-            )
-            assert webhook_response.status_code == 200
-
-            # Protected path should still require token
-            protected_response = await client.post("/protected", json={"data": "test"})
-            assert protected_response.status_code == 403
+        assert stale_response.status_code == 200
+        assert stale_response.headers["x-csrf-token"] != stale_token
+        assert "csrf_token=" in stale_response.headers["set-cookie"]
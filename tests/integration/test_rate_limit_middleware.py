@@ -7,17 +7,19 @@ This middleware had 51% coverage but lacked integration tests.
 
 import asyncio
 import time
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from starlette.middleware.base import BaseHTTPMiddleware
 
 from zenith import Zenith
 from zenith.middleware.rate_limit import (
+    LimitScope,
     MemoryRateLimitStorage,
     RateLimit,
     RateLimitConfig,
     RateLimitMiddleware,
+    RateLimitStorage,
     RedisRateLimitStorage,
     create_rate_limiter,
     create_redis_rate_limiter,
@@ -33,9 +35,6 @@ class TestRateLimitMiddleware:
         """Test basic per-IP rate limiting."""
         app = Zenith()
 
-        # Remove auto-added rate limiting middleware to avoid conflicts
-        app.middleware = [m for m in app.middleware if m.cls != RateLimitMiddleware]
-
         # Very restrictive limit for testing
         rate_limits = [
             RateLimit(requests=2, window=60, per="ip")
@@ -75,9 +74,6 @@ class TestRateLimitMiddleware:
         """Test rate limit window expiration."""
         app = Zenith()
 
-        # Remove auto-added rate limiting middleware to avoid conflicts
-        app.middleware = [m for m in app.middleware if m.cls != RateLimitMiddleware]
-
         # Short window for testing
         rate_limits = [
             RateLimit(requests=1, window=1, per="ip")
@@ -112,9 +108,6 @@ class TestRateLimitMiddleware:
         """Test multiple rate limits with different windows."""
         app = Zenith()
 
-        # Remove auto-added rate limiting middleware to avoid conflicts
-        app.middleware = [m for m in app.middleware if m.cls != RateLimitMiddleware]
-
         # Multiple limits: 2 per second, 5 per minute
         rate_limits = [
             RateLimit(requests=2, window=1, per="ip"),  # 2/second
@@ -150,9 +143,6 @@ class TestRateLimitMiddleware:
         """Test exempting specific paths from rate limiting."""
         app = Zenith()
 
-        # Remove auto-added rate limiting middleware to avoid conflicts
-        app.middleware = [m for m in app.middleware if m.cls != RateLimitMiddleware]
-
         rate_limits = [RateLimit(requests=1, window=60, per="ip")]
         app.add_middleware(
             RateLimitMiddleware,
@@ -196,8 +186,6 @@ class TestRateLimitMiddleware:
         app = Zenith()
 
         rate_limits = [RateLimit(requests=1, window=60, per="ip")]
-        # Remove auto-added rate limiting middleware to avoid conflicts
-        app.middleware = [m for m in app.middleware if m.cls != RateLimitMiddleware]
         rate_limit_config = RateLimitConfig(
             default_limits=rate_limits,
             exempt_ips=["127.0.0.1", "::1", "192.168.1.100"],  # Include test client IP
@@ -234,8 +222,6 @@ class TestRateLimitMiddleware:
         app.add_middleware(BaseHTTPMiddleware, dispatch=mock_auth_middleware)
 
         rate_limits = [RateLimit(requests=2, window=60, per="user")]
-        # Remove auto-added rate limiting middleware to avoid conflicts
-        app.middleware = [m for m in app.middleware if m.cls != RateLimitMiddleware]
         rate_limit_config = RateLimitConfig(
             default_limits=rate_limits, exempt_ips=[]
         )  # Don't exempt localhost for testing
@@ -283,8 +269,6 @@ class TestRateLimitMiddleware:
         app = Zenith()
 
         rate_limits = [RateLimit(requests=2, window=60, per="endpoint")]
-        # Remove auto-added rate limiting middleware to avoid conflicts
-        app.middleware = [m for m in app.middleware if m.cls != RateLimitMiddleware]
         rate_limit_config = RateLimitConfig(default_limits=rate_limits, exempt_ips=[])
         app.add_middleware(RateLimitMiddleware, config=rate_limit_config)
 
@@ -323,8 +307,6 @@ class TestRateLimitMiddleware:
 
         # Default limit
         default_limits = [RateLimit(requests=10, window=60, per="ip")]
-        # Remove auto-added rate limiting middleware to avoid conflicts
-        app.middleware = [m for m in app.middleware if m.cls != RateLimitMiddleware]
         rate_limit_config = RateLimitConfig(
             default_limits=default_limits, exempt_ips=[]
         )
@@ -369,9 +351,6 @@ class TestRateLimitMiddleware:
         """Test rate limit headers in responses."""
         app = Zenith()
 
-        # Remove auto-added rate limiting middleware to avoid conflicts
-        app.middleware = [m for m in app.middleware if m.cls != RateLimitMiddleware]
-
         rate_limits = [RateLimit(requests=5, window=60, per="ip")]
         app.add_middleware(
             RateLimitMiddleware,
@@ -397,13 +376,70 @@ class TestRateLimitMiddleware:
             assert response.headers["x-ratelimit-window"] == "60"
             assert int(response.headers["x-ratelimit-remaining"]) <= 5
 
+    async def test_rfc_rate_limit_header(self):
+        """Test the single draft-RFC RateLimit header replaces the legacy trio."""
+        app = Zenith()
+
+        rate_limits = [RateLimit(requests=2, window=60, per="ip")]
+        rate_limit_config = RateLimitConfig(
+            default_limits=rate_limits, rfc_headers=True, exempt_ips=[]
+        )
+        app.add_middleware(RateLimitMiddleware, config=rate_limit_config)
+
+        @app.get("/api/rfc-headers")
+        async def rfc_headers():
+            return {"test": "rfc"}
+
+        async with TestClient(app) as client:
+            response = await client.get("/api/rfc-headers")
+            assert response.status_code == 200
+            assert response.headers["ratelimit"] == "limit=2, remaining=1, reset=60"
+            assert "x-ratelimit-limit" not in response.headers
+            assert "x-ratelimit-remaining" not in response.headers
+
+            await client.get("/api/rfc-headers")
+            response = await client.get("/api/rfc-headers")
+            assert response.status_code == 429
+            assert response.headers["ratelimit"] == "limit=2, remaining=0, reset=60"
+            assert response.headers["retry-after"] == "60"
+            assert "x-ratelimit-limit" not in response.headers
+
+    async def test_rfc_rate_limit_reset_counts_down(self):
+        """Test the RateLimit reset reports the time left in the window."""
+        with patch("zenith.middleware.rate_limit.time") as clock:
+            clock.monotonic.return_value = 1000.0
+
+            app = Zenith()
+            rate_limit_config = RateLimitConfig(
+                default_limits=[RateLimit(requests=2, window=60, per="ip")],
+                rfc_headers=True,
+                exempt_ips=[],
+            )
+            app.add_middleware(RateLimitMiddleware, config=rate_limit_config)
+
+            @app.get("/api/rfc-reset")
+            async def rfc_reset():
+                return {"test": "reset"}
+
+            async with TestClient(app) as client:
+                response = await client.get("/api/rfc-reset")
+                assert response.headers["ratelimit"] == "limit=2, remaining=1, reset=60"
+
+                clock.monotonic.return_value = 1025.0
+                response = await client.get("/api/rfc-reset")
+                assert response.headers["ratelimit"] == "limit=2, remaining=0, reset=35"
+
+                clock.monotonic.return_value = 1040.5
+                response = await client.get("/api/rfc-reset")
+                assert response.status_code == 429
+                assert response.headers["ratelimit"] == "limit=2, remaining=0, reset=20"
+                assert response.headers["retry-after"] == "20"
+
     async def test_rate_limit_headers_disabled(self):
         """Test disabling rate limit headers."""
         app = Zenith()
 
         rate_limits = [RateLimit(requests=5, window=60, per="ip")]
-        # Remove auto-added rate limiting middleware to avoid conflicts
-        app.middleware = [m for m in app.middleware if m.cls != RateLimitMiddleware]
         rate_limit_config = RateLimitConfig(
             default_limits=rate_limits, include_headers=False, exempt_ips=[]
         )
@@ -427,8 +463,6 @@ class TestRateLimitMiddleware:
         app = Zenith()
 
         rate_limits = [RateLimit(requests=1, window=60, per="ip")]
-        # Remove auto-added rate limiting middleware to avoid conflicts
-        app.middleware = [m for m in app.middleware if m.cls != RateLimitMiddleware]
         rate_limit_config = RateLimitConfig(
             default_limits=rate_limits,
             error_message="Too many requests! Please slow down.",
@@ -456,8 +490,6 @@ class TestRateLimitMiddleware:
         app = Zenith()
 
         rate_limits = [RateLimit(requests=1, window=60, per="ip")]
-        # Remove auto-added rate limiting middleware to avoid conflicts
-        app.middleware = [m for m in app.middleware if m.cls != RateLimitMiddleware]
         rate_limit_config = RateLimitConfig(default_limits=rate_limits, exempt_ips=[])
         app.add_middleware(RateLimitMiddleware, config=rate_limit_config)
 
@@ -484,8 +516,6 @@ class TestRateLimitMiddleware:
         app = Zenith()
 
         rate_limits = [RateLimit(requests=2, window=60, per="user")]
-        # Remove auto-added rate limiting middleware to avoid conflicts
-        app.middleware = [m for m in app.middleware if m.cls != RateLimitMiddleware]
         rate_limit_config = RateLimitConfig(
             default_limits=rate_limits, exempt_ips=[]
         )  # Don't exempt localhost for testing
@@ -573,21 +603,34 @@ class TestMemoryRateLimitStorage:
         assert count == 0
 
     async def test_memory_storage_cleanup(self):
-        """Test background cleanup of expired entries."""
+        """Test expired entries are swept once the cleanup interval passes."""
         # Short cleanup interval for testing
         storage = MemoryRateLimitStorage(cleanup_interval=1, max_entries=100)
+        start = time.monotonic()
 
         # Add entry that will expire quickly
-        await storage.increment("cleanup_key", window=1)
+        await storage.increment("cleanup_key", window=1, now=start)
 
-        # Wait for cleanup
-        await asyncio.sleep(2)
+        # The first increment after the interval sweeps expired entries
+        await storage.increment("other_key", window=60, now=start + 2)
 
         # Entry should be cleaned up
         assert "cleanup_key" not in storage._storage
+        assert "other_key" in storage._storage
+
+    async def test_memory_storage_samples_expired_entries(self):
+        """Test regular traffic evicts expired entries between full sweeps."""
+        storage = MemoryRateLimitStorage(cleanup_interval=3600, max_entries=1000)
+        start = time.monotonic()
+
+        for i in range(10):
+            await storage.increment(f"stale{i}", window=1, now=start)
+
+        # Enough increments to trigger one sample of the oldest entries
+        for _ in range(128):
+            await storage.increment("active", window=60, now=start + 2)
 
-        # Clean up the storage
-        storage.stop_cleanup()
+        assert list(storage._storage) == ["active"]
 
     async def test_memory_storage_max_entries(self):
         """Test max entries limit and size-based cleanup."""
@@ -606,6 +649,41 @@ class TestMemoryRateLimitStorage:
         # Should still be at max capacity or less
         assert len(storage._storage) <= 3
 
+    async def test_memory_storage_evicts_least_recently_used(self):
+        """Test a full storage evicts the key that was hit least recently."""
+        storage = MemoryRateLimitStorage(max_entries=3)
+
+        await storage.increment("key1", window=60)
+        await storage.increment("key2", window=60)
+        await storage.increment("key3", window=60)
+
+        # Hitting key1 again makes key2 the least recently used
+        await storage.increment("key1", window=60)
+        await storage.increment("key4", window=60)
+
+        assert list(storage._storage) == ["key3", "key1", "key4"]
+        assert await storage.get_count("key1") == 2
+
+    async def test_memory_storage_concurrent_increments(self):
+        """Test concurrent increments never lose or duplicate a count."""
+        storage = MemoryRateLimitStorage()
+
+        counts = await asyncio.gather(
+            *(storage.increment("shared", window=60) for _ in range(100))
+        )
+
+        assert sorted(counts) == list(range(1, 101))
+
+    async def test_memory_storage_increment_many(self):
+        """Test batched increments match individual ones."""
+        storage = MemoryRateLimitStorage()
+
+        await storage.increment("short", window=1)
+        counts = await storage.increment_many([("short", 1), ("long", 60)])
+
+        assert counts == [2, 1]
+        assert await storage.get_count("long") == 1
+
     async def test_storage_stats(self):
         """Test storage statistics."""
         storage = MemoryRateLimitStorage(max_entries=100)
@@ -646,8 +724,6 @@ class TestRedisRateLimitStorage:
 
         # Use mocked storage directly
         rate_limits = [RateLimit(requests=2, window=60, per="ip")]
-        # Remove auto-added rate limiting middleware to avoid conflicts
-        app.middleware = [m for m in app.middleware if m.cls != RateLimitMiddleware]
         rate_limit_config = RateLimitConfig(
             default_limits=rate_limits, storage=mock_storage, exempt_ips=[]
         )
@@ -664,6 +740,57 @@ class TestRedisRateLimitStorage:
             # Should have called Redis storage methods
             assert mock_storage.increment.called
 
+    async def test_redis_increment_uses_single_script_call(self):
+        """Test increment runs one Lua script call instead of a pipeline."""
+        mock_script = AsyncMock(side_effect=[1, 2])
+        mock_redis_client = MagicMock()
+        mock_redis_client.register_script.return_value = mock_script
+
+        storage = RedisRateLimitStorage(mock_redis_client)
+
+        assert await storage.increment("ip:1.2.3.4:60", window=60) == 1
+        assert await storage.increment("ip:1.2.3.4:60", window=60) == 2
+
+        # Script is registered once and called with the prefixed key
+        mock_redis_client.register_script.assert_called_once()
+        mock_script.assert_called_with(keys=["rate_limit:ip:1.2.3.4:60"], args=[60])
+        mock_redis_client.pipeline.assert_not_called()
+
+    async def test_redis_increment_many_uses_one_pipeline(self):
+        """Test several counters are incremented in a single pipeline."""
+        mock_pipeline = AsyncMock()
+        mock_pipeline.__aenter__.return_value = mock_pipeline
+        mock_pipeline.execute.return_value = [3, 1]
+        mock_script = AsyncMock()
+        mock_redis_client = MagicMock()
+        mock_redis_client.register_script.return_value = mock_script
+        mock_redis_client.pipeline.return_value = mock_pipeline
+
+        storage = RedisRateLimitStorage(mock_redis_client)
+        counts = await storage.increment_many([("a", 1), ("b", 60)])
+
+        assert counts == [3, 1]
+        mock_redis_client.pipeline.assert_called_once_with(transaction=False)
+        mock_pipeline.execute.assert_awaited_once()
+        mock_script.assert_any_call(
+            keys=["rate_limit:b"], args=[60], client=mock_pipeline
+        )
+
+    async def test_redis_usage_reads_count_and_ttl(self):
+        """Test the count and the window's remaining TTL share one pipeline."""
+        mock_pipeline = MagicMock()
+        mock_pipeline.__aenter__.return_value = mock_pipeline
+        mock_pipeline.execute = AsyncMock(side_effect=[[b"4", 12500], [None, -2]])
+        mock_redis_client = MagicMock()
+        mock_redis_client.pipeline.return_value = mock_pipeline
+
+        storage = RedisRateLimitStorage(mock_redis_client)
+
+        assert await storage._get_usage_at("a", 0.0) == (4, 12.5)
+        mock_pipeline.get.assert_called_with("rate_limit:a")
+        mock_pipeline.pttl.assert_called_with("rate_limit:a")
+        assert await storage._get_usage_at("missing", 0.0) == (0, None)
+
 
 @pytest.mark.asyncio
 class TestRateLimitConvenienceFunctions:
@@ -720,40 +847,60 @@ class TestRateLimitEdgeCases:
     """Test edge cases and error conditions."""
 
     async def test_unknown_rate_limit_type(self):
-        """Test error handling for unknown rate limit types."""
-        app = Zenith()
+        """Test unknown rate limit types are rejected when the limit is defined."""
+        with pytest.raises(ValueError, match="Unknown rate limit type: invalid_type"):
+            RateLimit(requests=10, window=60, per="invalid_type")
 
-        # Invalid rate limit type
-        invalid_limit = RateLimit(requests=10, window=60, per="invalid_type")
-        # Remove auto-added rate limiting middleware to avoid conflicts
-        app.middleware = [m for m in app.middleware if m.cls != RateLimitMiddleware]
-        rate_limit_config = RateLimitConfig(
-            default_limits=[invalid_limit], exempt_ips=[]
+    async def test_rate_limit_scope_accepts_enum(self):
+        """Test limits can be given a LimitScope as well as its name."""
+        limit = RateLimit(requests=10, window=60, per=LimitScope.USER)
+        assert limit.per == "user"
+        assert limit.limit_scope is LimitScope.USER
+        assert RateLimit(requests=10, window=60, per="endpoint").limit_scope == 2
+
+    async def test_custom_storage_with_documented_signatures(self):
+        """Test a storage implementing only get_count(key)/increment(key, window)."""
+
+        class DictStorage(RateLimitStorage):
+            def __init__(self):
+                self.counts = {}
+
+            async def get_count(self, key):
+                return self.counts.get(key, 0)
+
+            async def increment(self, key, window):
+                self.counts[key] = self.counts.get(key, 0) + 1
+                return self.counts[key]
+
+        app = Zenith()
+        app.add_middleware(
+            RateLimitMiddleware,
+            default_limits=[
+                RateLimit(requests=2, window=60, per="ip"),
+                RateLimit(requests=10, window=1, per="ip"),
+            ],
+            storage=DictStorage(),
+            exempt_ips=[],
         )
-        app.add_middleware(RateLimitMiddleware, config=rate_limit_config)
 
-        @app.get("/api/invalid-type")
-        async def invalid_type():
-            return {"test": True}
+        @app.get("/api/custom-storage")
+        async def custom_storage():
+            return {"ok": True}
 
         async with TestClient(app) as client:
-            # The ValueError is caught by exception middleware and returns 400
-            response = await client.get("/api/invalid-type")
-            assert response.status_code == 400
-            # Verify it was due to the unknown rate limit type
-            data = response.json()
-            assert data.get("error") == "ValueError"
-            assert "Unknown rate limit type" in data.get("details", {}).get(
-                "message", ""
-            )
+            response = await client.get("/api/custom-storage")
+            assert response.status_code == 200
+            assert response.headers["x-ratelimit-remaining"] == "1"
+
+            await client.get("/api/custom-storage")
+            response = await client.get("/api/custom-storage")
+            assert response.status_code == 429
 
     async def test_missing_user_fallback_to_ip(self):
         """Test fallback to IP when user not available for per-user limiting."""
         app = Zenith()
 
         rate_limits = [RateLimit(requests=1, window=60, per="user")]
-        # Remove auto-added rate limiting middleware to avoid conflicts
-        app.middleware = [m for m in app.middleware if m.cls != RateLimitMiddleware]
         rate_limit_config = RateLimitConfig(default_limits=rate_limits, exempt_ips=[])
         app.add_middleware(RateLimitMiddleware, config=rate_limit_config)
 
@@ -770,13 +917,86 @@ class TestRateLimitEdgeCases:
             response2 = await client.get("/api/user-fallback")
             assert response2.status_code == 429  # Rate limited by IP
 
+    async def test_concurrency_limit(self):
+        """Test per="concurrent" limits requests in flight, not per window."""
+        app = Zenith()
+
+        rate_limits = [RateLimit(requests=2, window=1, per="concurrent")]
+        app.add_middleware(
+            RateLimitMiddleware, default_limits=rate_limits, exempt_ips=[]
+        )
+
+        release = asyncio.Event()
+        started = 0
+
+        @app.get("/api/slow")
+        async def slow():
+            nonlocal started
+            started += 1
+            await release.wait()
+            return {"slow": True}
+
+        async with TestClient(app) as client:
+            tasks = [asyncio.create_task(client.get("/api/slow")) for _ in range(2)]
+            while started < 2:
+                await asyncio.sleep(0)
+
+            # Both slots are held, so a third request is rejected at once
+            response = await client.get("/api/slow")
+            assert response.status_code == 429
+            assert response.json()["current"] == 3
+
+            release.set()
+            responses = await asyncio.gather(*tasks)
+            assert [r.status_code for r in responses] == [200, 200]
+
+            # Slots are released with the responses, with no window to wait out
+            for _ in range(3):
+                response = await client.get("/api/slow")
+                assert response.status_code == 200
+
+    async def test_concurrency_rejection_keeps_window_quota(self):
+        """Test a concurrency 429 does not count against the window limits."""
+        app = Zenith()
+
+        rate_limits = [
+            RateLimit(requests=1, window=1, per="concurrent"),
+            RateLimit(requests=10, window=60, per="ip"),
+        ]
+        app.add_middleware(
+            RateLimitMiddleware, default_limits=rate_limits, exempt_ips=[]
+        )
+
+        release = asyncio.Event()
+        started = asyncio.Event()
+
+        @app.get("/api/slow")
+        async def slow():
+            started.set()
+            await release.wait()
+            return {"slow": True}
+
+        async with TestClient(app) as client:
+            task = asyncio.create_task(client.get("/api/slow"))
+            await started.wait()
+
+            # The only slot is held, so this request is rejected for concurrency
+            response = await client.get("/api/slow")
+            assert response.status_code == 429
+
+            release.set()
+            assert (await task).status_code == 200
+
+            # Only the two admitted requests used window quota
+            response = await client.get("/api/slow")
+            assert response.status_code == 200
+            assert response.headers["x-ratelimit-remaining"] == "8"
+
     async def test_concurrent_requests_race_condition(self):
         """Test concurrent requests don't cause race conditions."""
         app = Zenith()
 
         rate_limits = [RateLimit(requests=5, window=60, per="ip")]
-        # Remove auto-added rate limiting middleware to avoid conflicts
-        app.middleware = [m for m in app.middleware if m.cls != RateLimitMiddleware]
         rate_limit_config = RateLimitConfig(default_limits=rate_limits, exempt_ips=[])
         app.add_middleware(RateLimitMiddleware, config=rate_limit_config)
 
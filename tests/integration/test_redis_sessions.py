@@ -7,7 +7,7 @@ This component had 20% coverage and NO integration tests.
 
 import time
 from datetime import UTC, datetime, timedelta
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
@@ -64,6 +64,45 @@ class TestRedisSessionStore:
 
         await store.close()
 
+    @patch("redis.asyncio.from_url")
+    async def test_redis_session_save_many_uses_one_pipeline(self, mock_redis_from_url):
+        """Test bulk saves are queued on one pipeline and sent in one round trip."""
+        sessions = [
+            Session(
+                session_id=f"bulk{i}",
+                data={"user_id": i},
+                expires_at=datetime.now(UTC) + timedelta(hours=1),
+            )
+            for i in range(3)
+        ]
+        expired = Session(
+            session_id="stale",
+            data={},
+            expires_at=datetime.now(UTC) - timedelta(seconds=1),
+        )
+
+        # Pipeline commands are queued synchronously; only execute() awaits
+        pipe = MagicMock()
+        pipe.execute = AsyncMock(return_value=[True] * (len(sessions) + 1))
+        mock_redis = AsyncMock()
+        mock_redis.pipeline = MagicMock()
+        mock_redis.pipeline.return_value.__aenter__.return_value = pipe
+        mock_redis_from_url.return_value = mock_redis
+
+        store = RedisSessionStore("redis://localhost:6379/1")
+        await store.save_many([*sessions, expired])
+
+        mock_redis.pipeline.assert_called_once_with(transaction=False)
+        assert pipe.setex.call_count == len(sessions)
+        for call, session in zip(pipe.setex.call_args_list, sessions, strict=True):
+            assert call.args[0] == f"zenith:session:{session.session_id}"
+            assert call.args[1] > 0  # TTL > 0
+        pipe.delete.assert_called_once_with("zenith:session:stale")
+        pipe.execute.assert_awaited_once()
+        mock_redis.setex.assert_not_called()
+
+        await store.close()
+
     @patch("redis.asyncio.from_url")
     async def test_redis_session_health_check(self, mock_redis_from_url):
         """Test Redis session store health check."""
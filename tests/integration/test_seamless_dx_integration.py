@@ -8,22 +8,41 @@ Tests complete workflows of:
 - End-to-end Rails-like patterns
 """
 
-import builtins
 import contextlib
+import itertools
 import os
-import tempfile
 from datetime import datetime
-from pathlib import Path
-from unittest.mock import patch
 
 import pytest
+import pytest_asyncio
+from sqlalchemy import event
 from sqlmodel import Field
 
 from zenith import Auth, Session, Zenith
-from zenith.core import is_development
+from zenith.core import Config, is_development
 from zenith.db import ZenithModel
 from zenith.testing import TestClient
 
+# Each app gets a private in-memory SQLite database: aiosqlite serves
+# ":memory:" through a StaticPool, so every session of the app shares one
+# connection and nothing touches the disk
+IN_MEMORY_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+
+TEST_SECRET_KEY = "test-secret-key-32-characters-long"
+
+# Suffixes for unique test emails; unlike a millisecond timestamp, two
+# inserts in quick succession can never collide
+_uid = itertools.count(1)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def dx_environment():
+    """Set the zero-config environment once for the module, not per test."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("ZENITH_ENV", "development")
+        mp.setenv("SECRET_KEY", TEST_SECRET_KEY)
+        yield
+
 
 # Test models for integration testing
 class IntegrationUser(ZenithModel, table=True):
@@ -56,236 +75,217 @@ class TestZeroConfigIntegration:
 
     def test_zero_config_development_environment(self):
         """Test zero-config setup in development environment."""
-        with patch.dict(os.environ, {"ZENITH_ENV": "development"}, clear=False):
-            app = Zenith()
+        app = Zenith()
 
-            # Should auto-detect development
-            assert is_development() is True
+        # Should auto-detect development
+        assert is_development() is True
 
-            # Should have development defaults
-            assert app.config.debug is True
+        # Should have development defaults
+        assert app.config.debug is True
 
-            # Should work without explicit configuration
-            @app.get("/test")
-            async def test_route():
-                return {"env": "development", "auto_config": True}
+        # Should work without explicit configuration
+        @app.get("/test")
+        async def test_route():
+            return {"env": "development", "auto_config": True}
 
-            # Should be able to chain features
-            app.add_api("Test API")
+        # Should be able to chain features
+        app.add_api("Test API")
 
-    def test_zero_config_with_environment_variables(self):
+    def test_zero_config_with_environment_variables(self, tmp_path, monkeypatch):
         """Test zero-config respects environment variables."""
-        with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as tmp:
-            db_path = tmp.name
-
-        try:
-            with patch.dict(
-                os.environ,
-                {
-                    "DATABASE_URL": f"sqlite+aiosqlite:///{db_path}",
-                    "SECRET_KEY": "test-secret-key-32-characters-long",
-                },
-                clear=False,
-            ):
-                app = Zenith()
+        # tmp_path is unique per test, and so per xdist worker
+        db_path = tmp_path / "test.db"
+        monkeypatch.setenv("DATABASE_URL", f"sqlite+aiosqlite:///{db_path}")
 
-                # Should use provided database URL
-                assert app.app.database.url == f"sqlite+aiosqlite:///{db_path}"
+        app = Zenith()
 
-                # Should use provided secret key
-                assert app.config.secret_key == "test-secret-key-32-characters-long"
+        # Should use provided database URL
+        assert app.app.database.url == f"sqlite+aiosqlite:///{db_path}"
 
-        finally:
-            with contextlib.suppress(builtins.BaseException):
-                Path(db_path).unlink()
+        # Should use provided secret key
+        assert app.config.secret_key == TEST_SECRET_KEY
 
     def test_zero_config_one_liner_chaining(self):
         """Test zero-config with one-liner feature chaining."""
-        with patch.dict(
-            os.environ,
-            {"SECRET_KEY": "test-secret-key-32-characters-long"},
-            clear=False,
-        ):
-            app = (
-                Zenith()
-                .add_auth()
-                .add_admin("/dashboard")
-                .add_api("Chained API", "1.0.0")
-            )
+        app = (
+            Zenith().add_auth().add_admin("/dashboard").add_api("Chained API", "1.0.0")
+        )
 
-            # Should have auth routes
-            auth_routes = [r.path for r in app._app_router.routes]
-            assert "/auth/login" in auth_routes
+        # Should have auth routes
+        auth_routes = [r.path for r in app._app_router.routes]
+        assert "/auth/login" in auth_routes
 
-            # Should have admin routes
-            assert "/dashboard" in auth_routes
-            assert "/dashboard/health" in auth_routes
+        # Should have admin routes
+        assert "/dashboard" in auth_routes
+        assert "/dashboard/health" in auth_routes
 
-            # Should have API routes
-            assert "/api/info" in auth_routes
+        # Should have API routes
+        assert "/api/info" in auth_routes
 
 
-class TestSeamlessZenithModelIntegration:
-    """Test ZenithModel seamless integration with Zenith app."""
+# Route handlers shared by every app in this module, defined once at import
+async def _list_users():
+    # No manual session management needed!
+    users = await IntegrationUser.all()
+    return {"users": [user.model_dump() for user in users]}
 
-    @pytest.fixture
-    async def app_with_models(self):
-        """Create app with test models - single database with table truncation."""
-        # Use DATABASE_URL from environment (PostgreSQL in CI) or SQLite (local)
-        database_url = os.getenv(
-            "DATABASE_URL", "sqlite+aiosqlite:///test_seamless_dx.db"
-        )
 
-        app = Zenith(middleware=[])  # Minimal middleware for testing
-        app.config.database_url = database_url
+async def _create_user(user_data: dict):
+    # Seamless creation without session management
+    user = await IntegrationUser.create(**user_data)
+    return {"user": user.model_dump()}
 
-        # Create tables (idempotent - won't fail if already exist)
-        await app.app.database.create_all()
 
-        # Cleanup before test - remove any leftover data from previous runs
-        from sqlmodel import SQLModel
-
-        try:
-            async with app.app.database.engine.begin() as conn:
-                # Truncate tables in reverse order to handle foreign keys
-                for table in reversed(SQLModel.metadata.sorted_tables):
-                    await conn.execute(table.delete())
-        except Exception:
-            pass
-
-        yield app
-
-        # Cleanup after test - truncate all tables for test isolation
-        try:
-            async with app.app.database.engine.begin() as conn:
-                # Truncate tables in reverse order to handle foreign keys
-                for table in reversed(SQLModel.metadata.sorted_tables):
-                    await conn.execute(table.delete())
-        except Exception:
-            pass
-
-    async def test_zenith_model_automatic_session_management(self, app_with_models):
-        """Test ZenithModel automatically uses app's database sessions."""
-        app = app_with_models
-
-        @app.get("/users")
-        async def get_users():
-            # No manual session management needed!
-            users = await IntegrationUser.all()
-            return {"users": [user.model_dump() for user in users]}
-
-        @app.post("/users")
-        async def create_user(user_data: dict):
-            # Seamless creation without session management
-            user = await IntegrationUser.create(**user_data)
-            return {"user": user.model_dump()}
-
-        @app.get("/users/{user_id}")
-        async def get_user(user_id: int):
-            # Automatic 404 handling
-            user = await IntegrationUser.find_or_404(user_id)
-            return {"user": user.model_dump()}
-
-        # Test the integration with TestClient
-        async with TestClient(app) as client:
-            # Test creation with unique email
-            import time
+async def _get_active_users():
+    # Rails-like chainable queries (current working pattern)
+    query = IntegrationUser.where(active=True)
+    users = await query.order_by("-created_at").limit(10).all()
+    return {"users": [user.model_dump() for user in users]}
 
-            unique_email = f"test-{int(time.time() * 1000)}@example.com"
-            response = await client.post(
-                "/users", json={"name": "Test User", "email": unique_email}
-            )
-            assert response.status_code == 200
-            user_data = response.json()
-            assert user_data["user"]["name"] == "Test User"
 
-            # Test listing
-            response = await client.get("/users")
-            assert response.status_code == 200
-            users = response.json()["users"]
-            assert len(users) == 1
-            assert users[0]["name"] == "Test User"
+async def _get_user(user_id: int):
+    # Automatic 404 handling
+    user = await IntegrationUser.find_or_404(user_id)
+    return {"user": user.model_dump()}
 
-            # Test getting specific user
-            user_id = users[0]["id"]
-            response = await client.get(f"/users/{user_id}")
-            assert response.status_code == 200
-            assert response.json()["user"]["name"] == "Test User"
 
-    async def test_zenith_model_rails_like_queries(self, app_with_models):
-        """Test Rails-like query patterns work seamlessly."""
-        app = app_with_models
-
-        # Need to define a create_user endpoint for the test
-        @app.post("/users")
-        async def create_user(user_data: dict):
-            user = await IntegrationUser.create(**user_data)
-            return {"user": user.model_dump()}
-
-        @app.get("/users/active")
-        async def get_active_users():
-            # Rails-like chainable queries (current working pattern)
-            query = IntegrationUser.where(active=True)
-            users = await query.order_by("-created_at").limit(10).all()
-            return {"users": [user.model_dump() for user in users]}
-
-        @app.get("/stats")
-        async def get_stats():
-            # Rails-like aggregate queries
-            total_users = await IntegrationUser.count()
-            active_query = IntegrationUser.where(active=True)
-            active_users = await active_query.count()
-            return {"total_users": total_users, "active_users": active_users}
+async def _get_stats():
+    # Rails-like aggregate queries
+    total_users = await IntegrationUser.count()
+    active_query = IntegrationUser.where(active=True)
+    active_users = await active_query.count()
+    return {"total_users": total_users, "active_users": active_users}
 
-        async with TestClient(app) as client:
-            # Create test data with unique emails
-            import time
 
-            timestamp = int(time.time() * 1000)
-            response1 = await client.post(
-                "/users",
-                json={
-                    "name": "Active User",
-                    "email": f"active-{timestamp}@example.com",
-                    "active": True,
-                },
-            )
-            assert response1.status_code == 200, (
-                f"Failed to create active user: {response1.text}"
-            )
-            response2 = await client.post(
-                "/users",
-                json={
-                    "name": "Inactive User",
-                    "email": f"inactive-{timestamp}@example.com",
-                    "active": False,
-                },
-            )
-            assert response2.status_code == 200, (
-                f"Failed to create inactive user: {response2.text}"
-            )
+def _install_user_routes(app: Zenith) -> None:
+    """Register the IntegrationUser routes on an app."""
+    app.get("/users")(_list_users)
+    app.post("/users")(_create_user)
+    # Registered before /users/{user_id} so it isn't read as an ID
+    app.get("/users/active")(_get_active_users)
+    app.get("/users/{user_id}")(_get_user)
+    app.get("/stats")(_get_stats)
 
-            # Test Rails-like queries
-            response = await client.get("/users/active")
-            assert response.status_code == 200
-            active_users = response.json()["users"]
-            assert len(active_users) == 1
-            assert active_users[0]["name"] == "Active User"
 
-            # Test aggregate queries
-            response = await client.get("/stats")
-            assert response.status_code == 200
-            stats = response.json()
-            assert stats["total_users"] == 2
-            assert stats["active_users"] == 1
+async def _truncate_tables(app: Zenith) -> None:
+    """Remove all rows, in reverse order to handle foreign keys."""
+    from sqlmodel import SQLModel
+
+    with contextlib.suppress(Exception):
+        async with app.app.database.engine.begin() as conn:
+            for table in reversed(SQLModel.metadata.sorted_tables):
+                await conn.execute(table.delete())
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def app_with_models():
+    """Create app with test models and routes once for the module."""
+    # Use DATABASE_URL from environment (PostgreSQL in CI) or in-memory SQLite
+    database_url = os.getenv("DATABASE_URL", IN_MEMORY_DATABASE_URL)
+
+    # Minimal middleware for testing
+    app = Zenith(config=Config(database_url=database_url), middleware=[])
+
+    # Create tables (idempotent - won't fail if already exist)
+    await app.app.database.create_all()
+
+    _install_user_routes(app)
+
+    yield app
+
+    # Leave a shared database (PostgreSQL in CI) empty for other modules
+    await _truncate_tables(app)
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def client(app_with_models):
+    """One client, and one lifespan startup, shared by the model tests."""
+    async with TestClient(app_with_models) as client:
+        yield client
+
+
+class TestSeamlessZenithModelIntegration:
+    """Test ZenithModel seamless integration with Zenith app."""
+
+    # Shares the module-scoped app and client, so runs on the module's loop
+    pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+    @pytest_asyncio.fixture(autouse=True, loop_scope="module")
+    async def empty_tables(self, app_with_models):
+        """Start each test from empty tables, including leftovers of past runs."""
+        await _truncate_tables(app_with_models)
+
+    async def test_zenith_model_automatic_session_management(self, client):
+        """Test ZenithModel automatically uses app's database sessions."""
+        # Test creation with unique email
+        unique_email = f"test-{next(_uid)}@example.com"
+        response = await client.post(
+            "/users", json={"name": "Test User", "email": unique_email}
+        )
+        assert response.status_code == 200
+        user_data = response.json()
+        assert user_data["user"]["name"] == "Test User"
+
+        # Test listing
+        response = await client.get("/users")
+        assert response.status_code == 200
+        users = response.json()["users"]
+        assert len(users) == 1
+        assert users[0]["name"] == "Test User"
+
+        # Test getting specific user
+        user_id = users[0]["id"]
+        response = await client.get(f"/users/{user_id}")
+        assert response.status_code == 200
+        assert response.json()["user"]["name"] == "Test User"
+
+    async def test_zenith_model_rails_like_queries(self, client):
+        """Test Rails-like query patterns work seamlessly."""
+        # Create test data with unique emails
+        response1 = await client.post(
+            "/users",
+            json={
+                "name": "Active User",
+                "email": f"active-{next(_uid)}@example.com",
+                "active": True,
+            },
+        )
+        assert response1.status_code == 200, (
+            f"Failed to create active user: {response1.text}"
+        )
+        response2 = await client.post(
+            "/users",
+            json={
+                "name": "Inactive User",
+                "email": f"inactive-{next(_uid)}@example.com",
+                "active": False,
+            },
+        )
+        assert response2.status_code == 200, (
+            f"Failed to create inactive user: {response2.text}"
+        )
+
+        # Test Rails-like queries
+        response = await client.get("/users/active")
+        assert response.status_code == 200
+        active_users = response.json()["users"]
+        assert len(active_users) == 1
+        assert active_users[0]["name"] == "Active User"
+
+        # Test aggregate queries
+        response = await client.get("/stats")
+        assert response.status_code == 200
+        stats = response.json()
+        assert stats["total_users"] == 2
+        assert stats["active_users"] == 1
 
 
 class TestEnhancedDependencyIntegration:
     """Test enhanced dependency injection integration."""
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def app_with_dependencies(self):
-        """Create app with dependency shortcuts."""
+        """Create app with dependency shortcuts, once per module (read-only)."""
         app = Zenith(middleware=[])
 
         @app.get("/db-test")
@@ -331,148 +331,98 @@ class TestEnhancedDependencyIntegration:
 class TestCompleteRailsLikeDXWorkflow:
     """Test complete Rails-like DX workflow end-to-end."""
 
-    async def test_complete_rails_like_workflow(self):
+    async def test_complete_rails_like_workflow(self, monkeypatch):
         """Test complete workflow from zero-config to Rails-like operations."""
-        with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as tmp:
-            db_path = tmp.name
-
-        try:
-            with patch.dict(
-                os.environ,
-                {
-                    "DATABASE_URL": f"sqlite+aiosqlite:///{db_path}",
-                    "SECRET_KEY": "test-secret-key-32-characters-long",
+        monkeypatch.setenv("DATABASE_URL", IN_MEMORY_DATABASE_URL)
+
+        # 1. Zero-config setup with one-liner features
+        app = Zenith().add_auth().add_admin().add_api("Rails-like API", "1.0.0")
+
+        # Create tables (models will be included automatically via SQLModel metadata)
+        await app.app.database.create_all()
+
+        # 2. Rails-like model operations in routes
+        _install_user_routes(app)
+
+        # 3. Test complete workflow
+        async with TestClient(app) as client:
+            # Test one-liner features work
+            response = await client.get("/admin")
+            assert response.status_code == 200
+            assert "Admin Dashboard" in response.json()["message"]
+
+            response = await client.get("/api/info")
+            assert response.status_code == 200
+            assert response.json()["title"] == "Rails-like API"
+
+            # Test Rails-like CRUD operations
+            # Create users
+            response = await client.post(
+                "/users",
+                json={"name": "Alice Johnson", "email": "alice@example.com"},
+            )
+            assert response.status_code == 200
+            alice = response.json()["user"]
+
+            response = await client.post(
+                "/users",
+                json={
+                    "name": "Bob Smith",
+                    "email": "bob@example.com",
+                    "active": False,
                 },
-                clear=False,
-            ):
-                # 1. Zero-config setup with one-liner features
-                app = Zenith().add_auth().add_admin().add_api("Rails-like API", "1.0.0")
-
-                # Create tables (models will be included automatically via SQLModel metadata)
-                await app.app.database.create_all()
-
-                # 2. Rails-like model operations in routes
-                @app.get("/users")
-                async def list_users():
-                    users = await IntegrationUser.all()
-                    return {"users": [user.model_dump() for user in users]}
-
-                @app.post("/users")
-                async def create_user(user_data: dict):
-                    user = await IntegrationUser.create(**user_data)
-                    return {"user": user.model_dump()}
-
-                @app.get("/users/active")
-                async def get_active_users():
-                    query = IntegrationUser.where(active=True)
-                    users = await query.order_by("-created_at").limit(5).all()
-                    return {"users": [user.model_dump() for user in users]}
-
-                @app.get("/users/{user_id}")
-                async def get_user(user_id: int):
-                    user = await IntegrationUser.find_or_404(user_id)
-                    return {"user": user.model_dump()}
-
-                # 3. Test complete workflow
-                async with TestClient(app) as client:
-                    # Test one-liner features work
-                    response = await client.get("/admin")
-                    assert response.status_code == 200
-                    assert "Admin Dashboard" in response.json()["message"]
-
-                    response = await client.get("/api/info")
-                    assert response.status_code == 200
-                    assert response.json()["title"] == "Rails-like API"
-
-                    # Test Rails-like CRUD operations
-                    # Create users
-                    response = await client.post(
-                        "/users",
-                        json={"name": "Alice Johnson", "email": "alice@example.com"},
-                    )
-                    assert response.status_code == 200
-                    alice = response.json()["user"]
-
-                    response = await client.post(
-                        "/users",
-                        json={
-                            "name": "Bob Smith",
-                            "email": "bob@example.com",
-                            "active": False,
-                        },
-                    )
-                    assert response.status_code == 200
-
-                    # Test Rails-like queries
-                    response = await client.get("/users")
-                    assert response.status_code == 200
-                    all_users = response.json()["users"]
-                    assert len(all_users) == 2
-
-                    response = await client.get("/users/active")
-                    assert response.status_code == 200
-                    active_users = response.json()["users"]
-                    assert len(active_users) == 1
-                    assert active_users[0]["name"] == "Alice Johnson"
-
-                    # Test automatic 404 handling
-                    response = await client.get(f"/users/{alice['id']}")
-                    assert response.status_code == 200
-                    assert response.json()["user"]["name"] == "Alice Johnson"
-
-                    response = await client.get("/users/999")
-                    assert response.status_code == 404
-
-        finally:
-            with contextlib.suppress(builtins.BaseException):
-                Path(db_path).unlink()
+            )
+            assert response.status_code == 200
+
+            # Test Rails-like queries
+            response = await client.get("/users")
+            assert response.status_code == 200
+            all_users = response.json()["users"]
+            assert len(all_users) == 2
+
+            response = await client.get("/users/active")
+            assert response.status_code == 200
+            active_users = response.json()["users"]
+            assert len(active_users) == 1
+            assert active_users[0]["name"] == "Alice Johnson"
+
+            # Test automatic 404 handling
+            response = await client.get(f"/users/{alice['id']}")
+            assert response.status_code == 200
+            assert response.json()["user"]["name"] == "Alice Johnson"
+
+            response = await client.get("/users/999")
+            assert response.status_code == 404
 
 
 class TestPerformanceWithRailsLikeFeatures:
     """Test that Rails-like features don't hurt performance."""
 
     async def test_zenith_model_vs_raw_queries_performance(self):
-        """Test ZenithModel performance is reasonable vs raw queries."""
-        import time
-
-        with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as tmp:
-            db_path = tmp.name
-
-        try:
-            app = Zenith(middleware=[])
-            app.config.database_url = f"sqlite+aiosqlite:///{db_path}"
-            await app.app.database.create_all()
-
-            # Test with small dataset to verify performance isn't terrible
-            async with TestClient(app) as client:
-                # Add routes for both approaches
-                @app.post("/users/zenith-model")
-                async def create_user_zenith_model(user_data: dict):
-                    start = time.time()
-                    user = await IntegrationUser.create(**user_data)
-                    end = time.time()
-                    return {
-                        "user": user.model_dump(),
-                        "duration_ms": (end - start) * 1000,
-                    }
-
-                # Test ZenithModel performance
-                response = await client.post(
-                    "/users/zenith-model",
-                    json={"name": "Performance Test", "email": "perf@example.com"},
-                )
-
-                assert response.status_code == 200
-                duration = response.json()["duration_ms"]
-
-                # Should complete in reasonable time (< 100ms for simple operation)
-                assert duration < 100, (
-                    f"ZenithModel operation took {duration}ms, too slow"
-                )
-
-        finally:
-            with contextlib.suppress(builtins.BaseException):
-                Path(db_path).unlink()
+        """Test ZenithModel issues no more SQL than a hand-written insert."""
+        app = Zenith(config=Config(database_url=IN_MEMORY_DATABASE_URL), middleware=[])
+        await app.app.database.create_all()
+
+        # Count statements rather than time them: the count is deterministic
+        # and catches N+1 regressions without depending on machine load
+        statements = []
+
+        @event.listens_for(app.app.database.engine.sync_engine, "before_cursor_execute")
+        def record_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement.split(None, 1)[0].upper())
+
+        _install_user_routes(app)
+
+        async with TestClient(app) as client:
+            response = await client.post(
+                "/users",
+                json={"name": "Performance Test", "email": "perf@example.com"},
+            )
+
+            assert response.status_code == 200
+
+        # One INSERT, plus the SELECT that refreshes generated columns
+        assert statements == ["INSERT", "SELECT"]
 
 
 class TestBackwardsCompatibility:
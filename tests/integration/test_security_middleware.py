@@ -5,9 +5,15 @@ Tests critical security functionality that protects applications
 including HTTPS enforcement, security headers, and edge cases.
 """
 
+from functools import cache
+
+import httpx
 import pytest
+import pytest_asyncio
 
 from zenith import Zenith
+from zenith.middleware.compression import CompressionMiddleware
+from zenith.middleware.cors import CORSMiddleware
 from zenith.middleware.security import (
     SecurityConfig,
     SecurityHeadersMiddleware,
@@ -16,268 +22,382 @@ from zenith.middleware.security import (
     get_strict_security_config,
 )
 from zenith.testing.client import TestClient
+from zenith.web.responses import Response
+
+# One event loop and one xdist worker for the module so its clients can be shared
+pytestmark = [
+    pytest.mark.asyncio(loop_scope="module"),
+    pytest.mark.xdist_group("security"),
+]
+
+CUSTOM_SECURITY_CONFIG = SecurityConfig(
+    csp_policy="default-src 'self'; script-src 'self' 'unsafe-inline'",
+    hsts_max_age=63072000,  # 2 years
+    hsts_include_subdomains=True,
+    hsts_preload=True,
+    frame_options="DENY",
+    content_type_nosniff=True,
+    # X-XSS-Protection removed (deprecated - creates security vulnerabilities)
+    referrer_policy="strict-origin-when-cross-origin",
+    permissions_policy="geolocation=(), microphone=(), camera=()",
+    force_https=True,
+    force_https_permanent=True,
+)
+CSP_REPORT_ONLY_CONFIG = SecurityConfig(
+    csp_policy="default-src 'self'", csp_report_only=True
+)
+HSTS_DISABLED_CONFIG = SecurityConfig(hsts_max_age=0)
+OPTIONAL_HEADERS_DISABLED_CONFIG = SecurityConfig(
+    frame_options=None,
+    referrer_policy=None,
+    permissions_policy=None,
+    content_type_nosniff=False,
+)
+EMPTY_SECURITY_CONFIG = SecurityConfig(
+    csp_policy=None,
+    hsts_max_age=0,
+    frame_options=None,
+    content_type_nosniff=False,
+    # X-XSS-Protection removed (deprecated)
+    referrer_policy=None,
+    permissions_policy=None,
+)
+UNICODE_HEADERS_CONFIG = SecurityConfig(
+    csp_policy="default-src 'self'; script-src 'self'",
+    referrer_policy="strict-origin-when-cross-origin",
+)
+STRICT_SECURITY_CONFIG = get_strict_security_config()
+DEVELOPMENT_SECURITY_CONFIG = get_development_security_config()
 
-
-@pytest.fixture
-def basic_app():
-    """Basic app without security middleware."""
+# A very long CSP policy, built once at import
+_LONG_CSP = "default-src 'self'; script-src " + " ".join(
+    f"'nonce-{i}'" for i in range(100)
+)
+LONG_CSP_CONFIG = SecurityConfig(csp_policy=_LONG_CSP)
+
+# ((middleware class, kwargs), request headers, expected response headers)
+STACK_CASES = [
+    pytest.param(
+        (CORSMiddleware, {"allow_origins": ["*"]}),
+        {"Origin": "https://example.com"},
+        {"access-control-allow-origin": "https://example.com"},
+        id="cors",
+    ),
+    pytest.param(
+        (CompressionMiddleware, {"minimum_size": 10}),
+        {"Accept-Encoding": "gzip"},
+        {"content-encoding": "gzip"},
+        id="compression",
+    ),
+]
+
+# (config, headers that must match exactly, headers that must be absent)
+SECURITY_CASES = [
+    pytest.param(
+        SecurityConfig(),
+        {
+            "x-content-type-options": "nosniff",
+            "x-frame-options": "DENY",
+            "strict-transport-security": "max-age=31536000; includeSubDomains",
+            "referrer-policy": "strict-origin-when-cross-origin",
+        },
+        # X-XSS-Protection removed (deprecated - creates security vulnerabilities)
+        {"x-xss-protection", "content-security-policy"},
+        id="default",
+    ),
+    pytest.param(
+        CUSTOM_SECURITY_CONFIG,
+        {
+            "content-security-policy": (
+                "default-src 'self'; script-src 'self' 'unsafe-inline'"
+            ),
+            "strict-transport-security": (
+                "max-age=63072000; includeSubDomains; preload"
+            ),
+            "x-frame-options": "DENY",
+            "x-content-type-options": "nosniff",
+            "referrer-policy": "strict-origin-when-cross-origin",
+            "permissions-policy": "geolocation=(), microphone=(), camera=()",
+        },
+        {"x-xss-protection"},
+        id="custom",
+    ),
+    pytest.param(
+        CSP_REPORT_ONLY_CONFIG,
+        {"content-security-policy-report-only": "default-src 'self'"},
+        {"content-security-policy"},
+        id="csp-report-only",
+    ),
+    pytest.param(
+        HSTS_DISABLED_CONFIG,
+        {},
+        {"strict-transport-security"},
+        id="hsts-disabled",
+    ),
+    pytest.param(
+        OPTIONAL_HEADERS_DISABLED_CONFIG,
+        {},
+        {
+            "x-frame-options",
+            "x-xss-protection",
+            "referrer-policy",
+            "permissions-policy",
+            "x-content-type-options",
+        },
+        id="optional-headers-disabled",
+    ),
+    pytest.param(
+        EMPTY_SECURITY_CONFIG,
+        {},
+        {
+            "content-security-policy",
+            "strict-transport-security",
+            "x-frame-options",
+            "x-content-type-options",
+            "x-xss-protection",
+            "referrer-policy",
+            "permissions-policy",
+        },
+        id="empty",
+    ),
+    pytest.param(
+        STRICT_SECURITY_CONFIG,
+        {
+            "content-security-policy": STRICT_SECURITY_CONFIG.csp_policy,
+            "strict-transport-security": (
+                "max-age=63072000; includeSubDomains; preload"  # 2 years
+            ),
+            "x-frame-options": "DENY",
+            "permissions-policy": "geolocation=(), microphone=(), camera=()",
+        },
+        set(),
+        id="strict-preset",
+    ),
+    pytest.param(
+        DEVELOPMENT_SECURITY_CONFIG,
+        {"x-frame-options": "SAMEORIGIN"},
+        {"content-security-policy", "strict-transport-security"},
+        id="development-preset",
+    ),
+]
+
+
+# Response bodies and handlers shared by every app in this module
+_TEST_PAYLOAD = {"message": "test"}
+_SENSITIVE_PAYLOAD = {"data": "sensitive information"}
+_CONTENT_PAYLOAD = {"data": "content " * 50}
+
+
+async def _test_endpoint():
+    return _TEST_PAYLOAD
+
+
+async def _sensitive_endpoint():
+    return _SENSITIVE_PAYLOAD
+
+
+async def _content_endpoint():
+    return _CONTENT_PAYLOAD
+
+
+def _make_app(config: SecurityConfig | None = None, *, secure: bool = True) -> Zenith:
+    """Build an app serving /test and /sensitive, optionally behind security headers."""
     app = Zenith()
 
-    @app.get("/test")
-    async def test_endpoint():
-        return {"message": "test"}
+    if secure:
+        app.add_middleware(SecurityHeadersMiddleware, config=config)
 
-    @app.get("/sensitive")
-    async def sensitive_endpoint():
-        return {"data": "sensitive information"}
+    app.get("/test")(_test_endpoint)
+    app.get("/sensitive")(_sensitive_endpoint)
 
     return app
 
 
-@pytest.fixture
-def security_app():
-    """App with default security middleware."""
-    app = Zenith()
-
-    app.add_middleware(SecurityHeadersMiddleware)
-
-    @app.get("/test")
-    async def test_endpoint():
-        return {"message": "test"}
-
-    @app.get("/sensitive")
-    async def sensitive_endpoint():
-        return {"data": "sensitive information"}
-
-    return app
+def _headers_dict(response: httpx.Response) -> dict[str, str]:
+    """Return the response headers as a plain dict with lowercase names."""
+    return {name.lower(): value for name, value in response.headers.items()}
 
 
-@pytest.fixture
-def custom_security_app():
-    """App with custom security configuration."""
-    app = Zenith()
+@cache
+def _cached_app(config: SecurityConfig | None = None) -> Zenith:
+    """Return the security app for config, building it and its routes once."""
+    return _make_app(config)
 
-    config = SecurityConfig(
-        csp_policy="default-src 'self'; script-src 'self' 'unsafe-inline'",
-        hsts_max_age=63072000,  # 2 years
-        hsts_include_subdomains=True,
-        hsts_preload=True,
-        frame_options="DENY",
-        content_type_nosniff=True,
-        # X-XSS-Protection removed (deprecated - creates security vulnerabilities)
-        referrer_policy="strict-origin-when-cross-origin",
-        permissions_policy="geolocation=(), microphone=(), camera=()",
-        force_https=True,
-        force_https_permanent=True,
-    )
 
-    app.add_middleware(SecurityHeadersMiddleware, config=config)
+@pytest.fixture(scope="module")
+def basic_app():
+    """Basic app without security middleware."""
+    return _make_app(secure=False)
 
-    @app.get("/test")
-    async def test_endpoint():
-        return {"message": "test"}
 
-    return app
+@pytest.fixture(scope="module")
+def security_app():
+    """App with default security middleware."""
+    return _cached_app()
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def https_redirect_app():
     """App with HTTPS redirect enabled."""
-    app = Zenith()
-
-    config = SecurityConfig(force_https=True, force_https_permanent=False)
-
-    app.add_middleware(SecurityHeadersMiddleware, config=config)
-
-    @app.get("/test")
-    async def test_endpoint():
-        return {"message": "test"}
-
-    return app
+    return _cached_app(SecurityConfig(force_https=True, force_https_permanent=False))
 
 
-class TestSecurityHeaders:
-    """Test security header functionality."""
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def https_redirect_client(https_redirect_app, raw_client_factory):
+    """Client for the HTTPS redirect app, shared across the module."""
+    return await raw_client_factory(https_redirect_app)
 
-    async def test_default_security_headers(self, security_app):
-        """Test that default security headers are applied."""
-        async with TestClient(security_app) as client:
-            response = await client.get("/test")
 
-            assert response.status_code == 200
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def stack_client(request, raw_client_factory):
+    """Client for a default security app with one more middleware in the stack."""
+    middleware_class, kwargs = request.param
+    app = _make_app()
+    app.add_middleware(middleware_class, **kwargs)
+    app.get("/content")(_content_endpoint)
+    return await raw_client_factory(app)
 
-            # Check default security headers
-            assert response.headers["x-content-type-options"] == "nosniff"
-            # X-XSS-Protection removed (deprecated - creates security vulnerabilities)
-            assert "x-xss-protection" not in response.headers
-            assert response.headers["x-frame-options"] == "DENY"
-            assert "strict-transport-security" in response.headers
-            assert "referrer-policy" in response.headers
 
-    async def test_custom_security_headers(self, custom_security_app):
-        """Test custom security header configuration."""
-        async with TestClient(custom_security_app) as client:
-            response = await client.get("/test")
+def _make_proxy_app() -> Zenith:
+    """Build an app behind a proxy at 127.0.0.1 that echoes the request it saw."""
+    app = Zenith()
+    app.add_middleware(TrustedProxyMiddleware, trusted_proxies=["127.0.0.1"])
+
+    @app.get("/ip")
+    async def get_ip(request):
+        return {"client_ip": request.client.host if request.client else None}
+
+    @app.get("/scheme")
+    async def get_scheme(request):
+        return {"scheme": request.url.scheme}
+
+    @app.get("/host")
+    async def get_host(request):
+        return {"host": request.url.hostname}
+
+    @app.get("/port")
+    async def get_port(request):
+        return {"port": request.url.port}
+
+    @app.get("/info")
+    async def get_info(request):
+        return {
+            "client_ip": request.client.host if request.client else None,
+            "scheme": request.url.scheme,
+            "host": request.url.hostname,
+            "port": request.url.port,
+            "path": request.url.path,
+        }
+
+    async def get_paths(request):
+        return {
+            "path": request.url.path,
+            "root_path": request.scope.get("root_path", ""),
+        }
+
+    app.get("/api/test")(get_paths)
+    app.get("/test")(get_paths)
 
-            assert response.status_code == 200
+    return app
 
-            # Check custom headers
-            assert "content-security-policy" in response.headers
-            assert (
-                response.headers["content-security-policy"]
-                == "default-src 'self'; script-src 'self' 'unsafe-inline'"
-            )
 
-            assert (
-                response.headers["strict-transport-security"]
-                == "max-age=63072000; includeSubDomains; preload"
-            )
-            assert response.headers["x-frame-options"] == "DENY"
-            assert response.headers["x-content-type-options"] == "nosniff"
-            # X-XSS-Protection removed (deprecated - creates security vulnerabilities)
-            assert "x-xss-protection" not in response.headers
-            assert (
-                response.headers["referrer-policy"] == "strict-origin-when-cross-origin"
-            )
-            assert (
-                response.headers["permissions-policy"]
-                == "geolocation=(), microphone=(), camera=()"
-            )
+@pytest_asyncio.fixture(scope="class", loop_scope="module")
+async def proxy_client():
+    """Client for the trusted proxy app, started once per test class."""
+    async with TestClient(_make_proxy_app()) as client:
+        yield client
 
-    async def test_csp_report_only_mode(self):
-        """Test CSP in report-only mode."""
-        app = Zenith()
 
-        config = SecurityConfig(csp_policy="default-src 'self'", csp_report_only=True)
+@pytest.fixture(scope="module")
+def security_client_for(raw_client_factory):
+    """Return the module's shared client for a security config's cached app."""
 
-        app.add_middleware(SecurityHeadersMiddleware, config=config)
+    async def get_client(config: SecurityConfig) -> httpx.AsyncClient:
+        return await raw_client_factory(_cached_app(config))
 
-        @app.get("/test")
-        async def test_endpoint():
-            return {"message": "test"}
+    return get_client
 
-        async with TestClient(app) as client:
-            response = await client.get("/test")
 
-            assert response.status_code == 200
-            assert "content-security-policy-report-only" in response.headers
-            assert "content-security-policy" not in response.headers
-            assert (
-                response.headers["content-security-policy-report-only"]
-                == "default-src 'self'"
-            )
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def frame_options_client(request, security_client_for):
+    """Client for an app using the parametrized X-Frame-Options value."""
+    frame_option = request.param
+    config = SecurityConfig(frame_options=frame_option)
+    return await security_client_for(config), frame_option
 
-    async def test_hsts_disabled(self):
-        """Test HSTS disabled configuration."""
-        app = Zenith()
 
-        config = SecurityConfig(hsts_max_age=0)  # Disabled
+async def _scope_seen_behind_proxy(
+    trusted_proxies: list[str] | None,
+    client: tuple[str, int],
+    headers: list[tuple[bytes, bytes]],
+) -> dict:
+    """Run TrustedProxyMiddleware on a synthetic request; return the app's scope."""
+    seen = {}
 
-        app.add_middleware(SecurityHeadersMiddleware, config=config)
+    async def inner_app(scope, receive, send):
+        seen.update(scope)
 
-        @app.get("/test")
-        async def test_endpoint():
-            return {"message": "test"}
+    middleware = TrustedProxyMiddleware(inner_app, trusted_proxies=trusted_proxies)
+    scope = {"type": "http", "client": client, "headers": headers}
+    await middleware(scope, None, None)
+    return seen
 
-        async with TestClient(app) as client:
-            response = await client.get("/test")
 
-            assert response.status_code == 200
-            assert "strict-transport-security" not in response.headers
+class TestSecurityHeaders:
+    """Test security header functionality."""
 
-    async def test_frame_options_variations(self):
+    @pytest.mark.parametrize("config, expected, forbidden", SECURITY_CASES)
+    async def test_headers_matrix(
+        self, security_client_for, config, expected, forbidden
+    ):
+        """Test the headers each security configuration adds and omits."""
+        client = await security_client_for(config)
+        response = await client.get("/test")
+
+        headers = _headers_dict(response)
+        assert response.status_code == 200
+        assert expected.items() <= headers.items()
+        assert forbidden.isdisjoint(headers)
+
+    @pytest.mark.parametrize(
+        "frame_options_client",
+        ["DENY", "SAMEORIGIN", "ALLOW-FROM https://example.com"],
+        indirect=True,
+    )
+    async def test_frame_options_variations(self, frame_options_client):
         """Test different X-Frame-Options values."""
-        for frame_option in ["DENY", "SAMEORIGIN", "ALLOW-FROM https://example.com"]:
-            app = Zenith()
-
-            config = SecurityConfig(frame_options=frame_option)
-            app.add_middleware(SecurityHeadersMiddleware, config=config)
-
-            @app.get("/test")
-            async def test_endpoint():
-                return {"message": "test"}
-
-            async with TestClient(app) as client:
-                response = await client.get("/test")
-
-                assert response.status_code == 200
-                assert response.headers["x-frame-options"] == frame_option
-
-    async def test_optional_headers_disabled(self):
-        """Test disabling optional headers."""
-        app = Zenith()
-
-        config = SecurityConfig(
-            frame_options=None,
-            referrer_policy=None,
-            permissions_policy=None,
-            content_type_nosniff=False,
-        )
+        client, frame_option = frame_options_client
+        response = await client.get("/test")
 
-        app.add_middleware(SecurityHeadersMiddleware, config=config)
-
-        @app.get("/test")
-        async def test_endpoint():
-            return {"message": "test"}
-
-        async with TestClient(app) as client:
-            response = await client.get("/test")
-
-            assert response.status_code == 200
-            assert "x-frame-options" not in response.headers
-            # X-XSS-Protection header removed (deprecated security vulnerability)
-            assert "x-xss-protection" not in response.headers
-            assert "referrer-policy" not in response.headers
-            assert "permissions-policy" not in response.headers
-            assert "x-content-type-options" not in response.headers
+        assert response.status_code == 200
+        assert response.headers["x-frame-options"] == frame_option
 
 
 class TestHTTPSRedirect:
     """Test HTTPS redirect functionality."""
 
-    async def test_https_redirect_temporary(self, https_redirect_app):
+    async def test_https_redirect_temporary(self, https_redirect_client):
         """Test temporary HTTPS redirect (302)."""
         # Note: TestClient uses https by default, so we need to simulate HTTP
         # This test may need to be adapted based on how TestClient handles schemes
-        async with TestClient(https_redirect_app) as client:
-            # For this test to work properly, we need to check the middleware logic
-            # Since TestClient might not properly simulate HTTP vs HTTPS
-            response = await client.get("/test")
-            # The response should be successful since TestClient uses HTTPS
-            assert response.status_code == 200
+        # For this test to work properly, we need to check the middleware logic
+        # Since TestClient might not properly simulate HTTP vs HTTPS
+        response = await https_redirect_client.get("/test")
+        # The response should be successful since TestClient uses HTTPS
+        assert response.status_code == 200
 
-    async def test_https_redirect_permanent(self):
+    async def test_https_redirect_permanent(self, security_client_for):
         """Test permanent HTTPS redirect (301)."""
-        app = Zenith()
+        client = await security_client_for(CUSTOM_SECURITY_CONFIG)
+        response = await client.get("/test")
+        # Similar limitation as above - TestClient uses HTTPS by default
+        assert response.status_code == 200
 
-        SecurityConfig(force_https=True, force_https_permanent=True)
-
-        app.add_middleware(SecurityHeadersMiddleware)
-
-        @app.get("/test")
-        async def test_endpoint():
-            return {"message": "test"}
-
-        async with TestClient(app) as client:
-            response = await client.get("/test")
-            # Similar limitation as above - TestClient uses HTTPS by default
-            assert response.status_code == 200
-
-    async def test_no_redirect_for_localhost(self):
+    async def test_no_redirect_for_localhost(self, https_redirect_client):
         """Test that localhost/testserver is not redirected."""
-        app = Zenith()
-
-        SecurityConfig(force_https=True)
-        app.add_middleware(SecurityHeadersMiddleware)
-
-        @app.get("/test")
-        async def test_endpoint():
-            return {"message": "test"}
-
-        async with TestClient(app) as client:
-            response = await client.get("/test")
-            # Should not redirect testserver/localhost
-            assert response.status_code == 200
+        response = await https_redirect_client.get("/test")
+        # Should not redirect testserver/localhost
+        assert response.status_code == 200
 
 
 class TestTrustedProxyMiddleware:
@@ -285,317 +405,132 @@ class TestTrustedProxyMiddleware:
 
     async def test_trusted_proxy_headers_processed(self):
         """Test that trusted proxy headers are processed."""
-        app = Zenith()
-
-        app.add_middleware(TrustedProxyMiddleware, trusted_proxies=["192.168.1.1"])
-
-        @app.get("/test")
-        async def test_endpoint():
-            # In a real scenario, we'd access the processed client IP
-            return {"message": "test"}
-
-        # Note: Testing proxy middleware fully requires more complex setup
-        # to simulate the proxy environment
-        async with TestClient(app) as client:
-            response = await client.get("/test")
-            assert response.status_code == 200
+        scope = await _scope_seen_behind_proxy(
+            ["192.168.1.1"],
+            ("192.168.1.1", 1234),
+            [(b"x-forwarded-for", b"203.0.113.1")],
+        )
+        assert scope["client"] == ("203.0.113.1", 1234)
 
     async def test_untrusted_proxy_headers_ignored(self):
         """Test that untrusted proxy headers are ignored."""
-        app = Zenith()
-
-        app.add_middleware(
-            TrustedProxyMiddleware,
-            trusted_proxies=["192.168.1.1"],  # Different IP
+        scope = await _scope_seen_behind_proxy(
+            ["192.168.1.1"],  # Different IP
+            ("198.51.100.7", 1234),
+            [(b"x-forwarded-for", b"203.0.113.1")],
         )
-
-        @app.get("/test")
-        async def test_endpoint():
-            return {"message": "test"}
-
-        async with TestClient(app) as client:
-            response = await client.get("/test")
-            assert response.status_code == 200
+        assert scope["client"] == ("198.51.100.7", 1234)
 
     async def test_no_trusted_proxies(self):
         """Test behavior with no trusted proxies configured."""
-        app = Zenith()
-
-        app.add_middleware(TrustedProxyMiddleware)
-
-        @app.get("/test")
-        async def test_endpoint():
-            return {"message": "test"}
-
-        async with TestClient(app) as client:
-            response = await client.get("/test")
-            assert response.status_code == 200
+        scope = await _scope_seen_behind_proxy(
+            None, ("192.168.1.1", 1234), [(b"x-forwarded-for", b"203.0.113.1")]
+        )
+        assert scope["client"] == ("192.168.1.1", 1234)
 
-    async def test_x_forwarded_for_header(self):
+    async def test_x_forwarded_for_header(self, proxy_client):
         """Test X-Forwarded-For header processing."""
-        app = Zenith()
-
-        app.add_middleware(TrustedProxyMiddleware, trusted_proxies=["127.0.0.1"])
-
-        @app.get("/ip")
-        async def get_ip(request):
-            return {"client_ip": request.client.host if request.client else None}
-
-        async with TestClient(app) as client:
-            response = await client.get(
-                "/ip", headers={"X-Forwarded-For": "203.0.113.1, 192.168.1.5"}
-            )
-            assert response.status_code == 200
-            # Should extract the first IP from the chain
-            data = response.json()
-            assert data["client_ip"] == "203.0.113.1"
+        response = await proxy_client.get(
+            "/ip", headers={"X-Forwarded-For": "203.0.113.1, 192.168.1.5"}
+        )
+        assert response.status_code == 200
+        # Should extract the first IP from the chain
+        data = response.json()
+        assert data["client_ip"] == "203.0.113.1"
 
-    async def test_x_forwarded_proto_header(self):
+    async def test_x_forwarded_proto_header(self, proxy_client):
         """Test X-Forwarded-Proto header processing."""
-        app = Zenith()
-
-        app.add_middleware(TrustedProxyMiddleware, trusted_proxies=["127.0.0.1"])
-
-        @app.get("/scheme")
-        async def get_scheme(request):
-            return {"scheme": request.url.scheme}
-
-        async with TestClient(app) as client:
-            response = await client.get(
-                "/scheme", headers={"X-Forwarded-Proto": "https"}
-            )
-            assert response.status_code == 200
-            data = response.json()
-            assert data["scheme"] == "https"
+        response = await proxy_client.get(
+            "/scheme", headers={"X-Forwarded-Proto": "https"}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["scheme"] == "https"
 
-    async def test_x_forwarded_host_header(self):
+    async def test_x_forwarded_host_header(self, proxy_client):
         """Test X-Forwarded-Host header processing."""
-        app = Zenith()
-
-        app.add_middleware(TrustedProxyMiddleware, trusted_proxies=["127.0.0.1"])
-
-        @app.get("/host")
-        async def get_host(request):
-            return {"host": request.url.hostname}
-
-        async with TestClient(app) as client:
-            response = await client.get(
-                "/host", headers={"X-Forwarded-Host": "example.com"}
-            )
-            assert response.status_code == 200
-            data = response.json()
-            assert data["host"] == "example.com"
+        response = await proxy_client.get(
+            "/host", headers={"X-Forwarded-Host": "example.com"}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["host"] == "example.com"
 
-    async def test_x_forwarded_port_header(self):
+    async def test_x_forwarded_port_header(self, proxy_client):
         """Test X-Forwarded-Port header processing."""
-        app = Zenith()
-
-        app.add_middleware(TrustedProxyMiddleware, trusted_proxies=["127.0.0.1"])
-
-        @app.get("/port")
-        async def get_port(request):
-            return {"port": request.url.port}
-
-        async with TestClient(app) as client:
-            response = await client.get("/port", headers={"X-Forwarded-Port": "8443"})
-            assert response.status_code == 200
-            data = response.json()
-            assert data["port"] == 8443
+        response = await proxy_client.get("/port", headers={"X-Forwarded-Port": "8443"})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["port"] == 8443
 
-    async def test_x_forwarded_prefix_header(self):
+    async def test_x_forwarded_prefix_header(self, proxy_client):
         """Test X-Forwarded-Prefix header processing."""
-        app = Zenith()
-
-        app.add_middleware(TrustedProxyMiddleware, trusted_proxies=["127.0.0.1"])
-
-        @app.get("/api/test")
-        async def test_endpoint(request):
-            return {
-                "path": request.url.path,
-                "root_path": request.scope.get("root_path", ""),
-            }
-
-        async with TestClient(app) as client:
-            response = await client.get(
-                "/api/test", headers={"X-Forwarded-Prefix": "/v1"}
-            )
-            assert response.status_code == 200
-            data = response.json()
-            assert data["path"] == "/v1/api/test"
-            assert data["root_path"] == "/v1"
+        response = await proxy_client.get(
+            "/api/test", headers={"X-Forwarded-Prefix": "/v1"}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["path"] == "/v1/api/test"
+        assert data["root_path"] == "/v1"
 
-    async def test_multiple_forwarded_headers(self):
+    async def test_multiple_forwarded_headers(self, proxy_client):
         """Test processing multiple X-Forwarded-* headers together."""
-        app = Zenith()
-
-        app.add_middleware(TrustedProxyMiddleware, trusted_proxies=["127.0.0.1"])
-
-        @app.get("/info")
-        async def get_info(request):
-            return {
-                "client_ip": request.client.host if request.client else None,
-                "scheme": request.url.scheme,
-                "host": request.url.hostname,
-                "port": request.url.port,
-                "path": request.url.path,
-            }
-
-        async with TestClient(app) as client:
-            response = await client.get(
-                "/info",
-                headers={
-                    "X-Forwarded-For": "198.51.100.42",
-                    "X-Forwarded-Proto": "https",
-                    "X-Forwarded-Host": "api.example.com",
-                    "X-Forwarded-Port": "443",
-                },
-            )
-            assert response.status_code == 200
-            data = response.json()
-            assert data["client_ip"] == "198.51.100.42"
-            assert data["scheme"] == "https"
-            assert data["host"] == "api.example.com"
-            assert data["port"] == 443
-
-    async def test_invalid_port_ignored(self):
+        response = await proxy_client.get(
+            "/info",
+            headers={
+                "X-Forwarded-For": "198.51.100.42",
+                "X-Forwarded-Proto": "https",
+                "X-Forwarded-Host": "api.example.com",
+                "X-Forwarded-Port": "443",
+            },
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["client_ip"] == "198.51.100.42"
+        assert data["scheme"] == "https"
+        assert data["host"] == "api.example.com"
+        assert data["port"] == 443
+
+    async def test_invalid_port_ignored(self, proxy_client):
         """Test that invalid port values are ignored."""
-        app = Zenith()
-
-        app.add_middleware(TrustedProxyMiddleware, trusted_proxies=["127.0.0.1"])
-
-        @app.get("/port")
-        async def get_port(request):
-            return {"port": request.url.port}
-
-        async with TestClient(app) as client:
-            # Invalid port should be ignored
-            response = await client.get(
-                "/port", headers={"X-Forwarded-Port": "invalid"}
-            )
-            assert response.status_code == 200
-            # Port should remain unchanged (default test client port)
+        # Invalid port should be ignored
+        response = await proxy_client.get(
+            "/port", headers={"X-Forwarded-Port": "invalid"}
+        )
+        assert response.status_code == 200
+        # Port should remain unchanged (default test client port)
 
-    async def test_forwarded_prefix_trailing_slash_stripped(self):
+    async def test_forwarded_prefix_trailing_slash_stripped(self, proxy_client):
         """Test that trailing slashes are stripped from X-Forwarded-Prefix."""
-        app = Zenith()
-
-        app.add_middleware(TrustedProxyMiddleware, trusted_proxies=["127.0.0.1"])
-
-        @app.get("/test")
-        async def test_endpoint(request):
-            return {
-                "path": request.url.path,
-                "root_path": request.scope.get("root_path", ""),
-            }
-
-        async with TestClient(app) as client:
-            response = await client.get(
-                "/test", headers={"X-Forwarded-Prefix": "/api/v2/"}
-            )
-            assert response.status_code == 200
-            data = response.json()
-            assert data["root_path"] == "/api/v2"  # Trailing slash removed
-
-
-class TestSecurityPresets:
-    """Test security configuration presets."""
-
-    async def test_strict_security_config(self):
-        """Test strict security configuration preset."""
-        app = Zenith()
-
-        config = get_strict_security_config()
-        app.add_middleware(SecurityHeadersMiddleware, config=config)
-
-        @app.get("/test")
-        async def test_endpoint():
-            return {"message": "test"}
-
-        async with TestClient(app) as client:
-            response = await client.get("/test")
-
-            assert response.status_code == 200
-            # Check strict configuration
-            assert "content-security-policy" in response.headers
-            assert (
-                "63072000" in response.headers["strict-transport-security"]
-            )  # 2 years
-            assert "includeSubDomains" in response.headers["strict-transport-security"]
-            assert "preload" in response.headers["strict-transport-security"]
-            assert response.headers["x-frame-options"] == "DENY"
-            assert "permissions-policy" in response.headers
-
-    async def test_development_security_config(self):
-        """Test development security configuration preset."""
-        app = Zenith()
-
-        config = get_development_security_config()
-        app.add_middleware(SecurityHeadersMiddleware, config=config)
-
-        @app.get("/test")
-        async def test_endpoint():
-            return {"message": "test"}
-
-        async with TestClient(app) as client:
-            response = await client.get("/test")
-
-            assert response.status_code == 200
-            # Check development configuration (more relaxed)
-            assert "content-security-policy" not in response.headers
-            assert "strict-transport-security" not in response.headers
-            assert response.headers["x-frame-options"] == "SAMEORIGIN"
+        response = await proxy_client.get(
+            "/test", headers={"X-Forwarded-Prefix": "/api/v2/"}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["root_path"] == "/api/v2"  # Trailing slash removed
 
 
 class TestSecurityEdgeCases:
     """Test security middleware edge cases."""
 
-    async def test_empty_security_config(self):
-        """Test with minimal security configuration."""
-        app = Zenith()
-
-        config = SecurityConfig(
-            csp_policy=None,
-            hsts_max_age=0,
-            frame_options=None,
-            content_type_nosniff=False,
-            # X-XSS-Protection removed (deprecated)
-            referrer_policy=None,
-            permissions_policy=None,
-        )
-
-        app.add_middleware(SecurityHeadersMiddleware, config=config)
-
-        @app.get("/test")
-        async def test_endpoint():
-            return {"message": "test"}
-
-        async with TestClient(app) as client:
-            response = await client.get("/test")
-
-            assert response.status_code == 200
-            # No security headers should be added
-            security_header_names = [
-                "content-security-policy",
-                "strict-transport-security",
-                "x-frame-options",
-                "x-content-type-options",
-                "x-xss-protection",
-                "referrer-policy",
-                "permissions-policy",
-            ]
-            for header_name in security_header_names:
-                assert header_name not in response.headers
-
     async def test_non_http_scope(self):
         """Test security middleware with non-HTTP scope."""
-        app = Zenith()
+        sent = []
 
-        app.add_middleware(SecurityHeadersMiddleware)
+        async def websocket_app(scope, receive, send):
+            await send({"type": "websocket.accept"})
+
+        async def receive():
+            return {"type": "websocket.connect"}
 
-        # Test WebSocket scope (should pass through)
+        async def send(message):
+            sent.append(message)
 
-        # This would require more complex testing setup to properly test
-        # WebSocket handling, but the middleware should pass it through
+        middleware = SecurityHeadersMiddleware(websocket_app)
+        await middleware({"type": "websocket", "path": "/ws"}, receive, send)
+
+        # WebSocket scope passes through untouched, with no headers added
+        assert sent == [{"type": "websocket.accept"}]
 
     async def test_response_with_existing_headers(self):
         """Test that security headers don't conflict with existing response headers."""
@@ -605,8 +540,6 @@ class TestSecurityEdgeCases:
 
         @app.get("/custom-headers")
         async def custom_headers_endpoint():
-            from zenith.web.responses import Response
-
             return Response(
                 content='{"message": "test"}',
                 headers={
@@ -619,184 +552,47 @@ class TestSecurityEdgeCases:
             response = await client.get("/custom-headers")
 
             assert response.status_code == 200
-            assert response.headers["custom-header"] == "value"
             # Security middleware should override the custom frame options
-            assert response.headers["x-frame-options"] == "DENY"
+            expected = {"custom-header": "value", "x-frame-options": "DENY"}
+            assert expected.items() <= _headers_dict(response).items()
 
-    async def test_unicode_in_headers(self):
+    async def test_unicode_in_headers(self, security_client_for):
         """Test handling of Unicode characters in header values."""
-        app = Zenith()
-
-        config = SecurityConfig(
-            csp_policy="default-src 'self'; script-src 'self'",
-            referrer_policy="strict-origin-when-cross-origin",
-        )
-
-        app.add_middleware(SecurityHeadersMiddleware, config=config)
-
-        @app.get("/test")
-        async def test_endpoint():
-            return {"message": "test"}
-
-        async with TestClient(app) as client:
-            response = await client.get("/test")
-
-            assert response.status_code == 200
-            # Headers should be properly encoded
-            assert "content-security-policy" in response.headers
-            assert "referrer-policy" in response.headers
-
-    async def test_very_long_header_values(self):
+        client = await security_client_for(UNICODE_HEADERS_CONFIG)
+        response = await client.get("/test")
+
+        assert response.status_code == 200
+        assert response.json() == _TEST_PAYLOAD
+        # Headers should be properly encoded
+        expected = {
+            "content-security-policy": "default-src 'self'; script-src 'self'",
+            "referrer-policy": "strict-origin-when-cross-origin",
+        }
+        assert expected.items() <= _headers_dict(response).items()
+
+    async def test_very_long_header_values(self, security_client_for):
         """Test handling of very long header values."""
-        app = Zenith()
-
-        # Create a very long CSP policy
-        long_csp = "default-src 'self'; script-src " + " ".join(
-            [f"'nonce-{i}'" for i in range(100)]
-        )
+        client = await security_client_for(LONG_CSP_CONFIG)
+        response = await client.get("/test")
 
-        config = SecurityConfig(csp_policy=long_csp)
-        app.add_middleware(SecurityHeadersMiddleware, config=config)
-
-        @app.get("/test")
-        async def test_endpoint():
-            return {"message": "test"}
-
-        async with TestClient(app) as client:
-            response = await client.get("/test")
-
-            assert response.status_code == 200
-            assert "content-security-policy" in response.headers
-            assert len(response.headers["content-security-policy"]) > 1000
-
-
-class TestSecurityUtilities:
-    """Test security utility functions."""
-
-    def test_html_sanitization(self):
-        """Test HTML input sanitization."""
-        from zenith.middleware.security import sanitize_html_input
-
-        # Test basic XSS vectors
-        assert (
-            sanitize_html_input("<script>alert('xss')</script>")
-            == "&lt;script&gt;alert(&#x27;xss&#x27;)&lt;&#x2F;script&gt;"
-        )
-        assert (
-            sanitize_html_input('"><img src=x onerror=alert(1)>')
-            == "&quot;&gt;&lt;img src=x onerror=alert(1)&gt;"
-        )
-        assert (
-            sanitize_html_input("javascript:alert('xss')")
-            == "javascript:alert(&#x27;xss&#x27;)"
-        )
-        assert sanitize_html_input("") == ""
-        assert sanitize_html_input("normal text") == "normal text"
-
-    def test_url_validation(self):
-        """Test URL validation for SSRF protection."""
-        from zenith.middleware.security import validate_url
-
-        # Valid URLs
-        assert validate_url("https://example.com") is True
-        assert validate_url("http://example.com/path") is True
-        assert validate_url("https://api.example.com/v1/endpoint") is True
-
-        # Invalid schemes
-        assert validate_url("ftp://example.com") is False
-        assert validate_url("javascript:alert(1)") is False
-        assert validate_url("data:text/html,<script>") is False
-
-        # Localhost and private IPs (should be blocked)
-        assert validate_url("http://localhost/admin") is False
-        assert validate_url("http://127.0.0.1/admin") is False
-        assert validate_url("http://::1/admin") is False
-        assert validate_url("http://192.168.1.1/admin") is False
-        assert validate_url("http://10.0.0.1/admin") is False
-        assert validate_url("http://172.16.0.1/admin") is False
-
-        # Invalid URLs
-        assert validate_url("") is False
-        assert validate_url("not-a-url") is False
-        assert validate_url("http://") is False
-
-        # Custom allowed schemes
-        assert validate_url("ftp://example.com", allowed_schemes=["ftp"]) is True
-        assert validate_url("https://example.com", allowed_schemes=["ftp"]) is False
-
-    def test_secure_token_generation(self):
-        """Test secure token generation."""
-        from zenith.middleware.security import generate_secure_token
-
-        # Test default length
-        token1 = generate_secure_token()
-        token2 = generate_secure_token()
-
-        assert len(token1) > 30  # URL-safe base64 of 32 bytes
-        assert len(token2) > 30
-        assert token1 != token2  # Should be different
-
-        # Test custom length
-        short_token = generate_secure_token(16)
-        assert len(short_token) > 15
-
-    def test_constant_time_compare(self):
-        """Test constant-time string comparison."""
-        from zenith.middleware.security import constant_time_compare
-
-        assert constant_time_compare("secret123", "secret123") is True
-        assert constant_time_compare("secret123", "secret124") is False
-        assert constant_time_compare("short", "much_longer_string") is False
-        assert constant_time_compare("", "") is True
+        assert response.status_code == 200
+        assert response.headers["content-security-policy"] == _LONG_CSP
+        assert len(response.headers["content-security-policy"]) > 1000
 
 
 class TestSecurityInStack:
     """Test security middleware in middleware stack."""
 
-    async def test_security_with_cors_middleware(self):
-        """Test security middleware working with CORS."""
-        from zenith.middleware.cors import CORSMiddleware
-
-        app = Zenith()
-
-        # Add both security and CORS middleware through the app
-        app.add_middleware(SecurityHeadersMiddleware)
-        app.add_middleware(CORSMiddleware, allow_origins=["*"])
-
-        @app.get("/test")
-        async def test_endpoint():
-            return {"message": "test"}
-
-        async with TestClient(app) as client:
-            response = await client.get(
-                "/test", headers={"Origin": "https://example.com"}
-            )
-
-            assert response.status_code == 200
-            # Should have both security and CORS headers
-            assert response.headers["x-content-type-options"] == "nosniff"
-            assert (
-                response.headers["access-control-allow-origin"] == "https://example.com"
-            )
-
-    async def test_security_with_compression_middleware(self):
-        """Test security middleware working with compression."""
-        from zenith.middleware.compression import CompressionMiddleware
-
-        app = Zenith()
-
-        # Add both security and compression middleware through the app
-        app.add_middleware(SecurityHeadersMiddleware)
-        app.add_middleware(CompressionMiddleware, minimum_size=10)
-
-        @app.get("/test")
-        async def test_endpoint():
-            return {"data": "content " * 50}
-
-        async with TestClient(app) as client:
-            response = await client.get("/test", headers={"Accept-Encoding": "gzip"})
-
-            assert response.status_code == 200
-            # Should have both security headers and compression
-            assert response.headers["x-content-type-options"] == "nosniff"
-            assert response.headers["content-encoding"] == "gzip"
+    @pytest.mark.parametrize(
+        "stack_client, request_headers, expected",
+        STACK_CASES,
+        indirect=["stack_client"],
+    )
+    async def test_security_stack(self, stack_client, request_headers, expected):
+        """Test security middleware working alongside another middleware."""
+        response = await stack_client.get("/content", headers=request_headers)
+
+        assert response.status_code == 200
+        # Should have both security headers and the other middleware's headers
+        expected = {"x-content-type-options": "nosniff", **expected}
+        assert expected.items() <= _headers_dict(response).items()
@@ -6,68 +6,169 @@ This middleware had 18% coverage and NO integration tests.
 """
 
 from datetime import timedelta
+from unittest.mock import AsyncMock, Mock
 
 import pytest
+import pytest_asyncio
+from starlette.responses import StreamingResponse
 
 from zenith import Zenith
 from zenith.sessions import (
     CookieSessionStore,
+    Session,
     SessionManager,
     SessionMiddleware,
 )
 from zenith.testing import TestClient
 
+# One event loop and one xdist worker for the module so its client can be shared
+pytestmark = [
+    pytest.mark.asyncio(loop_scope="module"),
+    pytest.mark.xdist_group("sessions"),
+]
+
+
+def _make_session_app(session_manager: SessionManager) -> Zenith:
+    """Build an app with session middleware and a /set-session route."""
+    app = Zenith()
+    app.add_middleware(SessionMiddleware, session_manager=session_manager)
+
+    @app.get("/set-session")
+    async def set_session(request):
+        request.session["user_id"] = 123
+        request.session["username"] = "testuser"
+        return {"status": "session_set"}
+
+    return app
+
+
+@pytest.fixture(scope="module")
+def session_secret():
+    """Secret key shared by every cookie store in this module."""
+    return "test-secret-key-that-is-long-enough-for-session-testing"
+
+
+@pytest.fixture(scope="module")
+def cookie_store(session_secret):
+    """Cookie session store shared by every app in this module."""
+    return CookieSessionStore(secret_key=session_secret)
+
+
+@pytest.fixture(scope="module")
+def default_session_app(cookie_store):
+    """App with an HTTP-friendly session cookie and routes for round trips."""
+    session_manager = SessionManager(
+        store=cookie_store,
+        cookie_name="session",
+        max_age=timedelta(hours=1),
+        is_secure=False,  # For testing
+        is_http_only=True,
+        same_site="lax",
+    )
+    app = _make_session_app(session_manager)
+
+    @app.get("/get-session")
+    async def get_session(request):
+        return {
+            "user_id": request.session.get("user_id"),
+            "username": request.session.get("username"),
+        }
+
+    @app.get("/read-only")
+    async def read_only(request):
+        # Read session without modifying
+        user_id = request.session.get("user_id", "none")
+        return {"user_id": user_id}
+
+    @app.get("/modify")
+    async def modify(request):
+        # Modify session
+        request.session["user_id"] = 999
+        return {"status": "modified"}
+
+    @app.get("/set/{value}")
+    async def set_value(request, value: str):
+        request.session["stored_value"] = value
+        return {"stored": value}
+
+    @app.get("/get")
+    async def get_value(request):
+        return {"value": request.session.get("stored_value")}
+
+    @app.get("/cart/add")
+    async def add_to_cart(request):
+        cart = request.session.get("cart")
+        if cart is None:
+            request.session["cart"] = [1]
+        else:
+            # Edited in place, without going through set()
+            cart.append(len(cart) + 1)
+        return {"cart": request.session["cart"]}
+
+    @app.get("/stream")
+    async def stream(request):
+        user_id = request.session.get("user_id")
+
+        async def chunks():
+            for i in range(5):
+                yield f"{user_id}:{i}\n".encode()
+
+        return StreamingResponse(chunks())
+
+    return app
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def shared_session_client(default_session_app):
+    """Client for the default session app, started once per module."""
+    async with TestClient(default_session_app) as client:
+        yield client
+
+
+@pytest.fixture
+def session_client(shared_session_client):
+    """The shared default session client, with no cookies from earlier tests."""
+    shared_session_client.cookies.clear()
+    return shared_session_client
+
+
+@pytest.fixture(scope="module")
+def secure_session_app(cookie_store):
+    """App whose session cookie is Secure, HttpOnly and SameSite=strict."""
+    return _make_session_app(
+        SessionManager(
+            store=cookie_store, is_secure=True, is_http_only=True, same_site="strict"
+        )
+    )
 
-@pytest.mark.asyncio
-class TestSessionMiddleware:
-    """Test session middleware integration."""
-
-    async def test_session_creation_and_retrieval(self):
-        """Test that sessions are created and can be retrieved across requests."""
-        app = Zenith()
 
-        # Add session middleware
-        session_store = CookieSessionStore(
-            secret_key="test-secret-key-that-is-long-enough-for-session-testing"
-        )
-        session_manager = SessionManager(
-            store=session_store,
-            cookie_name="session",
-            max_age=timedelta(hours=1),
-            is_secure=False,  # For testing
-            is_http_only=True,
-            same_site="lax",
-        )
-        app.add_middleware(SessionMiddleware, session_manager=session_manager)
+@pytest.fixture(scope="module")
+def custom_cookie_session_app(cookie_store):
+    """App whose session cookie uses a custom name."""
+    return _make_session_app(
+        SessionManager(store=cookie_store, cookie_name="custom_session_id")
+    )
 
-        @app.get("/set-session")
-        async def set_session(request):
-            request.session["user_id"] = 123
-            request.session["username"] = "testuser"
-            return {"status": "session_set"}
 
-        @app.get("/get-session")
-        async def get_session(request):
-            return {
-                "user_id": request.session.get("user_id"),
-                "username": request.session.get("username"),
-            }
+class TestSessionMiddleware:
+    """Test session middleware integration."""
 
-        async with TestClient(app) as client:
-            # First request - set session
-            response1 = await client.get("/set-session")
-            assert response1.status_code == 200
+    async def test_session_creation_and_retrieval(self, session_client):
+        """Test that sessions are created and can be retrieved across requests."""
+        # First request - set session
+        response1 = await session_client.get("/set-session")
+        assert response1.status_code == 200
 
-            # Extract session cookie
-            cookies = response1.cookies
-            assert "session" in cookies
+        # Extract session cookie
+        cookies = response1.cookies
+        assert "session" in cookies
 
-            # Second request - retrieve session using cookie
-            response2 = await client.get("/get-session")
-            assert response2.status_code == 200
-            data = response2.json()
-            assert data["user_id"] == 123
-            assert data["username"] == "testuser"
+        # Second request - retrieve session using cookie
+        response2 = await session_client.get("/get-session")
+        assert response2.status_code == 200
+        data = response2.json()
+        assert data["user_id"] == 123
+        assert data["username"] == "testuser"
 
     async def test_session_without_middleware(self):
         """Test that session is None when middleware not added."""
@@ -85,24 +186,9 @@ class TestSessionMiddleware:
             data = response.json()
             assert data["has_session"] is False
 
-    async def test_session_cookie_security(self):
+    async def test_session_cookie_security(self, secure_session_app):
         """Test session cookie security attributes."""
-        app = Zenith()
-
-        session_store = CookieSessionStore(
-            secret_key="test-secret-key-that-is-long-enough-for-session-testing"
-        )
-        session_manager = SessionManager(
-            store=session_store, is_secure=True, is_http_only=True, same_site="strict"
-        )
-        app.add_middleware(SessionMiddleware, session_manager=session_manager)
-
-        @app.get("/set-session")
-        async def set_session(request):
-            request.session["test"] = "value"
-            return {"status": "set"}
-
-        async with TestClient(app) as client:
+        async with TestClient(secure_session_app) as client:
             response = await client.get("/set-session")
             assert response.status_code == 200
 
@@ -112,24 +198,9 @@ class TestSessionMiddleware:
             assert "Secure" in set_cookie_header
             assert "SameSite=strict" in set_cookie_header
 
-    async def test_session_with_custom_cookie_name(self):
+    async def test_session_with_custom_cookie_name(self, custom_cookie_session_app):
         """Test session middleware with custom cookie name."""
-        app = Zenith()
-
-        session_store = CookieSessionStore(
-            secret_key="test-secret-key-that-is-long-enough-for-session-testing"
-        )
-        session_manager = SessionManager(
-            store=session_store, cookie_name="custom_session_id"
-        )
-        app.add_middleware(SessionMiddleware, session_manager=session_manager)
-
-        @app.get("/set-session")
-        async def set_session(request):
-            request.session["custom"] = "data"
-            return {"status": "set"}
-
-        async with TestClient(app) as client:
+        async with TestClient(custom_cookie_session_app) as client:
             response = await client.get("/set-session")
             assert response.status_code == 200
 
@@ -138,90 +209,110 @@ class TestSessionMiddleware:
             assert "custom_session_id" in cookies
             assert "session" not in cookies
 
-    async def test_session_cookie_only_set_when_modified(self):
+    async def test_session_cookie_only_set_when_modified(self, session_client):
         """Test that session cookie is only set when session is new or modified."""
-        app = Zenith()
+        # First request - should set cookie (new session)
+        response1 = await session_client.get("/read-only")
+        assert response1.status_code == 200
+        assert "set-cookie" in response1.headers
+        assert "session" in response1.cookies
+
+        # Second request - read-only, should NOT set cookie
+        response2 = await session_client.get("/read-only")
+        assert response2.status_code == 200
+        # No set-cookie header when session unchanged
+        assert "set-cookie" not in response2.headers
+
+        # Third request - modify session, should set cookie
+        response3 = await session_client.get("/modify")
+        assert response3.status_code == 200
+        assert "set-cookie" in response3.headers
+
+        # Fourth request - read-only again, should NOT set cookie
+        response4 = await session_client.get("/read-only")
+        assert response4.status_code == 200
+        assert "set-cookie" not in response4.headers
+        # But session data should persist
+        data = response4.json()
+        assert data["user_id"] == 999
+
+    async def test_read_only_request_skips_save_and_signing(
+        self, session_client, cookie_store, monkeypatch
+    ):
+        """Test an unchanged session is neither saved nor re-encoded."""
+        await session_client.get("/set-session")
+
+        save = AsyncMock()
+        get_cookie_value = Mock(wraps=cookie_store.get_cookie_value)
+        monkeypatch.setattr(cookie_store, "save", save)
+        monkeypatch.setattr(cookie_store, "get_cookie_value", get_cookie_value)
+
+        response = await session_client.get("/read-only")
+        assert response.json() == {"user_id": 123}
+        assert save.call_count == 0
+        get_cookie_value.assert_not_called()
+
+    async def test_in_place_edit_saved(self, session_client):
+        """Test a session container edited in place is saved with the response."""
+        await session_client.get("/cart/add")
+
+        response = await session_client.get("/cart/add")
+        assert "set-cookie" in response.headers
+
+        response = await session_client.get("/cart/add")
+        assert response.json() == {"cart": [1, 2, 3]}
+
+    async def test_streamed_body_checks_session_once(self, session_client, monkeypatch):
+        """Test the save decision is made once, not per streamed body chunk."""
+        await session_client.get("/set-session")
+
+        dirty_checks = 0
+        is_dirty = Session.is_dirty
+
+        def counting_is_dirty(session):
+            nonlocal dirty_checks
+            dirty_checks += 1
+            return is_dirty.fget(session)
+
+        monkeypatch.setattr(Session, "is_dirty", property(counting_is_dirty))
+
+        response = await session_client.get("/stream")
+        assert response.text == "".join(f"123:{i}\n" for i in range(5))
+        assert "set-cookie" not in response.headers
+        assert dirty_checks == 1
+
+    async def test_session_intact_after_response(self, cookie_store):
+        """Test a session kept past the response still holds its own data."""
+        app = _make_session_app(SessionManager(store=cookie_store, is_secure=False))
+        kept = []
+
+        @app.get("/keep")
+        async def keep(request):
+            request.session["user_id"] = len(kept)
+            kept.append(request.session)
+            return {"status": "kept"}
 
-        session_store = CookieSessionStore(
-            secret_key="test-secret-key-that-is-long-enough-for-session-testing"
-        )
-        session_manager = SessionManager(
-            store=session_store, cookie_name="session", is_secure=False
-        )
-        app.add_middleware(SessionMiddleware, session_manager=session_manager)
+        async with TestClient(app) as client:
+            await client.get("/keep")
+            client.cookies.clear()
+            await client.get("/keep")
 
-        @app.get("/read-only")
-        async def read_only(request):
-            # Read session without modifying
-            user_id = request.session.get("user_id", "none")
-            return {"user_id": user_id}
+        assert kept[0] is not kept[1]
+        assert kept[0]["user_id"] == 0
+        assert kept[1]["user_id"] == 1
 
-        @app.get("/modify")
-        async def modify(request):
-            # Modify session
-            request.session["user_id"] = 999
-            return {"status": "modified"}
 
-        async with TestClient(app) as client:
-            # First request - should set cookie (new session)
-            response1 = await client.get("/read-only")
-            assert response1.status_code == 200
-            assert "set-cookie" in response1.headers
-            assert "session" in response1.cookies
-
-            # Second request - read-only, should NOT set cookie
-            response2 = await client.get("/read-only")
-            assert response2.status_code == 200
-            # No set-cookie header when session unchanged
-            assert "set-cookie" not in response2.headers
-
-            # Third request - modify session, should set cookie
-            response3 = await client.get("/modify")
-            assert response3.status_code == 200
-            assert "set-cookie" in response3.headers
-
-            # Fourth request - read-only again, should NOT set cookie
-            response4 = await client.get("/read-only")
-            assert response4.status_code == 200
-            assert "set-cookie" not in response4.headers
-            # But session data should persist
-            data = response4.json()
-            assert data["user_id"] == 999
-
-
-@pytest.mark.asyncio
 class TestSessionStoreIntegration:
     """Test session middleware with different store backends."""
 
-    async def test_memory_store_integration(self):
+    async def test_memory_store_integration(self, session_client):
         """Test session middleware with memory store."""
-        app = Zenith()
-
-        # Use memory store explicitly
-        store = CookieSessionStore(
-            secret_key="test-secret-key-that-is-long-enough-for-session-testing"
-        )
-        session_manager = SessionManager(
-            store=store, is_secure=False
-        )  # For testing over HTTP
-        app.add_middleware(SessionMiddleware, session_manager=session_manager)
-
-        @app.get("/set/{value}")
-        async def set_value(request, value: str):
-            request.session["stored_value"] = value
-            return {"stored": value}
-
-        @app.get("/get")
-        async def get_value(request):
-            return {"value": request.session.get("stored_value")}
-
-        async with TestClient(app) as client:
-            # Set value
-            response1 = await client.get("/set/test123")
-            assert response1.status_code == 200
-
-            # Get value
-            response2 = await client.get("/get")
-            assert response2.status_code == 200
-            data = response2.json()
-            assert data["value"] == "test123"
+        # Set value
+        response1 = await session_client.get("/set/test123")
+        assert response1.status_code == 200
+
+        # Get value
+        response2 = await session_client.get("/get")
+        assert response2.status_code == 200
+        data = response2.json()
+        assert data["value"] == "test123"
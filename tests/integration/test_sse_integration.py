@@ -153,12 +153,11 @@ class TestSSEHTTPIntegration:
 
             # Read the stream content
             content = await response.aread()
-            content_str = content.decode("utf-8")
 
             # Should contain multiple events
-            assert "event: count" in content_str
-            assert "data:" in content_str
-            assert content_str.count("\n\n") >= 5  # At least 5 events
+            assert b"event: count" in content
+            assert b"data:" in content
+            assert content.count(b"\n\n") >= 5  # At least 5 events
 
     @pytest.mark.asyncio
     async def test_sse_custom_headers(self, sse_app):
@@ -200,11 +199,10 @@ class TestSSEHTTPIntegration:
 
             assert response.status_code == 200
             content = await response.aread()
-            content_str = content.decode("utf-8")
 
             # Should contain channel-specific data
-            assert "news" in content_str
-            assert "channel_message" in content_str
+            assert b"news" in content
+            assert b"channel_message" in content
 
     @pytest.mark.asyncio
     async def test_sse_error_handling_in_stream(self, sse_app):
@@ -216,10 +214,9 @@ class TestSSEHTTPIntegration:
 
             # Should receive some events before error
             content = await response.aread()
-            content_str = content.decode("utf-8")
 
             # Should have started streaming
-            assert "event: start" in content_str
+            assert b"event: start" in content
             # May or may not have complete stream due to error
 
     @pytest.mark.asyncio
@@ -232,11 +229,10 @@ class TestSSEHTTPIntegration:
 
             # Should handle backpressure gracefully
             content = await response.aread()
-            content_str = content.decode("utf-8")
 
             # Should have events (may be throttled)
-            assert "backpressure_test" in content_str
-            assert "data:" in content_str
+            assert b"backpressure_test" in content
+            assert b"data:" in content
 
     @pytest.mark.asyncio
     async def test_sse_heartbeat_generation(self, sse_app):
@@ -246,10 +242,9 @@ class TestSSEHTTPIntegration:
 
             assert response.status_code == 200
             content = await response.aread()
-            content_str = content.decode("utf-8")
 
             # Should have data events
-            assert "event: data" in content_str
+            assert b"event: data" in content
 
             # May have heartbeat events depending on timing
             # (Heartbeats are sent every 10 data events)
@@ -370,10 +365,9 @@ class TestSSEManagerIntegration:
             assert response.headers["content-type"] == "text/event-stream"
 
             content = await response.aread()
-            content_str = content.decode("utf-8")
 
-            assert "event: managed" in content_str
-            assert "data:" in content_str
+            assert b"event: managed" in content
+            assert b"data:" in content
 
     @pytest.mark.asyncio
     async def test_sse_manager_connection_tracking(self, manager_app):
@@ -445,8 +439,8 @@ class TestSSESecurityIntegration:
             size = int(request.query_params.get("size", "1000"))
 
             async def events():
-                # Potentially large payload
-                large_data = "x" * min(size, 100000)  # Cap at 100KB
+                # Potentially large payload, capped by the framer's max_event_bytes
+                large_data = "x" * size
                 yield {"type": "large_payload", "data": {"payload": large_data}}
 
             return create_sse_response(events())
@@ -467,10 +461,9 @@ class TestSSESecurityIntegration:
 
             assert response.status_code == 200
             content = await response.aread()
-            content_str = content.decode("utf-8")
 
-            assert "public" in content_str
-            assert "anyone can see this" in content_str
+            assert b"public" in content
+            assert b"anyone can see this" in content
 
     @pytest.mark.asyncio
     async def test_sse_user_data_stream(self, security_app):
@@ -480,10 +473,9 @@ class TestSSESecurityIntegration:
 
             assert response.status_code == 200
             content = await response.aread()
-            content_str = content.decode("utf-8")
 
-            assert "test123" in content_str
-            assert "user_data" in content_str
+            assert b"test123" in content
+            assert b"user_data" in content
 
             # In real app, should validate user_id and authentication
 
@@ -502,6 +494,7 @@ class TestSSESecurityIntegration:
             content = await response.aread()
             # Should not exceed reasonable limits
             assert len(content) < 200000  # Much less than requested 1MB
+            assert b'"truncated":true' in content
 
     @pytest.mark.asyncio
     async def test_sse_connection_limits(self, security_app):
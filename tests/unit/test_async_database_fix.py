@@ -196,3 +196,25 @@ async def test_engine_per_loop_isolation():
     assert engine1_id != engine2_id
 
     await db.close()
+
+
+@pytest.mark.asyncio
+async def test_fast_sqlite_writes_pragmas(tmp_path):
+    """
+    Test that fast_sqlite_writes turns off fsync only when asked to.
+    """
+    fast_db = Database(
+        f"sqlite+aiosqlite:///{tmp_path / 'fast.db'}", fast_sqlite_writes=True
+    )
+    default_db = Database(f"sqlite+aiosqlite:///{tmp_path / 'default.db'}")
+
+    async with fast_db.session() as session:
+        assert (await session.execute(text("PRAGMA synchronous"))).scalar() == 0
+        journal_mode = (await session.execute(text("PRAGMA journal_mode"))).scalar()
+        assert journal_mode == "memory"
+
+    async with default_db.session() as session:
+        assert (await session.execute(text("PRAGMA synchronous"))).scalar() != 0
+
+    await fast_db.close()
+    await default_db.close()
@@ -87,6 +87,29 @@ class TestZenithApplication:
         assert app.middleware[-2].kwargs == {"arg1": "test"}
         assert app.middleware[-1].kwargs == {"arg2": "test2"}
 
+    def test_middleware_replacement_keeps_position(self):
+        """Test re-adding a middleware class replaces it in place."""
+        app = Zenith(debug=True)
+
+        class FirstMiddleware:
+            pass
+
+        class SecondMiddleware:
+            pass
+
+        app.add_middleware(FirstMiddleware, arg1="first")
+        app.add_middleware(SecondMiddleware)
+        count = len(app.middleware)
+
+        app.add_middleware(FirstMiddleware, arg1="second")
+
+        assert len(app.middleware) == count
+        assert app.middleware[-2].cls == FirstMiddleware
+        assert app.middleware[-2].kwargs == {"arg1": "second"}
+
+        with pytest.raises(ValueError, match="already exists"):
+            app.add_middleware(FirstMiddleware, replace=False)
+
     def test_cors_middleware_integration(self):
         """Test CORS middleware integration."""
         app = Zenith(debug=True)
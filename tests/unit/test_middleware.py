@@ -166,6 +166,35 @@ class TestSecurityMiddleware:
             assert headers["x-frame-options"] == "DENY"
             assert headers["content-security-policy"] == "default-src 'self'"
 
+    async def test_security_headers_kwargs_overrides(self):
+        """Test keyword overrides are applied on top of the chosen config."""
+        app = Zenith(debug=True)
+        app.add_security_headers(frame_options="SAMEORIGIN", not_a_field=True)
+
+        @app.get("/test")
+        async def test_endpoint():
+            return {"overridden": True}
+
+        async with TestClient(app) as client:
+            response = await client.get("/test")
+            assert response.headers["x-frame-options"] == "SAMEORIGIN"
+
+    async def test_security_config_is_frozen_and_hashable(self):
+        """Test SecurityConfig is immutable and compares by value."""
+        from dataclasses import FrozenInstanceError
+
+        config = SecurityConfig(
+            frame_options="SAMEORIGIN", trusted_proxies=["10.0.0.1"]
+        )
+        with pytest.raises(FrozenInstanceError):
+            config.frame_options = "DENY"
+
+        assert config.trusted_proxies == frozenset({"10.0.0.1"})
+        assert SecurityConfig().trusted_proxies == frozenset()
+        same = SecurityConfig(frame_options="SAMEORIGIN", trusted_proxies=["10.0.0.1"])
+        assert config == same
+        assert hash(config) == hash(same)
+
 
 @pytest.mark.asyncio
 class TestExceptionMiddleware:
@@ -340,6 +369,156 @@ class TestCORSMiddleware:
             )
             assert response.status_code == 200
 
+    def test_vary_origin_matches_whole_field_names(self):
+        """Test Origin is only treated as present when listed as its own field."""
+        from zenith.middleware.cors import _add_vary_origin
+
+        for upstream, expected in [
+            (b"Accept-Encoding", b"Accept-Encoding, Origin"),
+            (b"X-Origin-Token", b"X-Origin-Token, Origin"),
+            (b"Accept-Encoding, origin", b"Accept-Encoding, origin"),
+            (b"*", b"*"),
+        ]:
+            headers = [(b"vary", upstream)]
+            _add_vary_origin(headers)
+            assert headers == [(b"vary", expected)]
+
+        headers = []
+        _add_vary_origin(headers)
+        assert headers == [(b"vary", b"Origin")]
+
+    async def test_preflight_decisions_are_cached(self):
+        """Test repeated preflight tuples reuse the cached decision."""
+        from zenith.middleware.cors import CORSMiddleware
+
+        async def app(scope, receive, send):
+            pass
+
+        cors = CORSMiddleware(
+            app,
+            allow_origins=["https://example.com"],
+            allow_methods=["GET", "POST"],
+            allow_headers=["Content-Type"],
+        )
+
+        first = cors._evaluate_preflight("https://example.com", b"POST", None)
+        second = cors._evaluate_preflight("https://example.com", b"POST", None)
+        assert first is second
+        assert first[0] == 200
+        assert cors._evaluate_preflight.cache_info().hits == 1
+
+        status, content, headers = cors._evaluate_preflight(
+            "https://example.com", b"POST", b"X-Custom"
+        )
+        assert status == 400
+        assert content == "CORS: Headers not allowed"
+        assert headers == ()
+
+
+class TestCSRFMiddleware:
+    """Test CSRF middleware token handling."""
+
+    def test_verified_tokens_are_cached(self):
+        """Test valid tokens are remembered and invalid ones are not."""
+        from zenith.middleware.csrf import CSRFMiddleware
+
+        csrf = CSRFMiddleware(
+            None, secret_key="test-secret-key-that-is-long-enough-for-csrf"
+        )
+        token = csrf._generate_token("agent")
+
+        assert csrf._validate_token(token, "agent")
+        assert len(csrf._verified_tokens) == 1
+        assert csrf._validate_token(token, "agent")
+        assert len(csrf._verified_tokens) == 1
+
+        # Wrong user agent or tampered signature must not hit the cache
+        assert not csrf._validate_token(token, "other-agent")
+        tampered = token[:-1] + ("1" if token.endswith("0") else "0")
+        assert not csrf._validate_token(tampered, "agent")
+        assert len(csrf._verified_tokens) == 1
+
+    def test_malformed_signatures_rejected(self):
+        """Test short and non-ASCII signatures fail instead of raising."""
+        from zenith.middleware.csrf import CSRFMiddleware
+
+        csrf = CSRFMiddleware(
+            None, secret_key="test-secret-key-that-is-long-enough-for-csrf"
+        )
+        timestamp, random_part, _ = csrf._generate_token().split(":", 2)
+
+        assert not csrf._validate_token(f"{timestamp}:{random_part}:abc")
+        assert not csrf._validate_token(f"{timestamp}:{random_part}:{'é' * 64}")
+
+    def test_exempt_path_patterns(self):
+        """Test exact and wildcard exempt paths."""
+        from zenith.middleware.csrf import CSRFMiddleware
+
+        csrf = CSRFMiddleware(
+            None,
+            secret_key="test-secret-key-that-is-long-enough-for-csrf",
+            exempt_paths={"/health", "/webhooks/*", "/api/v1.0/hooks*"},
+        )
+
+        assert csrf._is_exempt_path("/health")
+        assert csrf._is_exempt_path("/webhooks/stripe")
+        assert csrf._is_exempt_path("/api/v1.0/hooks/github")
+        assert not csrf._is_exempt_path("/health/deep")
+        assert not csrf._is_exempt_path("/webhooks")
+        # Pattern characters in configured paths are matched literally
+        assert not csrf._is_exempt_path("/api/v1x0/hooks")
+
+    def test_exempt_paths_accept_list(self):
+        """Test exempt paths configured as a list behave like a set."""
+        from zenith.middleware.csrf import CSRFMiddleware
+
+        paths = [f"/hooks/{i}" for i in range(200)] + ["/static/*"]
+        csrf = CSRFMiddleware(
+            None,
+            secret_key="test-secret-key-that-is-long-enough-for-csrf",
+            exempt_paths=paths,
+        )
+
+        assert csrf._is_exempt_path("/hooks/199")
+        assert csrf._is_exempt_path("/static/app.js")
+        assert not csrf._is_exempt_path("/hooks/200")
+
+    def test_config_is_frozen_and_normalized(self):
+        """Test CSRFConfig validates, normalizes collections and hides the key."""
+        from dataclasses import FrozenInstanceError
+
+        from zenith.middleware.csrf import CSRFConfig
+
+        with pytest.raises(ValueError, match="at least 32 characters"):
+            CSRFConfig(secret_key="short")
+
+        config = CSRFConfig(
+            secret_key="test-secret-key-that-is-long-enough-for-csrf",
+            header_name="X-Custom-CSRF-Token",
+            exempt_paths=["/health"],
+        )
+        assert config.exempt_paths == frozenset({"/health"})
+        assert config.exempt_methods == frozenset({"GET", "HEAD", "OPTIONS", "TRACE"})
+        assert config.header_key == b"x-custom-csrf-token"
+        assert config.cookie_prefix == b"csrf_token="
+        assert "test-secret-key" not in repr(config)
+
+        with pytest.raises(FrozenInstanceError):
+            config.header_name = "X-Other"
+
+    def test_extract_csrf_cookie(self):
+        """Test the CSRF cookie is found among other cookies by exact name."""
+        from zenith.middleware.csrf import _extract_csrf_cookie
+
+        prefix = b"csrf_token="
+        assert _extract_csrf_cookie(b"csrf_token=abc:1", prefix) == "abc:1"
+        assert (
+            _extract_csrf_cookie(b"session=x; csrf_token=abc; theme=dark", prefix)
+            == "abc"
+        )
+        assert _extract_csrf_cookie(b"xcsrf_token=abc; other=1", prefix) is None
+        assert _extract_csrf_cookie(b"session=x", prefix) is None
+
 
 @pytest.mark.asyncio
 class TestRateLimitMiddleware:
@@ -380,6 +559,147 @@ class TestRateLimitMiddleware:
             response = await client.get("/limited")
             assert response.status_code == 200
 
+    async def test_exempt_check_skips_ip_lookup_without_exempt_ips(self):
+        """Test the client IP is only resolved when exempt IPs are configured."""
+        from unittest.mock import patch
+
+        from zenith.middleware.rate_limit import RateLimitMiddleware
+
+        scope = {
+            "type": "http",
+            "path": "/api",
+            "headers": [],
+            "client": ("1.2.3.4", 1),
+        }
+
+        middleware = RateLimitMiddleware(None, exempt_ips=[], exempt_paths=["/health"])
+        with patch.object(middleware, "_get_client_ip_asgi") as get_ip:
+            assert not middleware._should_exempt_asgi(scope)
+            assert middleware._should_exempt_asgi({**scope, "path": "/health"})
+        get_ip.assert_not_called()
+
+        middleware = RateLimitMiddleware(None, exempt_ips=["1.2.3.4"])
+        assert middleware._should_exempt_asgi(scope)
+
+    async def test_client_ip_resolved_once_per_request(self):
+        """Test forwarded client IP parsing and per-request caching."""
+        from zenith.middleware.rate_limit import RateLimitMiddleware
+
+        middleware = RateLimitMiddleware(None)
+        scope_key = middleware._client_ip_scope_key
+        scope = {
+            "type": "http",
+            "client": ("127.0.0.1", 1),
+            "headers": [(b"x-forwarded-for", b" 203.0.113.7 , 10.0.0.1")],
+        }
+
+        assert middleware._get_client_ip_asgi(scope) == "203.0.113.7"
+        assert scope[scope_key] == "203.0.113.7"
+
+        # Later lookups for the same request reuse the cached value
+        scope["headers"] = []
+        assert middleware._get_client_ip_asgi(scope) == "203.0.113.7"
+
+        # Untrusted peers can't pick their IP via headers
+        untrusted = {**scope, "client": ("198.51.100.1", 1)}
+        del untrusted[scope_key]
+        untrusted["headers"] = [(b"x-real-ip", b"203.0.113.7")]
+        assert middleware._get_client_ip_asgi(untrusted) == "198.51.100.1"
+
+    async def test_client_ip_cache_not_shared_across_proxy_settings(self):
+        """Test limiters trusting different proxies resolve the IP separately."""
+        from zenith.middleware.rate_limit import RateLimitMiddleware
+
+        trusting = RateLimitMiddleware(None, trusted_proxies=["10.0.0.1"])
+        untrusting = RateLimitMiddleware(None, trusted_proxies=[])
+        scope = {
+            "type": "http",
+            "client": ("10.0.0.1", 1),
+            "headers": [(b"x-forwarded-for", b"203.0.113.7")],
+        }
+
+        assert trusting._get_client_ip_asgi(scope) == "203.0.113.7"
+        assert untrusting._get_client_ip_asgi(scope) == "10.0.0.1"
+        assert trusting._get_client_ip_asgi(scope) == "203.0.113.7"
+
+    async def test_exempt_path_patterns(self):
+        """Test exact and wildcard exempt paths."""
+        from zenith.middleware.rate_limit import RateLimitMiddleware
+
+        middleware = RateLimitMiddleware(
+            None, exempt_paths=["/health", "/static/*", "/api/v1.0/hooks*"]
+        )
+
+        assert middleware._is_exempt_path("/health")
+        assert middleware._is_exempt_path("/static/app.js")
+        assert middleware._is_exempt_path("/api/v1.0/hooks/github")
+        assert not middleware._is_exempt_path("/health/deep")
+        assert not middleware._is_exempt_path("/static")
+        # Pattern characters in configured paths are matched literally
+        assert not middleware._is_exempt_path("/api/v1x0/hooks")
+
+    async def test_config_is_frozen_and_normalized(self):
+        """Test limits and config are immutable once built."""
+        from dataclasses import FrozenInstanceError
+
+        from zenith.middleware.rate_limit import (
+            DEFAULT_TRUSTED_PROXIES,
+            MemoryRateLimitStorage,
+            RateLimit,
+            RateLimitConfig,
+        )
+
+        limit = RateLimit(requests=10, window=60)
+        with pytest.raises(FrozenInstanceError):
+            limit.requests = 20
+        assert limit == RateLimit(requests=10, window=60, per="ip")
+        assert hash(limit) == hash(RateLimit(requests=10, window=60, per="ip"))
+
+        config = RateLimitConfig(exempt_paths=["/health"], trusted_proxies=[])
+        with pytest.raises(FrozenInstanceError):
+            config.include_headers = False
+        assert config.exempt_paths == frozenset({"/health"})
+        assert config.exempt_ips == frozenset()
+        assert config.trusted_proxies == frozenset()
+        assert isinstance(config.storage, MemoryRateLimitStorage)
+        assert len(config.default_limits) == 2
+        assert RateLimitConfig().trusted_proxies == DEFAULT_TRUSTED_PROXIES
+
+    async def test_header_limit_resolved_with_limits(self):
+        """Test the header limit is chosen once per limit set, not per request."""
+        from zenith.middleware.rate_limit import RateLimit, RateLimitMiddleware
+
+        default = RateLimit(requests=100, window=60)
+        middleware = RateLimitMiddleware(None, default_limits=[default])
+        strict = RateLimit(requests=5, window=60)
+        middleware.add_endpoint_limit(
+            "/login", [RateLimit(requests=1000, window=3600), strict]
+        )
+
+        assert middleware._match_limits_asgi("/users") == (
+            [default],
+            default,
+            None,
+            False,
+        )
+        limits, header_limit, concurrent_limit, is_endpoint_specific = (
+            middleware._match_limits_asgi("/login/form")
+        )
+        assert len(limits) == 2
+        assert header_limit is strict
+        assert concurrent_limit is None
+        assert is_endpoint_specific
+
+        # Concurrency limits are split off from the windowed limits
+        slots = RateLimit(requests=2, window=60, per="concurrent")
+        middleware.add_endpoint_limit("/upload", [strict, slots])
+        assert middleware._match_limits_asgi("/upload") == (
+            [strict],
+            strict,
+            slots,
+            True,
+        )
+
 
 class TestSecurityUtilities:
     """Test security utility functions."""
@@ -1,10 +1,13 @@
 """Tests for session management functionality."""
 
+import hmac
 from datetime import UTC, datetime, timedelta
 from unittest.mock import AsyncMock, patch
 
+import msgspec
 import pytest
 
+from zenith.sessions.cookie import CookieSessionStore
 from zenith.sessions.manager import Session, SessionManager
 from zenith.sessions.store import SessionStore
 
@@ -362,6 +365,19 @@ class TestSessionManager:
         # Should not save clean session
         mock_store.save.assert_not_called()
 
+    @pytest.mark.asyncio
+    async def test_save_session_in_place_edit(self, session_manager, mock_store):
+        """Test an in-place edit to a decoded container is saved."""
+        session = Session(
+            "test123", is_new=False, raw_data={"cart": msgspec.Raw(b"[1]")}
+        )
+        session["cart"].append(2)
+
+        await session_manager.save_session(session)
+
+        mock_store.save.assert_called_once_with(session)
+        assert session.is_dirty is False
+
     @pytest.mark.asyncio
     async def test_destroy_session(self, session_manager, mock_store):
         """Test destroying session."""
@@ -420,6 +436,148 @@ class TestSessionManager:
         assert config["secure"] is True
         assert config["domain"] == "example.com"
 
+    def test_cookie_header(self, session_manager, mock_store):
+        """Test the Set-Cookie header built from the pre-encoded template."""
+        assert session_manager.cookie_header("abc") == (
+            b"test_session=abc; Max-Age=3600; Path=/; HttpOnly; SameSite=lax"
+        )
+
+        manager = SessionManager(store=mock_store, is_secure=True, domain="example.com")
+        assert manager.cookie_header("abc") == (
+            b"session_id=abc; Max-Age=2592000; Path=/; Domain=example.com; "
+            b"Secure; HttpOnly; SameSite=lax"
+        )
+
+
+class TestCookieSessionStore:
+    """Test signed cookie encoding and decoding."""
+
+    @pytest.fixture
+    def store(self):
+        """Cookie store with a valid secret."""
+        return CookieSessionStore(secret_key="test-secret-key-that-is-long-enough")
+
+    def test_signature_matches_hmac_sha256(self, store):
+        """Test the cached HMAC context signs like a freshly keyed one."""
+        expected = hmac.new(store.secret_key, b"payload", "sha256").hexdigest()
+        assert store._sign_data("payload") == f"payload.{expected}"
+        # Reusing the cached context does not leak state between signatures
+        assert store._sign_data("payload") == f"payload.{expected}"
+
+    def test_cookie_round_trip(self, store):
+        """Test a session survives encoding to and decoding from a cookie."""
+        session = Session("abc123", data={"user_id": 7})
+
+        cookie_value = store.get_cookie_value(session)
+        restored = store.session_from_cookie(cookie_value)
+
+        assert restored.session_id == "abc123"
+        assert restored["user_id"] == 7
+        assert not restored.is_new
+
+    def test_cookie_payload_types(self, store):
+        """Test non-JSON-native session values survive like they did with msgspec."""
+        session = Session("abc123", data={"tags": {"a"}, "scores": {1: 2}})
+
+        restored = store.session_from_cookie(store.get_cookie_value(session))
+
+        assert restored["tags"] == ["a"]
+        assert restored["scores"] == {"1": 2}
+
+    def test_cookie_values_decoded_on_first_access(self, store):
+        """Test values loaded from a cookie are only decoded when read."""
+        session = Session("abc123", data={"user_id": 7, "cart": [1, 2, 3]})
+
+        restored = store.session_from_cookie(store.get_cookie_value(session))
+
+        assert set(restored._raw) == {"user_id", "cart"}
+        assert len(restored) == 2
+        assert "cart" in restored
+
+        assert restored.get("user_id") == 7
+        assert set(restored._raw) == {"cart"}
+        assert not restored.is_dirty
+
+        assert dict(restored.items()) == {"user_id": 7, "cart": [1, 2, 3]}
+        assert restored._raw == {}
+
+    def test_in_place_edit_marks_session_dirty(self, store):
+        """Test editing a decoded container without set() is detected."""
+        session = Session("abc123", data={"cart": [1, 2], "prefs": {"theme": "dark"}})
+        restored = store.session_from_cookie(store.get_cookie_value(session))
+
+        assert restored["cart"] == [1, 2]
+        assert restored["prefs"]["theme"] == "dark"
+        assert not restored.is_dirty
+
+        restored["cart"].append(3)
+
+        # Detected once at save time; is_dirty itself is a plain flag read
+        assert not restored.is_dirty
+        restored._finalize()
+        assert restored.is_dirty
+        restored_again = store.session_from_cookie(store.get_cookie_value(restored))
+        assert restored_again["cart"] == [1, 2, 3]
+
+    def test_cookie_values_replaced_before_decoding(self, store):
+        """Test writing or deleting an undecoded value drops its raw form."""
+        session = Session("abc123", data={"user_id": 7, "role": "user"})
+        restored = store.session_from_cookie(store.get_cookie_value(session))
+
+        restored["role"] = "admin"
+        del restored["user_id"]
+
+        assert restored._raw == {}
+        assert restored.to_dict()["data"] == {"role": "admin"}
+        assert restored.is_dirty
+
+    def test_cookie_value_cached_until_session_changes(self, store):
+        """Test re-encoding an unchanged session reuses the signed value."""
+        session = Session("abc123", data={"user_id": 7})
+        first = store.get_cookie_value(session)
+
+        with patch.object(store, "_sign_data", wraps=store._sign_data) as sign:
+            assert store.get_cookie_value(session) is first
+            sign.assert_not_called()
+
+            session["user_id"] = 8
+            changed = store.get_cookie_value(session)
+            sign.assert_called_once()
+
+        assert changed != first
+        assert store.session_from_cookie(changed)["user_id"] == 8
+
+    def test_cookie_value_cache_is_per_store(self, store):
+        """Test a store never reuses a value signed by another store."""
+        other = CookieSessionStore(secret_key="another-secret-key-that-is-long-enough")
+        session = Session("abc123", data={"user_id": 7})
+
+        other_value = other.get_cookie_value(session)
+
+        assert store.get_cookie_value(session) != other_value
+        assert store.session_from_cookie(other_value) is None
+
+    def test_tampered_cookie_rejected(self, store):
+        """Test a cookie whose payload was altered fails verification."""
+        cookie_value = store.get_cookie_value(Session("abc123", data={"role": "user"}))
+        data, signature = cookie_value.rsplit(".", 1)
+
+        assert store.session_from_cookie(f"{data}x.{signature}") is None
+        assert store.session_from_cookie(data) is None
+
+    def test_wrong_length_signature_rejected_without_hmac(self, store):
+        """Test a signature of the wrong length is rejected before signing."""
+        cookie_value = store.get_cookie_value(Session("abc123", data={"role": "user"}))
+        data, signature = cookie_value.rsplit(".", 1)
+
+        with patch.object(store, "_signature", wraps=store._signature) as sign:
+            assert store.session_from_cookie(f"{data}.{signature}00") is None
+            assert store.session_from_cookie(f"{data}.{signature[:-1]}") is None
+            sign.assert_not_called()
+
+            assert store.session_from_cookie(cookie_value) is not None
+            sign.assert_called_once()
+
 
 class TestSessionIntegration:
     """Test session integration scenarios."""
@@ -21,6 +21,7 @@ from zenith.web.sse import (
     SSEConnection,
     SSEConnectionState,
     SSEEventManager,
+    _event_line,
     create_sse_response,
     sse,
 )
@@ -147,8 +148,13 @@ class TestServerSentEvents:
         event = {"type": "update", "data": {"message": "Hello World"}}
 
         formatted = sse_instance._format_sse_message(event)
-        expected_lines = ["event: update", 'data: {"message": "Hello World"}', "", ""]
-        expected = "\n".join(expected_lines)
+        expected_lines = [
+            b"event: update",
+            b'data: {"message":"Hello World"}',
+            b"",
+            b"",
+        ]
+        expected = b"\n".join(expected_lines)
 
         assert formatted == expected
 
@@ -164,12 +170,12 @@ class TestServerSentEvents:
         }
 
         formatted = sse_instance._format_sse_message(event)
-        lines = formatted.split("\n")
+        lines = formatted.split(b"\n")
 
-        assert "id: 123" in lines
-        assert "event: error" in lines
-        assert "retry: 5000" in lines
-        assert 'data: {"error": "Network timeout"}' in lines
+        assert b"id: 123" in lines
+        assert b"event: error" in lines
+        assert b"retry: 5000" in lines
+        assert b'data: {"error":"Network timeout"}' in lines
 
     def test_format_sse_message_multiline_data(self):
         """Test SSE message formatting with multiline data."""
@@ -178,12 +184,23 @@ class TestServerSentEvents:
         event = {"type": "multiline", "data": "Line 1\nLine 2\nLine 3"}
 
         formatted = sse_instance._format_sse_message(event)
-        lines = formatted.split("\n")
+        lines = formatted.split(b"\n")
+
+        assert b"event: multiline" in lines
+        assert b"data: Line 1" in lines
+        assert b"data: Line 2" in lines
+        assert b"data: Line 3" in lines
+
+    def test_format_sse_message_reuses_event_line(self):
+        """Test the encoded event line is shared by events of the same type."""
+        sse_instance = ServerSentEvents()
+
+        first = sse_instance._format_sse_message({"type": "tick", "data": {"n": 1}})
+        second = sse_instance._format_sse_message({"type": "tick", "data": {"n": 2}})
 
-        assert "event: multiline" in lines
-        assert "data: Line 1" in lines
-        assert "data: Line 2" in lines
-        assert "data: Line 3" in lines
+        assert first == b'event: tick\ndata: {"n":1}\n\n'
+        assert second == b'event: tick\ndata: {"n":2}\n\n'
+        assert _event_line("tick") is _event_line("tick")
 
     def test_generate_connection_id(self):
         """Test connection ID generation uniqueness."""
@@ -238,6 +255,17 @@ class TestServerSentEvents:
         result = await sse_instance._should_throttle_connection(connection)
         assert result is False
 
+    async def test_should_throttle_connection_uses_supplied_time(self):
+        """Test throttling checks against the caller's clock reading."""
+        sse_instance = ServerSentEvents()
+        connection = SSEConnection("test_conn")
+        connection.send_rate_limit = 10.0
+        connection.events_sent = 1
+        connection.last_send_time = 1000.0
+
+        assert await sse_instance._should_throttle_connection(connection, 1000.05)
+        assert not await sse_instance._should_throttle_connection(connection, 1001.0)
+
     async def test_should_throttle_connection_buffer_usage(self):
         """Test connection throttling based on client buffer usage."""
         sse_instance = ServerSentEvents()
@@ -284,6 +312,27 @@ class TestServerSentEvents:
         result = await sse_instance._should_throttle_connection(connection)
         assert result is False
 
+    async def test_process_events_concurrent_preserves_order(self):
+        """Test buffered events are consumed in order until the producer ends."""
+        sse_instance = ServerSentEvents()
+        connection = SSEConnection("test_conn", state=SSEConnectionState.CONNECTED)
+
+        async def events():
+            for i in range(5):
+                yield {"type": "item", "data": {"value": i}}
+                if i == 2:
+                    await asyncio.sleep(0.01)  # Consumer waits on an empty buffer
+
+        received = [
+            event["data"]["value"]
+            async for event in sse_instance._process_events_concurrent(
+                connection, events()
+            )
+        ]
+
+        assert received == [0, 1, 2, 3, 4]
+        assert connection.events_queued == 0
+
     async def test_subscribe_to_channel(self):
         """Test channel subscription functionality."""
         sse_instance = ServerSentEvents()
@@ -377,6 +426,22 @@ class TestServerSentEvents:
         # Should still have SSE headers
         assert response.headers["content-type"] == "text/event-stream"
 
+    def test_stream_response_custom_header_overrides_default(self):
+        """Test a caller header replaces the matching SSE default."""
+        sse_instance = ServerSentEvents()
+
+        async def dummy_generator():
+            yield {"type": "test", "data": "hello"}
+
+        response = sse_instance.stream_response(
+            dummy_generator(), {"Access-Control-Allow-Origin": "https://example.com"}
+        )
+
+        assert response.headers.getlist("access-control-allow-origin") == [
+            "https://example.com"
+        ]
+        assert response.headers["cache-control"] == "no-cache"
+
 
 class TestSSEEventManager:
     """Test SSEEventManager high-level interface."""
@@ -451,20 +516,20 @@ class TestSSEIntegration:
 
         # Check event format
         first_event = events[0]
-        assert "event: count" in first_event
-        assert "data:" in first_event
-        assert first_event.endswith("\n\n")
+        assert b"event: count" in first_event
+        assert b"data:" in first_event
+        assert first_event.endswith(b"\n\n")
 
         # Verify all 3 events are present
         event_values = []
         for event in events:
-            if "value" in event:
+            if b"value" in event:
                 # Extract value from data
-                if '"value": 0' in event:
+                if b'"value":0' in event:
                     event_values.append(0)
-                elif '"value": 1' in event:
+                elif b'"value":1' in event:
                     event_values.append(1)
-                elif '"value": 2' in event:
+                elif b'"value":2' in event:
                     event_values.append(2)
 
         assert 0 in event_values
@@ -573,6 +638,118 @@ class TestSSEIntegration:
             events.append(chunk)
         return events
 
+    @pytest.mark.asyncio
+    async def test_burst_coalesced_into_one_chunk(self):
+        """Test events generated back to back are sent as a single chunk."""
+        sse_instance = ServerSentEvents(enable_adaptive_throttling=False)
+
+        async def burst():
+            for i in range(5):
+                yield {"type": "burst", "data": {"value": i}}
+
+        chunks = await self._collect_events(sse_instance.stream_response(burst()))
+
+        assert len(chunks) == 1
+        assert chunks[0].count(b"event: burst\n") == 5
+        assert chunks[0].count(b"\n\n") == 5
+
+    @pytest.mark.asyncio
+    async def test_coalesced_chunks_capped_at_flush_bytes(self):
+        """Test a buffered chunk is flushed once it reaches flush_bytes."""
+        sse_instance = ServerSentEvents(
+            enable_adaptive_throttling=False, flush_bytes=1024
+        )
+
+        async def burst():
+            for i in range(8):
+                yield {"type": "large", "data": {"value": i, "payload": "x" * 500}}
+
+        chunks = await self._collect_events(sse_instance.stream_response(burst()))
+
+        assert len(chunks) > 1
+        assert all(len(chunk) < 1024 + 600 for chunk in chunks)
+        assert b"".join(chunks).count(b"event: large\n") == 8
+
+    @pytest.mark.asyncio
+    async def test_lone_frame_sent_without_copy(self):
+        """Test a frame flushed on its own is passed through as the same object."""
+        sse_instance = ServerSentEvents()
+        frame = b"event: solo\ndata: {}\n\n"
+
+        async def frames():
+            yield frame
+
+        chunks = [chunk async for chunk in sse_instance._coalesce_frames(frames())]
+
+        assert len(chunks) == 1
+        assert chunks[0] is frame
+
+    @pytest.mark.asyncio
+    async def test_steady_stream_flushed_by_deadline(self):
+        """Test frames arriving faster than flush_interval are still flushed."""
+        sse_instance = ServerSentEvents(flush_interval=0.01)
+
+        async def steady():
+            for _ in range(50):
+                yield b"data: tick\n\n"
+                await asyncio.sleep(0.002)
+
+        chunks = [chunk async for chunk in sse_instance._coalesce_frames(steady())]
+
+        assert len(chunks) >= 3
+        assert b"".join(chunks).count(b"data: tick\n\n") == 50
+
+    @pytest.mark.asyncio
+    async def test_frames_pulled_by_one_task(self):
+        """Test the frame source runs in a single task for the whole stream."""
+        sse_instance = ServerSentEvents(flush_interval=0.001)
+        tasks = set()
+
+        async def frames():
+            for _ in range(5):
+                tasks.add(asyncio.current_task())
+                yield b"data: x\n\n"
+                await asyncio.sleep(0.002)
+
+        chunks = [chunk async for chunk in sse_instance._coalesce_frames(frames())]
+
+        assert b"".join(chunks).count(b"data: x\n\n") == 5
+        assert len(tasks) == 1
+
+    @pytest.mark.asyncio
+    async def test_frame_source_closed_on_disconnect(self):
+        """Test closing the coalesced stream runs the frame source's cleanup."""
+        sse_instance = ServerSentEvents(flush_interval=0.001)
+        closed = asyncio.Event()
+
+        async def endless():
+            try:
+                while True:
+                    yield b"data: x\n\n"
+                    await asyncio.sleep(0.001)
+            finally:
+                closed.set()
+
+        coalesced = sse_instance._coalesce_frames(endless())
+        assert await anext(coalesced)
+        await coalesced.aclose()
+
+        assert closed.is_set()
+
+    @pytest.mark.asyncio
+    async def test_flush_bytes_zero_sends_each_event(self):
+        """Test flush_bytes=0 turns coalescing off."""
+        sse_instance = ServerSentEvents(enable_adaptive_throttling=False, flush_bytes=0)
+
+        async def burst():
+            for i in range(3):
+                yield {"type": "single", "data": {"value": i}}
+
+        chunks = await self._collect_events(sse_instance.stream_response(burst()))
+
+        assert len(chunks) == 3
+        assert all(chunk.count(b"\n\n") == 1 for chunk in chunks)
+
 
 class TestSSEConvenienceFunctions:
     """Test SSE convenience functions and global instances."""
@@ -610,7 +787,7 @@ class TestSSEConvenienceFunctions:
             events.append(chunk)
 
         assert len(events) > 0
-        assert any("convenience" in event for event in events)
+        assert any(b"convenience" in event for event in events)
 
 
 class TestSSEEdgeCases:
@@ -631,6 +808,29 @@ class TestSSEEdgeCases:
         for state in expected_states:
             assert state in states
 
+    def test_oversized_event_data_replaced_with_marker(self):
+        """Test event data over max_event_bytes is replaced by a marker."""
+        sse_instance = ServerSentEvents(max_event_bytes=100)
+
+        formatted = sse_instance._format_sse_message(
+            {"type": "big", "data": "line\n" * 50}
+        )
+        assert formatted == b'event: big\ndata: {"truncated":true,"size":250}\n\n'
+
+        # Data at the cap is sent unchanged
+        formatted = sse_instance._format_sse_message({"type": "ok", "data": "x" * 100})
+        assert formatted == b"event: ok\ndata: " + b"x" * 100 + b"\n\n"
+
+    def test_max_event_bytes_none_disables_cap(self):
+        """Test max_event_bytes=None sends data of any size."""
+        sse_instance = ServerSentEvents(max_event_bytes=None)
+
+        formatted = sse_instance._format_sse_message(
+            {"type": "big", "data": {"payload": "x" * 100000}}
+        )
+        assert len(formatted) > 100000
+        assert b"truncated" not in formatted
+
     def test_sse_message_format_edge_cases(self):
         """Test SSE message formatting with edge case data."""
         sse_instance = ServerSentEvents()
@@ -638,23 +838,23 @@ class TestSSEEdgeCases:
         # Empty data
         event = {"type": "empty", "data": {}}
         formatted = sse_instance._format_sse_message(event)
-        assert "data: {}" in formatted
+        assert b"data: {}" in formatted
 
         # None data
         event = {"type": "none", "data": None}
         formatted = sse_instance._format_sse_message(event)
-        assert "data: None" in formatted
+        assert b"data: None" in formatted
 
         # String data instead of dict
         event = {"type": "string", "data": "plain text"}
         formatted = sse_instance._format_sse_message(event)
-        assert "data: plain text" in formatted
+        assert b"data: plain text" in formatted
 
         # No event type
         event = {"data": {"message": "no type"}}
         formatted = sse_instance._format_sse_message(event)
-        assert "event:" not in formatted
-        assert "data:" in formatted
+        assert b"event:" not in formatted
+        assert b"data:" in formatted
 
     @pytest.mark.asyncio
     async def test_sse_memory_efficiency(self):
@@ -720,7 +920,7 @@ class TestSSEEdgeCases:
 
         # Get first event
         first_event = await iterator.__anext__()
-        assert "long" in first_event
+        assert b"long" in first_event
 
         # Cancel the operation (simulating client disconnect)
         # In a real scenario, this would be handled by the framework
@@ -45,7 +45,13 @@ class Application:
         elif db_url.startswith("sqlite://"):
             db_url = db_url.replace("sqlite://", "sqlite+aiosqlite://")
 
-        self.database = Database(url=db_url, echo=self.config.debug, pool_size=20)
+        self.database = Database(
+            url=db_url,
+            echo=self.config.debug,
+            pool_size=20,
+            # Test databases are disposable, so skip SQLite's fsyncs
+            fast_sqlite_writes=self.config._environment == "test",
+        )
 
         # Register database as default for ZenithModel
         from zenith.core.container import set_default_database
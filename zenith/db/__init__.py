@@ -10,7 +10,7 @@ from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 from weakref import WeakKeyDictionary
 
-from sqlalchemy import MetaData, text
+from sqlalchemy import MetaData, event, text
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -30,6 +30,24 @@ convention = {
 
 metadata = MetaData(naming_convention=convention)
 
+# Pragmas for throwaway SQLite databases: keep the rollback journal and temp
+# tables in memory and never fsync, so a commit is a memcpy, not a disk flush
+FAST_SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=MEMORY",
+    "PRAGMA synchronous=OFF",
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+def _apply_fast_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Connect hook applying FAST_SQLITE_PRAGMAS to each new connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in FAST_SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
 
 class Base(DeclarativeBase):
     """Base class for all database models."""
@@ -54,6 +72,7 @@ class Database:
         max_overflow: int = 30,
         pool_timeout: int = 30,
         pool_recycle: int = 3600,
+        fast_sqlite_writes: bool = False,
     ):
         """
         Initialize database configuration (but NOT the engine).
@@ -67,6 +86,9 @@ class Database:
             max_overflow: Additional connections beyond pool_size
             pool_timeout: Timeout for getting connection from pool
             pool_recycle: Connection lifetime in seconds
+            fast_sqlite_writes: Trade SQLite durability for speed (no fsync,
+                in-memory journal); only for databases that can be lost,
+                such as in test runs
         """
         self.url = url
         self.echo = echo
@@ -74,6 +96,7 @@ class Database:
         self.max_overflow = max_overflow
         self.pool_timeout = pool_timeout
         self.pool_recycle = pool_recycle
+        self.fast_sqlite_writes = fast_sqlite_writes
 
         # Store engines per event loop - this is the KEY FIX
         self._loop_engines: WeakKeyDictionary[
@@ -101,6 +124,10 @@ class Database:
                     self.url,
                     echo=self.echo,
                 )
+                if self.fast_sqlite_writes:
+                    event.listen(
+                        engine.sync_engine, "connect", _apply_fast_sqlite_pragmas
+                    )
             else:
                 engine = create_async_engine(
                     self.url,
@@ -47,6 +47,7 @@ from .logging import (
     setup_structured_logging,
 )
 from .rate_limit import (
+    LimitScope,
     MemoryRateLimitStorage,
     RateLimit,
     RateLimitConfig,
@@ -90,6 +91,7 @@ __all__ = [
     "CompressionMiddleware",
     "ExceptionHandlerMiddleware",
     "JsonFormatter",
+    "LimitScope",
     "MemoryCache",
     "MemoryRateLimitStorage",
     "RateLimit",
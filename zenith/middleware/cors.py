@@ -6,12 +6,40 @@ Essential for APIs that will be called from web applications.
 """
 
 import re
+from functools import lru_cache
 from re import Pattern
 
 from starlette.requests import Request
 from starlette.responses import Response
 from starlette.types import ASGIApp, Receive, Scope, Send
 
+from zenith.core.patterns import HTTP_OPTIONS
+
+# Raw ASGI header names the middleware inspects (ASGI lowercases header names)
+_ORIGIN = b"origin"
+_ACRM = b"access-control-request-method"
+_ACRH = b"access-control-request-headers"
+
+# Pre-encoded response header names and constant values
+_H_ACAO = b"access-control-allow-origin"
+_H_ACAC = b"access-control-allow-credentials"
+_H_ACEH = b"access-control-expose-headers"
+_H_ACAM = b"access-control-allow-methods"
+_H_ACAH = b"access-control-allow-headers"
+_H_ACMA = b"access-control-max-age"
+_TRUE = b"true"
+
+# Responses vary by Origin (and, for preflights, the requested method/headers)
+_VARY = b"vary"
+_VARY_SIMPLE = (_VARY, b"Origin")
+_VARY_PREFLIGHT = (
+    _VARY,
+    b"Origin, Access-Control-Request-Method, Access-Control-Request-Headers",
+)
+
+# Maximum number of distinct preflight decisions memoized per middleware
+PREFLIGHT_CACHE_SIZE = 1024
+
 
 class CORSConfig:
     """Configuration for CORS middleware."""
@@ -98,11 +126,6 @@ class CORSMiddleware:
             self.allow_origin_regex: Pattern | None = None
             if config.allow_origin_regex is not None:
                 self.allow_origin_regex = re.compile(config.allow_origin_regex)
-
-            # Pre-compute encoded header values for performance
-            self._encoded_methods = ", ".join(self.allow_methods).encode("latin-1")
-            self._encoded_headers = ", ".join(self.allow_headers).encode("latin-1")
-            self._encoded_max_age = str(self.max_age).encode("latin-1")
         else:
             # Use individual parameters with defaults
             origins = allow_origins or []
@@ -140,9 +163,34 @@ class CORSMiddleware:
                 self.allow_origin_regex = re.compile(allow_origin_regex)
 
         # Store computed values
+        self._allow_methods_bytes: frozenset[bytes] = frozenset(
+            method.encode("latin-1") for method in self.allow_methods
+        )
         self.allow_all_origins = "*" in self.allow_origins
         self.allow_all_headers = "*" in self.allow_headers
 
+        # Pre-encode every config-derived response header once; only the
+        # allowed origin value varies per request
+        simple_headers: list[tuple[bytes, bytes]] = []
+        if self.allow_credentials:
+            simple_headers.append((_H_ACAC, _TRUE))
+        if self.expose_headers:
+            simple_headers.append(
+                (_H_ACEH, ", ".join(self.expose_headers).encode("latin-1"))
+            )
+        self._simple_headers: tuple[tuple[bytes, bytes], ...] = tuple(simple_headers)
+        self._preflight_headers: tuple[tuple[bytes, bytes], ...] = (
+            (_H_ACAM, ", ".join(self.allow_methods).encode("latin-1")),
+            (_H_ACAH, ", ".join(self.allow_headers).encode("latin-1")),
+            (_H_ACMA, str(self.max_age).encode("latin-1")),
+        )
+
+        # Browsers repeat the same preflight tuple constantly, so cache decisions
+        # keyed by (origin, requested method, requested headers)
+        self._evaluate_preflight = lru_cache(maxsize=PREFLIGHT_CACHE_SIZE)(
+            self._evaluate_preflight_uncached
+        )
+
         # Validation
         if self.allow_all_origins and self.allow_credentials:
             raise ValueError(
@@ -156,33 +204,39 @@ class CORSMiddleware:
             await self.app(scope, receive, send)
             return
 
-        # Get the origin header from scope
-        headers = dict(scope.get("headers", []))
-        origin_bytes = headers.get(b"origin")
+        # Single pass over the raw headers; only three of them matter here
+        origin_bytes = None
+        requested_method = None
+        requested_headers = None
+        for key, value in scope.get("headers", []):
+            if key == _ORIGIN:
+                origin_bytes = value
+            elif key == _ACRM:
+                requested_method = value
+            elif key == _ACRH:
+                requested_headers = value
+
+        # Empty Origin is treated the same as a missing one
         origin = origin_bytes.decode("latin-1") if origin_bytes else None
 
-        # Handle preflight requests (OPTIONS method with specific headers)
-        from zenith.core.patterns import HTTP_OPTIONS
-
-        if scope["method"] == HTTP_OPTIONS and origin:
-            # Check if this is actually a preflight request
-            request_method_header = headers.get(b"access-control-request-method")
-            if request_method_header:
-                # This is a preflight request
-                response = self._handle_preflight_asgi(scope, origin)
-                await response(scope, receive, send)
-                return
+        # Only OPTIONS requests carrying Access-Control-Request-Method are
+        # preflights; plain OPTIONS requests fall through to the app untouched
+        if scope["method"] == HTTP_OPTIONS and origin and requested_method is not None:
+            response = self._handle_preflight_asgi(
+                origin, requested_method, requested_headers
+            )
+            await response(scope, receive, send)
+            return
 
         # Wrap send to add CORS headers to response
         async def send_wrapper(message):
-            if (
-                message["type"] == "http.response.start"
-                and origin
-                and self._is_origin_allowed(origin)
-            ):
-                # Add CORS headers to response
+            if message["type"] == "http.response.start" and origin:
                 response_headers = list(message.get("headers", []))
-                self._add_cors_headers_asgi(response_headers, origin)
+                if self._is_origin_allowed(origin):
+                    self._add_cors_headers_asgi(response_headers, origin_bytes)
+                # Whether CORS headers are present depends on Origin, so shared
+                # caches must key on it either way
+                _add_vary_origin(response_headers)
                 message["headers"] = response_headers
             await send(message)
 
@@ -223,31 +277,52 @@ class CORSMiddleware:
 
         return response
 
-    def _handle_preflight_asgi(self, scope: Scope, origin: str) -> Response:
+    def _handle_preflight_asgi(
+        self,
+        origin: str,
+        requested_method_bytes: bytes | None,
+        requested_headers_bytes: bytes | None,
+    ) -> Response:
         """Handle CORS preflight OPTIONS requests for ASGI."""
+        status_code, content, cors_headers = self._evaluate_preflight(
+            origin, requested_method_bytes, requested_headers_bytes
+        )
+        response = Response(status_code=status_code, content=content)
+        response.raw_headers.extend(cors_headers)
+        response.raw_headers.append(_VARY_PREFLIGHT)
+        return response
+
+    def _evaluate_preflight_uncached(
+        self,
+        origin: str,
+        requested_method_bytes: bytes | None,
+        requested_headers_bytes: bytes | None,
+    ) -> tuple[int, str | None, tuple[tuple[bytes, bytes], ...]]:
+        """
+        Decide a preflight request.
+
+        Returns (status_code, content, cors_headers). The result depends only
+        on the arguments and the middleware configuration, so it is memoized
+        per instance by _evaluate_preflight.
+        """
 
         # Check if origin is allowed
         if not self._is_origin_allowed(origin):
-            return Response(status_code=400, content="CORS: Origin not allowed")
+            return 400, "CORS: Origin not allowed", ()
 
-        # Get requested method and headers from scope
-        headers = dict(scope.get("headers", []))
-        requested_method_bytes = headers.get(b"access-control-request-method")
-        requested_headers_bytes = headers.get(b"access-control-request-headers")
+        # Validate requested method (case-insensitive, checked on raw bytes)
+        if (
+            requested_method_bytes
+            and requested_method_bytes.upper() not in self._allow_methods_bytes
+        ):
+            return 400, "CORS: Method not allowed", ()
 
-        requested_method = (
-            requested_method_bytes.decode("latin-1") if requested_method_bytes else None
-        )
         requested_headers = (
             requested_headers_bytes.decode("latin-1")
             if requested_headers_bytes
             else None
         )
 
-        # Validate requested method
-        if requested_method and requested_method.upper() not in self.allow_methods:
-            return Response(status_code=400, content="CORS: Method not allowed")
-
         # Validate requested headers
         if requested_headers:
             # Fast path for wildcard headers
@@ -258,67 +333,26 @@ class CORSMiddleware:
                 if not all(
                     header in self.allow_headers for header in requested_headers_list
                 ):
-                    return Response(
-                        status_code=400, content="CORS: Headers not allowed"
-                    )
+                    return 400, "CORS: Headers not allowed", ()
 
-        # Create preflight response
-        response = Response(status_code=200)
-        self._add_cors_headers(response, origin, is_preflight=True)
-
-        return response
+        # Preflight succeeded
+        cors_headers: list[tuple[bytes, bytes]] = []
+        self._add_cors_headers_asgi(
+            cors_headers, origin.encode("latin-1"), is_preflight=True
+        )
+        return 200, None, tuple(cors_headers)
 
     def _add_cors_headers_asgi(
-        self, response_headers: list, origin: str, is_preflight: bool = False
+        self,
+        response_headers: list[tuple[bytes, bytes]],
+        origin: bytes,
+        is_preflight: bool = False,
     ) -> None:
         """Add CORS headers to ASGI response headers list."""
-
-        # Set allowed origin
-        response_headers.append(
-            (b"access-control-allow-origin", origin.encode("latin-1"))
-        )
-
-        # Set credentials header if needed
-        if self.allow_credentials:
-            response_headers.append((b"access-control-allow-credentials", b"true"))
-
-        # Set exposed headers
-        if self.expose_headers:
-            expose_value = ", ".join(self.expose_headers)
-            response_headers.append(
-                (b"access-control-expose-headers", expose_value.encode("latin-1"))
-            )
-
-        # Preflight-specific headers (using pre-encoded values for performance)
+        response_headers.append((_H_ACAO, origin))
+        response_headers.extend(self._simple_headers)
         if is_preflight:
-            if hasattr(self, "_encoded_methods"):
-                response_headers.append(
-                    (b"access-control-allow-methods", self._encoded_methods)
-                )
-            else:
-                methods_value = ", ".join(self.allow_methods)
-                response_headers.append(
-                    (b"access-control-allow-methods", methods_value.encode("latin-1"))
-                )
-
-            if hasattr(self, "_encoded_headers"):
-                response_headers.append(
-                    (b"access-control-allow-headers", self._encoded_headers)
-                )
-            else:
-                headers_value = ", ".join(self.allow_headers)
-                response_headers.append(
-                    (b"access-control-allow-headers", headers_value.encode("latin-1"))
-                )
-
-            if hasattr(self, "_encoded_max_age"):
-                response_headers.append(
-                    (b"access-control-max-age", self._encoded_max_age)
-                )
-            else:
-                response_headers.append(
-                    (b"access-control-max-age", str(self.max_age).encode("latin-1"))
-                )
+            response_headers.extend(self._preflight_headers)
 
     def _is_origin_allowed(self, origin: str) -> bool:
         """Check if an origin is allowed."""
@@ -366,6 +400,18 @@ class CORSMiddleware:
             response.headers["access-control-max-age"] = str(self.max_age)
 
 
+def _add_vary_origin(response_headers: list[tuple[bytes, bytes]]) -> None:
+    """Add Origin to the Vary header, merging with any upstream Vary value."""
+    for index, (key, value) in enumerate(response_headers):
+        if key == _VARY:
+            # Compare whole field names: "X-Origin-Token" does not cover Origin
+            tokens = {token.strip().lower() for token in value.split(b",")}
+            if b"*" not in tokens and b"origin" not in tokens:
+                response_headers[index] = (_VARY, value + b", Origin")
+            return
+    response_headers.append(_VARY_SIMPLE)
+
+
 def cors_middleware(
     allow_origins: list[str] | None = None,
     allow_origin_regex: str | None = None,
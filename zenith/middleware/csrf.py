@@ -7,14 +7,56 @@ with configurable token generation and validation.
 
 import hashlib
 import hmac
+import json
+import re
 import secrets
 import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
 
 from starlette.requests import Request
 from starlette.responses import Response
 from starlette.status import HTTP_403_FORBIDDEN
 from starlette.types import ASGIApp, Receive, Scope, Send
 
+from zenith.core.patterns import HTTP_POST
+
+# Maximum number of verified tokens remembered per middleware instance
+VALIDATION_CACHE_SIZE = 4096
+
+# Length of a hex-encoded HMAC-SHA256 token signature
+SIGNATURE_LENGTH = 64
+
+# Methods that never carry state changes and so skip token validation
+DEFAULT_EXEMPT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "TRACE"})
+
+
+def _forbidden_response(
+    error_message: str,
+) -> tuple[tuple[tuple[bytes, bytes], ...], bytes]:
+    """Pre-encode the headers and body of a CSRF 403 response."""
+    body = json.dumps({"error": error_message}).encode()
+    headers = (
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode("latin-1")),
+    )
+    return headers, body
+
+
+def _extract_csrf_cookie(cookie_header: bytes, cookie_prefix: bytes) -> str | None:
+    """Return the value of the cookie whose ``name=`` prefix is given, if any."""
+    for part in cookie_header.split(b";"):
+        part = part.strip()
+        if part.startswith(cookie_prefix):
+            return part[len(cookie_prefix) :].decode("latin-1")
+    return None
+
+
+# Rejections are built once at import; the reject path does no encoding
+_TOKEN_MISSING_RESPONSE = _forbidden_response("CSRF token missing")
+_TOKEN_INVALID_RESPONSE = _forbidden_response("CSRF token invalid or expired")
+
 
 class CSRFError(Exception):
     """CSRF validation error."""
@@ -22,37 +64,44 @@ class CSRFError(Exception):
     pass
 
 
+@dataclass(slots=True, frozen=True)
 class CSRFConfig:
     """Configuration for CSRF middleware."""
 
-    def __init__(
-        self,
-        secret_key: str,
-        token_name: str = "csrf_token",
-        header_name: str = "X-CSRF-Token",
-        cookie_name: str = "csrf_token",
-        cookie_secure: bool = True,
-        cookie_httponly: bool = True,
-        cookie_samesite: str = "Lax",
-        max_age_seconds: int = 3600,  # 1 hour
-        exempt_methods: set[str] | None = None,
-        exempt_paths: set[str] | None = None,
-        require_token: bool = True,
-    ):
-        if len(secret_key) < 32:
+    secret_key: str = field(repr=False)
+    token_name: str = "csrf_token"
+    header_name: str = "X-CSRF-Token"
+    cookie_name: str = "csrf_token"
+    cookie_secure: bool = True
+    cookie_httponly: bool = True
+    cookie_samesite: str = "Lax"
+    max_age_seconds: int = 3600  # 1 hour
+    # Any iterable (usually a list); each is stored as a frozenset
+    exempt_methods: Iterable[str] | None = None
+    exempt_paths: Iterable[str] | None = None
+    require_token: bool = True
+
+    # Derived once here so the middleware never re-encodes per request
+    header_key: bytes = field(init=False, repr=False)
+    cookie_prefix: bytes = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if len(self.secret_key) < 32:
             raise ValueError("CSRF secret key must be at least 32 characters long")
 
-        self.secret_key = secret_key
-        self.token_name = token_name
-        self.header_name = header_name
-        self.cookie_name = cookie_name
-        self.cookie_secure = cookie_secure
-        self.cookie_httponly = cookie_httponly
-        self.cookie_samesite = cookie_samesite
-        self.max_age_seconds = max_age_seconds
-        self.exempt_methods = exempt_methods or {"GET", "HEAD", "OPTIONS", "TRACE"}
-        self.exempt_paths = exempt_paths or set()
-        self.require_token = require_token
+        # Frozen dataclass: normalize and derive through object.__setattr__
+        object.__setattr__(
+            self,
+            "exempt_methods",
+            frozenset(self.exempt_methods or DEFAULT_EXEMPT_METHODS),
+        )
+        object.__setattr__(self, "exempt_paths", frozenset(self.exempt_paths or ()))
+        object.__setattr__(
+            self, "header_key", self.header_name.lower().encode("latin-1")
+        )
+        object.__setattr__(
+            self, "cookie_prefix", f"{self.cookie_name}=".encode("latin-1")
+        )
 
 
 class CSRFMiddleware:
@@ -105,37 +154,68 @@ class CSRFMiddleware:
         """
         self.app = app
 
-        # Use config object if provided, otherwise use individual parameters
-        if config is not None:
-            self.secret_key = config.secret_key.encode()
-            self.token_name = config.token_name
-            self.header_name = config.header_name
-            self.cookie_name = config.cookie_name
-            self.cookie_secure = config.cookie_secure
-            self.cookie_httponly = config.cookie_httponly
-            self.cookie_samesite = config.cookie_samesite
-            self.max_age_seconds = config.max_age_seconds
-            self.exempt_methods = config.exempt_methods
-            self.exempt_paths = config.exempt_paths
-            self.require_token = config.require_token
-        else:
+        # Individual parameters are folded into a config object so both
+        # paths share its validation and derived values
+        if config is None:
             if secret_key is None:
                 raise ValueError("secret_key is required when not using config object")
 
-            if len(secret_key) < 32:
-                raise ValueError("CSRF secret key must be at least 32 characters long")
-
-            self.secret_key = secret_key.encode()
-            self.token_name = token_name
-            self.header_name = header_name
-            self.cookie_name = cookie_name
-            self.cookie_secure = cookie_secure
-            self.cookie_httponly = cookie_httponly
-            self.cookie_samesite = cookie_samesite
-            self.max_age_seconds = max_age_seconds
-            self.exempt_methods = exempt_methods or {"GET", "HEAD", "OPTIONS", "TRACE"}
-            self.exempt_paths = exempt_paths or set()
-            self.require_token = require_token
+            config = CSRFConfig(
+                secret_key=secret_key,
+                token_name=token_name,
+                header_name=header_name,
+                cookie_name=cookie_name,
+                cookie_secure=cookie_secure,
+                cookie_httponly=cookie_httponly,
+                cookie_samesite=cookie_samesite,
+                max_age_seconds=max_age_seconds,
+                exempt_methods=exempt_methods,
+                exempt_paths=exempt_paths,
+                require_token=require_token,
+            )
+
+        self.config = config
+        self.secret_key = config.secret_key.encode()
+        self.token_name = config.token_name
+        self.header_name = config.header_name
+        self.cookie_name = config.cookie_name
+        self.cookie_secure = config.cookie_secure
+        self.cookie_httponly = config.cookie_httponly
+        self.cookie_samesite = config.cookie_samesite
+        self.max_age_seconds = config.max_age_seconds
+        self.exempt_methods = config.exempt_methods
+        self.exempt_paths = config.exempt_paths
+        self.require_token = config.require_token
+
+        # Header and cookie lookups compare raw ASGI bytes
+        self._header_key = config.header_key
+        self._cookie_prefix = config.cookie_prefix
+
+        # Keyed HMAC-SHA256 state with the secret already absorbed; each
+        # signature copies it instead of re-deriving the key pads
+        self._hmac_template = hmac.new(self.secret_key, digestmod=hashlib.sha256)
+
+        # Exact exempt paths go in a frozenset: exempt_paths may be given as a
+        # list, and membership must not scan it
+        self._exempt_exact = frozenset(
+            path for path in self.exempt_paths if not path.endswith("*")
+        )
+
+        # Compile "/prefix*" exempt patterns into one anchored alternation so
+        # matching cost doesn't grow with the number of patterns
+        exempt_prefixes = sorted(
+            path[:-1] for path in self.exempt_paths if path.endswith("*")
+        )
+        self._exempt_prefix_match = (
+            re.compile("|".join(map(re.escape, exempt_prefixes))).match
+            if exempt_prefixes
+            else None
+        )
+
+        # LRU of tokens whose signature already verified, keyed by a
+        # fixed-length digest of (token, user agent). The secret is fixed per
+        # instance, so entries never need invalidating on key change.
+        self._verified_tokens: OrderedDict[bytes, None] = OrderedDict()
 
     def _generate_token(self, user_agent: str = "") -> str:
         """
@@ -151,12 +231,16 @@ class CSRFMiddleware:
         # Create signature based on timestamp, random part, and user agent
         # IP intentionally excluded to avoid token invalidation on network change
         message = f"{timestamp}:{random_part}:{user_agent}"
-        signature = hmac.new(
-            self.secret_key, message.encode(), hashlib.sha256
-        ).hexdigest()
+        signature = self._sign(message)
 
         return f"{timestamp}:{random_part}:{signature}"
 
+    def _sign(self, message: str) -> str:
+        """Return the hex HMAC-SHA256 signature of message."""
+        mac = self._hmac_template.copy()
+        mac.update(message.encode())
+        return mac.hexdigest()
+
     def _validate_token(self, token: str, user_agent: str = "") -> bool:
         """Validate a CSRF token."""
         try:
@@ -165,17 +249,36 @@ class CSRFMiddleware:
         except (ValueError, IndexError):
             return False
 
-        # Check token age
+        # Signature length is public, so rejecting on it leaks nothing
+        if len(signature) != SIGNATURE_LENGTH:
+            return False
+
+        # Check token age (always, even for cached tokens)
         if time.time() - timestamp > self.max_age_seconds:
             return False
 
+        # Browsers replay the same token for a whole session; skip the HMAC
+        # for tokens that already verified
+        cache_key = hashlib.blake2b(
+            f"{token}\0{user_agent}".encode(), digest_size=16
+        ).digest()
+        if cache_key in self._verified_tokens:
+            self._verified_tokens.move_to_end(cache_key)
+            return True
+
         # Verify signature (IP intentionally excluded)
         message = f"{timestamp_str}:{random_part}:{user_agent}"
-        expected_signature = hmac.new(
-            self.secret_key, message.encode(), hashlib.sha256
-        ).hexdigest()
+        expected_signature = self._sign(message)
+
+        # Constant-time compare on bytes (str compare_digest rejects non-ASCII)
+        if not hmac.compare_digest(signature.encode(), expected_signature.encode()):
+            return False
 
-        return hmac.compare_digest(signature, expected_signature)
+        # Only successful validations are cached, so failures can't fill it
+        self._verified_tokens[cache_key] = None
+        if len(self._verified_tokens) > VALIDATION_CACHE_SIZE:
+            self._verified_tokens.popitem(last=False)
+        return True
 
     def _get_token_from_request(self, request: Request) -> str | None:
         """Extract CSRF token from request (deprecated - use async version)."""
@@ -188,101 +291,118 @@ class CSRFMiddleware:
         if request.method in self.exempt_methods:
             return True
 
+        return self._is_exempt_path(request.url.path)
+
+    def _is_exempt_path(self, path: str) -> bool:
+        """Check if a path is exempt from CSRF protection."""
         # Check path exemptions
-        path = request.url.path
-        if path in self.exempt_paths:
+        if path in self._exempt_exact:
             return True
 
         # Check path patterns
-        for exempt_path in self.exempt_paths:
-            if exempt_path.endswith("*") and path.startswith(exempt_path[:-1]):
-                return True
-
-        return False
+        return (
+            self._exempt_prefix_match is not None
+            and self._exempt_prefix_match(path) is not None
+        )
 
     def _get_user_agent(self, request: Request) -> str:
         """Get client user agent for CSRF token binding."""
         return request.headers.get("User-Agent", "")
 
+    def _scan_headers(
+        self, headers: list[tuple[bytes, bytes]]
+    ) -> tuple[str | None, bytes | None, str]:
+        """Return the CSRF header, raw cookie header and user agent in one pass."""
+        submitted_token = None
+        cookie_header = None
+        user_agent = None
+        for key, value in headers:
+            if key == self._header_key:
+                if submitted_token is None:
+                    submitted_token = value.decode("latin-1")
+            elif key == b"cookie":
+                if cookie_header is None:
+                    cookie_header = value
+            elif key == b"user-agent" and user_agent is None:
+                user_agent = value.decode("latin-1")
+        return submitted_token, cookie_header, user_agent or ""
+
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """ASGI3 interface implementation with CSRF protection."""
         if scope["type"] != "http":
             await self.app(scope, receive, send)
             return
 
-        request = Request(scope, receive)
-
-        # Skip CSRF for exempt requests
-        if self._should_exempt(request):
-            await self._handle_exempt_request(request, scope, receive, send)
+        # Exempt paths (webhooks, health checks) never need tokens: hand off
+        # before building a Request or touching cookies
+        if self._is_exempt_path(scope["path"]):
+            await self.app(scope, receive, send)
             return
 
-        # Get user agent for token validation
-        user_agent = self._get_user_agent(request)
-
-        # Get existing token from cookie
-        existing_token = request.cookies.get(self.cookie_name)
+        # One pass over the raw headers picks up everything the checks below
+        # need, without building Starlette's Headers or a Request
+        submitted_token, cookie_header, user_agent = self._scan_headers(
+            scope["headers"]
+        )
 
-        if self.require_token:
-            # Get token from request (need to read form data if POST)
-            submitted_token = await self._get_token_from_request_async(request)
+        # Safe methods skip validation; they only get a CSRF cookie issued
+        if scope["method"] not in self.exempt_methods and self.require_token:
+            # Fall back to form data for POST requests without the header
+            if not submitted_token and scope["method"] == HTTP_POST:
+                submitted_token = await self._get_token_from_form(
+                    Request(scope, receive)
+                )
 
             # Validate submitted token
             if not submitted_token:
-                await self._send_csrf_error(send, "CSRF token missing")
+                await self._send_csrf_error(send, _TOKEN_MISSING_RESPONSE)
                 return
 
             if not self._validate_token(submitted_token, user_agent):
-                await self._send_csrf_error(send, "CSRF token invalid or expired")
+                await self._send_csrf_error(send, _TOKEN_INVALID_RESPONSE)
                 return
 
-        # Process request with CSRF cookie handling
-        await self._handle_protected_request(
-            request, scope, receive, send, existing_token, user_agent
+        # Get existing token from cookie
+        existing_token = (
+            _extract_csrf_cookie(cookie_header, self._cookie_prefix)
+            if cookie_header
+            else None
         )
 
-    async def _handle_exempt_request(
-        self, request: Request, scope: Scope, receive: Receive, send: Send
-    ) -> None:
-        """Handle exempt requests with CSRF cookie setting."""
-        await self._handle_request_with_csrf_cookie(
-            request, scope, receive, send, None, None
-        )
+        # Clients that already hold a good cookie skip minting a token and the
+        # Set-Cookie; they still get the token header, since an HttpOnly
+        # cookie is the only other place it lives
+        if self._needs_new_token(existing_token, user_agent):
+            await self._handle_request_with_csrf_cookie(
+                scope, receive, send, user_agent
+            )
+        else:
+            await self._handle_request_with_token_header(
+                scope, receive, send, existing_token
+            )
 
-    async def _handle_protected_request(
-        self,
-        request: Request,
-        scope: Scope,
-        receive: Receive,
-        send: Send,
-        existing_token: str | None,
-        user_agent: str,
-    ) -> None:
-        """Handle protected requests with CSRF validation and cookie setting."""
-        await self._handle_request_with_csrf_cookie(
-            request, scope, receive, send, existing_token, user_agent
-        )
+    def _needs_new_token(self, existing_token: str | None, user_agent: str) -> bool:
+        """Check whether the client's CSRF cookie must be (re)issued."""
+        if not existing_token or not self._validate_token(existing_token, user_agent):
+            return True
+
+        # Rotate tokens past half their lifetime so the cookie is replaced
+        # well before it expires; the timestamp parsed cleanly in validation
+        issued_at = int(existing_token.split(":", 1)[0])
+        return time.time() - issued_at > self.max_age_seconds / 2
 
     async def _handle_request_with_csrf_cookie(
         self,
-        request: Request,
         scope: Scope,
         receive: Receive,
         send: Send,
-        existing_token: str | None,
-        user_agent: str | None,
+        user_agent: str,
     ) -> None:
-        """Handle request and set CSRF cookie on response."""
-        if user_agent is None:
-            user_agent = self._get_user_agent(request)
-
-        # Determine if we need a new token
-        new_token = None
-        if not existing_token or not self._validate_token(existing_token, user_agent):
-            new_token = self._generate_token(user_agent)
+        """Handle request and set a new CSRF cookie on the response."""
+        new_token = self._generate_token(user_agent)
 
         async def send_wrapper(message):
-            if message["type"] == "http.response.start" and new_token:
+            if message["type"] == "http.response.start":
                 # Add CSRF cookie to response headers
                 headers = list(message.get("headers", []))
 
@@ -305,21 +425,38 @@ class CSRFMiddleware:
 
         await self.app(scope, receive, send_wrapper)
 
-    async def _send_csrf_error(self, send: Send, error_message: str) -> None:
-        """Send CSRF error response."""
-        response_body = f'{{"error": "{error_message}"}}'.encode()
+    async def _handle_request_with_token_header(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        token: str,
+    ) -> None:
+        """Handle request and echo the client's current CSRF token."""
+        token_header = (b"x-csrf-token", token.encode("latin-1"))
 
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), token_header]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _send_csrf_error(
+        self,
+        send: Send,
+        error_response: tuple[tuple[tuple[bytes, bytes], ...], bytes],
+    ) -> None:
+        """Send a pre-encoded CSRF error response."""
+        headers, body = error_response
         await send(
             {
                 "type": "http.response.start",
                 "status": HTTP_403_FORBIDDEN,
-                "headers": [
-                    (b"content-type", b"application/json"),
-                    (b"content-length", str(len(response_body)).encode("latin-1")),
-                ],
+                "headers": list(headers),
             }
         )
-        await send({"type": "http.response.body", "body": response_body})
+        await send({"type": "http.response.body", "body": body})
 
     async def _get_token_from_request_async(self, request: Request) -> str | None:
         """Extract CSRF token from request (async version for form data)."""
@@ -329,17 +466,21 @@ class CSRFMiddleware:
             return token
 
         # Try form data for POST requests
-        from zenith.core.patterns import HTTP_POST
-
         if request.method == HTTP_POST:
-            try:
-                form_data = await request.form()
-                token = form_data.get(self.token_name)
-                if token:
-                    return str(token)
-            except Exception:
-                # Form parsing failed, continue to other methods
-                pass
+            return await self._get_token_from_form(request)
+
+        return None
+
+    async def _get_token_from_form(self, request: Request) -> str | None:
+        """Extract CSRF token from submitted form data."""
+        try:
+            form_data = await request.form()
+            token = form_data.get(self.token_name)
+            if token:
+                return str(token)
+        except Exception:
+            # Form parsing failed, continue to other methods
+            pass
 
         return None
 
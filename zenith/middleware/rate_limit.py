@@ -10,10 +10,16 @@ Provides configurable request rate limiting with support for:
 - In-memory storage for single-instance deployments
 """
 
-import asyncio
 import logging
+import math
+import re
 import time
-from dataclasses import dataclass
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from enum import IntEnum
+from functools import lru_cache
+from itertools import islice
 
 from starlette.requests import Request
 from starlette.responses import JSONResponse, Response
@@ -25,14 +31,112 @@ logger = logging.getLogger("zenith.middleware.rate_limit")
 # Default trusted proxy IPs - only trust X-Forwarded-For from these
 DEFAULT_TRUSTED_PROXIES = frozenset(["127.0.0.1", "::1", "localhost"])
 
+# Every this many increments, sample the least recently used entries
+EXPIRE_SAMPLE_EVERY = 128
+
+# Number of entries examined per expiry sample
+EXPIRE_SAMPLE_SIZE = 20
+
+# Prefix of the scope key under which the resolved client IP is cached for one
+# request; the full key also names the trusted proxies it was resolved with
+CLIENT_IP_SCOPE_KEY = "zenith.client_ip"
+
+# Value of the single "RateLimit" header from draft-ietf-httpapi-ratelimit-headers;
+# reset is the seconds left in the current window and is left out when the
+# storage cannot tell
+RFC_HEADER_TEMPLATE = b"limit=%d, remaining=%d, reset=%d"
+RFC_HEADER_NO_RESET_TEMPLATE = b"limit=%d, remaining=%d"
+
+# Atomic INCR that only sets the TTL when it creates the key: one round trip,
+# no window without an expiry, and later hits don't push the window back
+INCREMENT_SCRIPT = """
+local count = redis.call('INCR', KEYS[1])
+if count == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+return count
+"""
+
+
+class LimitScope(IntEnum):
+    """What a rate limit counts requests against."""
 
-@dataclass(slots=True)
+    IP = 0
+    USER = 1
+    ENDPOINT = 2
+    CONCURRENT = 3  # Requests in flight per client; the window is ignored
+
+
+@dataclass(slots=True, frozen=True)
 class RateLimit:
     """Rate limit configuration."""
 
     requests: int  # Number of requests allowed
     window: int  # Time window in seconds
-    per: str = "ip"  # Rate limit per: 'ip', 'user', 'endpoint'
+    per: str = "ip"  # Rate limit per: 'ip', 'user', 'endpoint', 'concurrent'
+    limit_scope: LimitScope = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Resolve the type once so key generation indexes a table instead of
+        # comparing strings on every request. Frozen dataclass, so the
+        # derived fields go through object.__setattr__.
+        if isinstance(self.per, LimitScope):
+            object.__setattr__(self, "limit_scope", self.per)
+            object.__setattr__(self, "per", self.per.name.lower())
+            return
+        try:
+            limit_scope = LimitScope[self.per.upper()]
+        except (AttributeError, KeyError):
+            raise ValueError(f"Unknown rate limit type: {self.per}") from None
+        object.__setattr__(self, "limit_scope", limit_scope)
+
+
+def _plan_limits(
+    limits: list[RateLimit],
+) -> tuple[list[RateLimit], RateLimit | None, RateLimit | None]:
+    """Split a limit set into (window limits, header limit, concurrency limit).
+
+    Concurrency limits never touch storage, so they are kept apart from the
+    windowed limits; the lowest one is the only one that can bind.
+    """
+    window_limits = [
+        limit for limit in limits if limit.limit_scope is not LimitScope.CONCURRENT
+    ]
+    if len(window_limits) == len(limits):
+        return limits, _most_restrictive(limits), None
+
+    concurrent_limit = min(
+        (limit for limit in limits if limit.limit_scope is LimitScope.CONCURRENT),
+        key=lambda limit: limit.requests,
+    )
+    return window_limits, _most_restrictive(window_limits), concurrent_limit
+
+
+def _most_restrictive(limits: list[RateLimit]) -> RateLimit | None:
+    """Return the limit with the lowest allowed request rate, if any."""
+    if not limits:
+        return None
+    if len(limits) == 1:
+        return limits[0]
+    return min(limits, key=lambda limit: limit.requests / limit.window)
+
+
+def _rfc_header_value(requests: int, remaining: int, reset: float | None) -> bytes:
+    """Encode the draft-RFC RateLimit header value."""
+    if reset is None:
+        return RFC_HEADER_NO_RESET_TEMPLATE % (requests, remaining)
+    # Round up so a window with time left never reports reset=0
+    return RFC_HEADER_TEMPLATE % (requests, remaining, math.ceil(reset))
+
+
+@lru_cache(maxsize=256)
+def _limit_headers(requests: int, window: int) -> tuple[tuple[bytes, bytes], ...]:
+    """Encode the X-RateLimit-Limit and X-RateLimit-Window headers for a limit."""
+    # Limits are fixed at configuration time, so each pair is encoded once
+    return (
+        (b"x-ratelimit-limit", str(requests).encode("latin-1")),
+        (b"x-ratelimit-window", str(window).encode("latin-1")),
+    )
 
 
 class RateLimitStorage:
@@ -46,103 +150,179 @@ class RateLimitStorage:
         """Increment request count and return new count."""
         raise NotImplementedError
 
+    async def increment_many(self, items: list[tuple[str, int]]) -> list[int]:
+        """Increment several (key, window) counters and return their new counts.
+
+        Backends override this to batch the updates; the default increments
+        each key in turn.
+        """
+        return [await self.increment(key, window) for key, window in items]
+
     async def reset(self, key: str) -> None:
         """Reset request count for key."""
         raise NotImplementedError
 
+    # The middleware reads time.monotonic() once per request and calls the
+    # hooks below with it. By default they ignore the reading and use the
+    # public methods, so storages that only implement those keep working;
+    # backends with their own expiry clock override them.
+
+    async def _get_count_at(self, key: str, now: float) -> int:
+        """Get the request count for key as of ``now``."""
+        return await self.get_count(key)
+
+    async def _increment_at(self, key: str, window: int, now: float) -> int:
+        """Increment the counter for key as of ``now``."""
+        return await self.increment(key, window)
+
+    async def _increment_many_at(
+        self, items: list[tuple[str, int]], now: float
+    ) -> list[int]:
+        """Increment several counters as of ``now``."""
+        return await self.increment_many(items)
+
+    async def _get_usage_at(self, key: str, now: float) -> tuple[int, float | None]:
+        """Get the count for key and the seconds until its window resets.
+
+        The reset time is None when the backend does not track it.
+        """
+        return await self._get_count_at(key, now), None
+
 
 class MemoryRateLimitStorage(RateLimitStorage):
-    """In-memory rate limit storage with automatic cleanup."""
+    """In-memory rate limit storage with automatic cleanup.
+
+    Expired entries are removed inline rather than by a background task:
+    every ``EXPIRE_SAMPLE_EVERY`` increments the least recently used entries
+    are sampled, and a full sweep runs at most once per ``cleanup_interval``.
+    """
 
     __slots__ = (
         "_cleanup_interval",
-        "_cleanup_task",
-        "_lock",
         "_max_entries",
+        "_next_cleanup",
+        "_operations",
         "_storage",
     )
 
     def __init__(self, cleanup_interval: int = 300, max_entries: int = 10000):
-        self._storage: dict[str, tuple[int, float]] = {}
-        self._lock = asyncio.Lock()
+        # No lock: every read-modify-write below runs without awaiting, so
+        # on the event loop it is already atomic with respect to other tasks
+        self._storage: OrderedDict[str, tuple[int, float]] = OrderedDict()
         self._cleanup_interval = cleanup_interval  # 5 minutes
         self._max_entries = max_entries
-        self._cleanup_task: asyncio.Task | None = None
-        self._start_cleanup()
+        self._next_cleanup = time.monotonic() + cleanup_interval
+        self._operations = 0
 
-    async def get_count(self, key: str) -> int:
-        """Get current request count for key."""
-        async with self._lock:
-            if key not in self._storage:
-                return 0
+    async def get_count(self, key: str, now: float | None = None) -> int:
+        """Get current request count for key, optionally as of ``now``."""
+        return await self._get_count_at(key, time.monotonic() if now is None else now)
 
-            count, expires_at = self._storage[key]
-            if time.time() > expires_at:
-                del self._storage[key]
-                return 0
+    async def increment(self, key: str, window: int, now: float | None = None) -> int:
+        """Increment request count and return new count."""
+        return await self._increment_at(
+            key, window, time.monotonic() if now is None else now
+        )
 
-            return count
+    async def increment_many(
+        self, items: list[tuple[str, int]], now: float | None = None
+    ) -> list[int]:
+        """Increment several (key, window) counters in one synchronous pass."""
+        return await self._increment_many_at(
+            items, time.monotonic() if now is None else now
+        )
 
-    async def increment(self, key: str, window: int) -> int:
-        """Increment request count and return new count."""
-        async with self._lock:
-            current_time = time.time()
-            expires_at = current_time + window
-
-            if key not in self._storage:
-                # Perform size-based cleanup if needed (before adding new entry)
-                if len(self._storage) >= self._max_entries:
-                    await self._cleanup_expired()
-                    # If still at max capacity after removing expired, remove oldest
-                    if len(self._storage) >= self._max_entries:
-                        # Remove oldest entry (by expiration time)
-                        oldest_key = min(
-                            self._storage.keys(), key=lambda k: self._storage[k][1]
-                        )
-                        self._storage.pop(oldest_key, None)
-
-                self._storage[key] = (1, expires_at)
-                return 1
-
-            count, old_expires_at = self._storage[key]
-
-            # Reset if window expired
-            if current_time > old_expires_at:
-                self._storage[key] = (1, expires_at)
-                return 1
-
-            # Increment within window
-            new_count = count + 1
-            self._storage[key] = (new_count, old_expires_at)
-            return new_count
+    async def _get_count_at(self, key: str, now: float) -> int:
+        """Get the request count for key as of ``now``."""
+        entry = self._storage.get(key)
+        if entry is None:
+            return 0
+
+        count, expires_at = entry
+        if now > expires_at:
+            del self._storage[key]
+            return 0
+
+        return count
+
+    async def _get_usage_at(self, key: str, now: float) -> tuple[int, float | None]:
+        """Get the count for key and the seconds until its window resets."""
+        entry = self._storage.get(key)
+        if entry is None or now > entry[1]:
+            return 0, None
+        count, expires_at = entry
+        return count, expires_at - now
+
+    async def _increment_at(self, key: str, window: int, now: float) -> int:
+        """Increment the counter for key as of ``now``."""
+        count = self._bump(key, window, now)
+        self._expire_lazily(now)
+        return count
+
+    async def _increment_many_at(
+        self, items: list[tuple[str, int]], now: float
+    ) -> list[int]:
+        """Increment several counters as of ``now``."""
+        counts = [self._bump(key, window, now) for key, window in items]
+        self._expire_lazily(now)
+        return counts
+
+    def _bump(self, key: str, window: int, current_time: float) -> int:
+        """Increment a counter as of ``current_time`` and return the new count."""
+        # Each key holds a fixed-window (count, expires_at) pair, so a
+        # hit is one dict lookup and one store regardless of traffic
+        entry = self._storage.get(key)
+
+        if entry is None:
+            # At capacity, evict the least recently used keys from the
+            # front of the OrderedDict instead of scanning for a victim
+            while len(self._storage) >= self._max_entries:
+                self._storage.popitem(last=False)
+
+            self._storage[key] = (1, current_time + window)
+            return 1
+
+        # Keep recently hit keys at the back, away from eviction
+        self._storage.move_to_end(key)
+        count, expires_at = entry
+
+        # Reset if window expired
+        if current_time > expires_at:
+            self._storage[key] = (1, current_time + window)
+            return 1
+
+        # Increment within window
+        self._storage[key] = (count + 1, expires_at)
+        return count + 1
 
     async def reset(self, key: str) -> None:
         """Reset request count for key."""
-        async with self._lock:
-            self._storage.pop(key, None)
-
-    def _start_cleanup(self) -> None:
-        """Start the background cleanup task."""
-        if self._cleanup_task is None or self._cleanup_task.done():
-            self._cleanup_task = asyncio.create_task(self._periodic_cleanup())
+        self._storage.pop(key, None)
+
+    def _expire_lazily(self, current_time: float) -> None:
+        """Drop expired entries as a side effect of normal traffic."""
+        self._operations += 1
+        if current_time >= self._next_cleanup:
+            # Full sweep, amortized over the whole cleanup interval
+            self._next_cleanup = current_time + self._cleanup_interval
+            self._remove_expired(current_time)
+        elif self._operations % EXPIRE_SAMPLE_EVERY == 0:
+            # Least recently used entries sit at the front and are the most
+            # likely to have expired
+            self._remove_expired(
+                current_time, islice(self._storage.items(), EXPIRE_SAMPLE_SIZE)
+            )
 
-    async def _periodic_cleanup(self) -> None:
-        """Periodic cleanup of expired entries."""
-        try:
-            while True:
-                await asyncio.sleep(self._cleanup_interval)
-                async with self._lock:
-                    await self._cleanup_expired()
-        except asyncio.CancelledError:
-            logger.debug("Rate limit cleanup task cancelled")
-
-    async def _cleanup_expired(self) -> None:
-        """Remove expired entries from storage."""
-        current_time = time.time()
+    def _remove_expired(
+        self,
+        current_time: float,
+        entries: Iterable[tuple[str, tuple[int, float]]] | None = None,
+    ) -> None:
+        """Remove expired entries, from ``entries`` or the whole storage."""
+        if entries is None:
+            entries = self._storage.items()
         expired_keys = [
-            key
-            for key, (_, expires_at) in self._storage.items()
-            if current_time > expires_at
+            key for key, (_, expires_at) in entries if current_time > expires_at
         ]
         for key in expired_keys:
             self._storage.pop(key, None)
@@ -151,9 +331,11 @@ class MemoryRateLimitStorage(RateLimitStorage):
             logger.debug(f"Cleaned up {len(expired_keys)} expired rate limit entries")
 
     def stop_cleanup(self) -> None:
-        """Stop the background cleanup task."""
-        if self._cleanup_task and not self._cleanup_task.done():
-            self._cleanup_task.cancel()
+        """Stop background cleanup.
+
+        Kept for compatibility: expiry now happens inline, so there is no
+        task to stop.
+        """
 
     def get_storage_stats(self) -> dict:
         """Get storage statistics for monitoring."""
@@ -161,8 +343,9 @@ class MemoryRateLimitStorage(RateLimitStorage):
             "total_entries": len(self._storage),
             "max_entries": self._max_entries,
             "cleanup_interval": self._cleanup_interval,
-            "cleanup_task_running": self._cleanup_task is not None
-            and not self._cleanup_task.done(),
+            # No background task since cleanup became lazy; kept for
+            # dashboards that read this field
+            "cleanup_task_running": False,
         }
 
 
@@ -172,6 +355,7 @@ class RedisRateLimitStorage(RateLimitStorage):
     def __init__(self, redis_client, key_prefix: str = "rate_limit:"):
         self.redis = redis_client
         self.key_prefix = key_prefix
+        self._increment_script = None
 
     def _make_key(self, key: str) -> str:
         return f"{self.key_prefix}{key}"
@@ -184,49 +368,86 @@ class RedisRateLimitStorage(RateLimitStorage):
 
     async def increment(self, key: str, window: int) -> int:
         """Increment request count and return new count."""
+        # Expiry is tracked by Redis itself, so no local clock is involved
         redis_key = self._make_key(key)
 
-        # Use Redis pipeline for atomic operations
-        async with self.redis.pipeline() as pipe:
-            await pipe.incr(redis_key)
-            await pipe.expire(redis_key, window)
+        # Registered on first use; the script object runs EVALSHA and
+        # reloads the script itself if Redis answers NOSCRIPT
+        if self._increment_script is None:
+            self._increment_script = self.redis.register_script(INCREMENT_SCRIPT)
+
+        count = await self._increment_script(keys=[redis_key], args=[window])
+        return int(count)
+
+    async def increment_many(self, items: list[tuple[str, int]]) -> list[int]:
+        """Increment several counters in one pipelined round trip."""
+        if self._increment_script is None:
+            self._increment_script = self.redis.register_script(INCREMENT_SCRIPT)
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key, window in items:
+                await self._increment_script(
+                    keys=[self._make_key(key)], args=[window], client=pipe
+                )
             results = await pipe.execute()
 
-            return int(results[0])
+        return [int(count) for count in results]
 
     async def reset(self, key: str) -> None:
         """Reset request count for key."""
         redis_key = self._make_key(key)
         await self.redis.delete(redis_key)
 
+    async def _get_usage_at(self, key: str, now: float) -> tuple[int, float | None]:
+        """Get the count and remaining window TTL in one pipelined round trip."""
+        redis_key = self._make_key(key)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.get(redis_key)
+            pipe.pttl(redis_key)
+            count, ttl_ms = await pipe.execute()
+
+        # PTTL is negative when the key is missing or has no expiry
+        if not count or ttl_ms < 0:
+            return (int(count) if count else 0), None
+        return int(count), ttl_ms / 1000
+
 
+@dataclass(slots=True, frozen=True)
 class RateLimitConfig:
     """Configuration for rate limiting middleware."""
 
-    def __init__(
-        self,
-        default_limits: list[RateLimit] | None = None,
-        storage: RateLimitStorage | None = None,
-        exempt_paths: list[str] | None = None,
-        exempt_ips: list[str] | None = None,
-        trusted_proxies: list[str] | None = None,
-        error_message: str = "Rate limit exceeded",
-        include_headers: bool = True,
-    ):
-        self.default_limits = default_limits or [
-            RateLimit(requests=1000, window=3600, per="ip"),  # 1000/hour
-            RateLimit(requests=100, window=60, per="ip"),  # 100/minute
-        ]
-        self.storage = storage or MemoryRateLimitStorage()
-        self.exempt_paths = exempt_paths if exempt_paths is not None else []
-        self.exempt_ips = exempt_ips if exempt_ips is not None else []
-        self.trusted_proxies = (
-            trusted_proxies
-            if trusted_proxies is not None
-            else list(DEFAULT_TRUSTED_PROXIES)
+    default_limits: list[RateLimit] | None = None
+    storage: RateLimitStorage | None = None
+    # Any iterable (usually a list); each is stored as a frozenset
+    exempt_paths: Iterable[str] | None = None
+    exempt_ips: Iterable[str] | None = None
+    trusted_proxies: Iterable[str] | None = None
+    error_message: str = "Rate limit exceeded"
+    include_headers: bool = True
+    rfc_headers: bool = False
+
+    def __post_init__(self) -> None:
+        # Frozen dataclass: fill in defaults through object.__setattr__
+        if not self.default_limits:
+            object.__setattr__(
+                self,
+                "default_limits",
+                [
+                    RateLimit(requests=1000, window=3600, per="ip"),  # 1000/hour
+                    RateLimit(requests=100, window=60, per="ip"),  # 100/minute
+                ],
+            )
+        if self.storage is None:
+            object.__setattr__(self, "storage", MemoryRateLimitStorage())
+        object.__setattr__(self, "exempt_paths", frozenset(self.exempt_paths or ()))
+        object.__setattr__(self, "exempt_ips", frozenset(self.exempt_ips or ()))
+        object.__setattr__(
+            self,
+            "trusted_proxies",
+            frozenset(self.trusted_proxies)
+            if self.trusted_proxies is not None
+            else DEFAULT_TRUSTED_PROXIES,
         )
-        self.error_message = error_message
-        self.include_headers = include_headers
 
 
 class RateLimitMiddleware:
@@ -236,9 +457,10 @@ class RateLimitMiddleware:
     Features:
     - Multiple rate limits per application
     - Per-IP, per-user, or per-endpoint limiting
+    - Concurrent (in-flight) request limits per client
     - Configurable time windows
     - Custom error responses
-    - Exempt paths and IP addresses
+    - Exempt paths (exact or "/prefix*") and IP addresses
     - Redis or memory storage
     """
 
@@ -255,6 +477,7 @@ class RateLimitMiddleware:
         trusted_proxies: list[str] | None = None,
         error_message: str = "Rate limit exceeded",
         include_headers: bool = True,
+        rfc_headers: bool = False,
     ):
         self.app = app
 
@@ -267,6 +490,7 @@ class RateLimitMiddleware:
             self.trusted_proxies = set(config.trusted_proxies)
             self.error_message = config.error_message
             self.include_headers = config.include_headers
+            self.rfc_headers = config.rfc_headers
         else:
             # Use individual parameters with defaults
             self.default_limits = default_limits or [
@@ -283,10 +507,46 @@ class RateLimitMiddleware:
             )
             self.error_message = error_message
             self.include_headers = include_headers
+            self.rfc_headers = rfc_headers
+
+        # Instances can trust different proxies (e.g. a global limiter and a
+        # route-specific one), so the cached client IP is keyed by that setting
+        self._client_ip_scope_key = (
+            f"{CLIENT_IP_SCOPE_KEY}:{','.join(sorted(self.trusted_proxies))}"
+        )
+
+        # "/prefix*" exempt paths become one anchored alternation, matched by
+        # the regex engine in a single call; literal paths stay a set lookup
+        exempt_prefixes = sorted(
+            path[:-1] for path in self.exempt_paths if path.endswith("*")
+        )
+        self._exempt_prefix_match = (
+            re.compile("|".join(map(re.escape, exempt_prefixes))).match
+            if exempt_prefixes
+            else None
+        )
 
         # Per-endpoint limits
         self.endpoint_limits: dict[str, list[RateLimit]] = {}
 
+        # Key builders indexed by LimitScope
+        self._key_builders = (
+            self._ip_key_asgi,
+            self._user_key_asgi,
+            self._endpoint_key_asgi,
+            self._concurrent_key_asgi,
+        )
+
+        # Limits are fixed once configured, so each limit set is split into
+        # windowed limits, the header limit and any concurrency limit up front
+        self._default_plan = _plan_limits(self.default_limits)
+        self._endpoint_plans: dict[
+            str, tuple[list[RateLimit], RateLimit | None, RateLimit | None]
+        ] = {}
+
+        # Requests currently in flight per concurrency-limit key
+        self._in_flight: dict[str, int] = {}
+
         logger.info(
             f"Rate limiting enabled with {len(self.default_limits)} default limits"
         )
@@ -294,6 +554,7 @@ class RateLimitMiddleware:
     def add_endpoint_limit(self, path: str, limits: list[RateLimit]) -> None:
         """Add custom rate limits for specific endpoint."""
         self.endpoint_limits[path] = limits
+        self._endpoint_plans[path] = _plan_limits(limits)
         logger.info(f"Added custom rate limits for {path}: {limits}")
 
     def _get_client_ip(self, request: Request) -> str:
@@ -382,19 +643,35 @@ class RateLimitMiddleware:
             client_ip = self._get_client_ip(request)
             return f"endpoint:{path}:{client_ip}:{rate_limit.window}"
 
+        elif rate_limit.per == "concurrent":
+            client_ip = self._get_client_ip(request)
+            if is_endpoint_specific:
+                return f"concurrent:{client_ip}:{path}"
+            return f"concurrent:{client_ip}"
+
         else:
             raise ValueError(f"Unknown rate limit type: {rate_limit.per}")
 
+    def _is_exempt_path(self, path: str) -> bool:
+        """Check if a path is exempt, by exact match or "/prefix*" pattern."""
+        if path in self.exempt_paths:
+            return True
+
+        return (
+            self._exempt_prefix_match is not None
+            and self._exempt_prefix_match(path) is not None
+        )
+
     def _should_exempt(self, request: Request) -> bool:
         """Check if request should be exempted from rate limiting."""
         # Check exempt paths
-        path = request.url.path
-        if path in self.exempt_paths:
+        if self._is_exempt_path(request.url.path):
             return True
 
         # Check exempt IPs
-        client_ip = self._get_client_ip(request)
-        return client_ip in self.exempt_ips
+        if not self.exempt_ips:
+            return False
+        return self._get_client_ip(request) in self.exempt_ips
 
     def _get_applicable_limits(self, request: Request) -> list[RateLimit]:
         """Get rate limits applicable to this request."""
@@ -477,8 +754,61 @@ class RateLimitMiddleware:
             await self.app(scope, receive, send)
             return
 
-        # Get applicable rate limits
-        limits = self._get_applicable_limits_asgi(scope)
+        # Get applicable rate limits, the one the headers describe and any
+        # limit on requests in flight
+        limits, header_limit, concurrent_limit, is_endpoint_specific = (
+            self._match_limits_asgi(scope.get("path", ""))
+        )
+
+        # Concurrency limits count requests in flight instead of requests per
+        # window: no clock, no storage, just a counter held around the app. The
+        # slot is checked and reserved first so a concurrency rejection never
+        # uses up window quota
+        slot_key = None
+        if concurrent_limit is not None:
+            slot_key = self._get_rate_limit_key_asgi(
+                scope, concurrent_limit, is_endpoint_specific
+            )
+            in_flight = self._in_flight.get(slot_key, 0)
+            if in_flight >= concurrent_limit.requests:
+                logger.warning(
+                    f"Concurrency limit exceeded for {slot_key}: "
+                    f"{in_flight + 1}/{concurrent_limit.requests}"
+                )
+                error_response = self._create_error_response_asgi(
+                    concurrent_limit, in_flight + 1, concurrent_limit.requests, scope
+                )
+                await error_response(scope, receive, send)
+                return
+
+            # No lock: nothing awaits between the check above and this update
+            self._in_flight[slot_key] = in_flight + 1
+
+        try:
+            await self._call_with_window_limits(
+                scope, receive, send, limits, header_limit, is_endpoint_specific
+            )
+        finally:
+            if slot_key is not None:
+                in_flight = self._in_flight[slot_key] - 1
+                if in_flight:
+                    self._in_flight[slot_key] = in_flight
+                else:
+                    del self._in_flight[slot_key]
+
+    async def _call_with_window_limits(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        limits: list[RateLimit],
+        header_limit: RateLimit | None,
+        is_endpoint_specific: bool,
+    ) -> None:
+        """Check the windowed limits, then run the app or send a 429."""
+        # Read the clock once; every limit check and the header lookup for
+        # this request share the same instant
+        now = time.monotonic()
 
         # Check rate limits
         (
@@ -486,7 +816,7 @@ class RateLimitMiddleware:
             violated_limit,
             current_count,
             limit_count,
-        ) = await self._check_rate_limits_asgi(scope, limits)
+        ) = await self._check_rate_limits_asgi(scope, limits, now, is_endpoint_specific)
 
         if not allowed:
             client_ip = self._get_client_ip_asgi(scope)
@@ -495,58 +825,90 @@ class RateLimitMiddleware:
                 f"Rate limit exceeded for {client_ip} "
                 f"on {path}: {current_count}/{limit_count}"
             )
+            reset = None
+            if self.include_headers and self.rfc_headers:
+                # Only rejected requests pay for looking up the window's TTL
+                _, reset = await self._get_usage(
+                    self._get_rate_limit_key_asgi(
+                        scope, violated_limit, is_endpoint_specific
+                    ),
+                    now,
+                )
             error_response = self._create_error_response_asgi(
-                violated_limit, current_count, limit_count, scope
+                violated_limit, current_count, limit_count, scope, reset
             )
             await error_response(scope, receive, send)
             return
 
+        if self.include_headers and header_limit:
+            app_send = self._send_with_limit_headers(
+                scope, send, header_limit, is_endpoint_specific, now
+            )
+        else:
+            app_send = send
+
+        await self.app(scope, receive, app_send)
+
+    def _send_with_limit_headers(
+        self,
+        scope: Scope,
+        send: Send,
+        most_restrictive: RateLimit,
+        is_endpoint_specific: bool,
+        now: float,
+    ) -> Send:
+        """Wrap send to add rate limit headers to the response start."""
+        # Resolve the header key before the app runs, so the send wrapper
+        # only fetches the count and appends bytes
+        key = self._get_rate_limit_key_asgi(
+            scope, most_restrictive, is_endpoint_specific
+        )
+        requests = most_restrictive.requests
+        window = most_restrictive.window
+        rfc_headers = self.rfc_headers
+        limit_headers = () if rfc_headers else _limit_headers(requests, window)
+
         # Wrap send to add rate limit headers to successful responses
         async def send_wrapper(message):
-            if (
-                message["type"] == "http.response.start"
-                and self.include_headers
-                and limits
-            ):
-                # Check if this is an endpoint-specific limit
-                path = scope.get("path", "")
-                is_endpoint_specific = any(
-                    path.startswith(endpoint_path)
-                    for endpoint_path in self.endpoint_limits
-                )
-                # Use the most restrictive limit for headers
-                most_restrictive = min(
-                    limits, key=lambda limit: limit.requests / limit.window
-                )
-                key = self._get_rate_limit_key_asgi(
-                    scope, most_restrictive, is_endpoint_specific
-                )
-                current = await self.storage.get_count(key)
-
-                response_headers = list(message.get("headers", []))
-                response_headers.extend(
-                    [
-                        (
-                            b"x-ratelimit-limit",
-                            str(most_restrictive.requests).encode("latin-1"),
-                        ),
+            if message["type"] == "http.response.start":
+                # Build the new header list in one allocation. The incoming
+                # list may be shared (e.g. a reused Response's raw_headers),
+                # so it is never extended in place.
+                if rfc_headers:
+                    # One coalesced header, with the time left in the window
+                    current, reset = await self._get_usage(key, now)
+                    message["headers"] = [
+                        *message.get("headers", ()),
                         (
-                            b"x-ratelimit-window",
-                            str(most_restrictive.window).encode("latin-1"),
-                        ),
-                        (
-                            b"x-ratelimit-remaining",
-                            str(max(0, most_restrictive.requests - current)).encode(
-                                "latin-1"
+                            b"ratelimit",
+                            _rfc_header_value(
+                                requests, max(0, requests - current), reset
                             ),
                         ),
                     ]
-                )
-                message["headers"] = response_headers
+                else:
+                    storage = self.storage
+                    if isinstance(storage, RateLimitStorage):
+                        current = await storage._get_count_at(key, now)
+                    else:
+                        current = await storage.get_count(key)
+                    remaining = max(0, requests - current)
+                    message["headers"] = [
+                        *message.get("headers", ()),
+                        *limit_headers,
+                        (b"x-ratelimit-remaining", str(remaining).encode("latin-1")),
+                    ]
 
             await send(message)
 
-        await self.app(scope, receive, send_wrapper)
+        return send_wrapper
+
+    async def _get_usage(self, key: str, now: float) -> tuple[int, float | None]:
+        """Get a counter and the seconds until its window resets, if known."""
+        storage = self.storage
+        if isinstance(storage, RateLimitStorage):
+            return await storage._get_usage_at(key, now)
+        return await storage.get_count(key), None
 
     # ASGI-specific helper methods
     def _get_client_ip_asgi(self, scope: Scope) -> str:
@@ -554,25 +916,43 @@ class RateLimitMiddleware:
 
         Security: Only trusts X-Forwarded-For/X-Real-IP headers when the
         direct connection is from a trusted proxy.
+
+        The result is cached in the scope: the exemption check, every limit
+        key and the response headers all need it for the same request. The
+        cache key includes the trusted proxies, so middleware instances with
+        different proxy settings never share an answer.
         """
+        scope_key = self._client_ip_scope_key
+        client_ip = scope.get(scope_key)
+        if client_ip is None:
+            client_ip = self._resolve_client_ip_asgi(scope)
+            scope[scope_key] = client_ip
+        return client_ip
+
+    def _resolve_client_ip_asgi(self, scope: Scope) -> str:
+        """Work out the client IP from the connection and trusted proxy headers."""
         # Get the direct connection IP
         client = scope.get("client")
         direct_ip = client[0] if client else "unknown"
 
         # Only trust proxy headers if request comes from a trusted proxy
         if direct_ip in self.trusted_proxies:
-            headers = dict(scope.get("headers", []))
-
-            # Check X-Forwarded-For header (for proxies)
-            forwarded_for_bytes = headers.get(b"x-forwarded-for")
-            if forwarded_for_bytes:
-                forwarded_for = forwarded_for_bytes.decode("latin-1")
-                return forwarded_for.split(",")[0].strip()
+            # One pass over the raw headers; like a dict, the last value wins
+            forwarded_for = real_ip = None
+            for key, value in scope.get("headers", ()):
+                if key == b"x-forwarded-for":
+                    forwarded_for = value
+                elif key == b"x-real-ip":
+                    real_ip = value
+
+            # Check X-Forwarded-For header (for proxies); only the leftmost
+            # entry, the original client, is split off and decoded
+            if forwarded_for:
+                return forwarded_for.split(b",", 1)[0].strip().decode("latin-1")
 
             # Check X-Real-IP header
-            real_ip_bytes = headers.get(b"x-real-ip")
-            if real_ip_bytes:
-                return real_ip_bytes.decode("latin-1").strip()
+            if real_ip:
+                return real_ip.strip().decode("latin-1")
 
         # Fall back to direct connection IP
         return direct_ip
@@ -619,45 +999,79 @@ class RateLimitMiddleware:
         self, scope: Scope, rate_limit: RateLimit, is_endpoint_specific: bool = False
     ) -> str:
         """Generate rate limit key based on limit type for ASGI requests."""
-        path = scope.get("path", "")
-
-        if rate_limit.per == "ip":
-            client_ip = self._get_client_ip_asgi(scope)
-            # Include path in key for endpoint-specific limits
-            if is_endpoint_specific:
-                return f"ip:{client_ip}:{path}:{rate_limit.window}"
-            return f"ip:{client_ip}:{rate_limit.window}"
+        return self._key_builders[rate_limit.limit_scope](
+            scope, rate_limit.window, is_endpoint_specific
+        )
 
-        elif rate_limit.per == "user":
-            user_id = self._get_user_id_asgi(scope)
-            if not user_id:
-                # Fall back to IP if no user
-                client_ip = self._get_client_ip_asgi(scope)
-                if is_endpoint_specific:
-                    return f"ip:{client_ip}:{path}:{rate_limit.window}"
-                return f"ip:{client_ip}:{rate_limit.window}"
-            # Include path in key for endpoint-specific limits
-            if is_endpoint_specific:
-                return f"user:{user_id}:{path}:{rate_limit.window}"
-            return f"user:{user_id}:{rate_limit.window}"
+    def _ip_key_asgi(
+        self, scope: Scope, window: int, is_endpoint_specific: bool
+    ) -> str:
+        """Build the key for a per-IP limit."""
+        client_ip = self._get_client_ip_asgi(scope)
+        # Include path in key for endpoint-specific limits
+        if is_endpoint_specific:
+            return f"ip:{client_ip}:{scope.get('path', '')}:{window}"
+        return f"ip:{client_ip}:{window}"
 
-        elif rate_limit.per == "endpoint":
-            client_ip = self._get_client_ip_asgi(scope)
-            return f"endpoint:{path}:{client_ip}:{rate_limit.window}"
+    def _user_key_asgi(
+        self, scope: Scope, window: int, is_endpoint_specific: bool
+    ) -> str:
+        """Build the key for a per-user limit, falling back to the client IP."""
+        user_id = self._get_user_id_asgi(scope)
+        if not user_id:
+            return self._ip_key_asgi(scope, window, is_endpoint_specific)
+        # Include path in key for endpoint-specific limits
+        if is_endpoint_specific:
+            return f"user:{user_id}:{scope.get('path', '')}:{window}"
+        return f"user:{user_id}:{window}"
+
+    def _endpoint_key_asgi(
+        self, scope: Scope, window: int, is_endpoint_specific: bool
+    ) -> str:
+        """Build the key for a per-endpoint limit."""
+        client_ip = self._get_client_ip_asgi(scope)
+        return f"endpoint:{scope.get('path', '')}:{client_ip}:{window}"
 
-        else:
-            raise ValueError(f"Unknown rate limit type: {rate_limit.per}")
+    def _concurrent_key_asgi(
+        self, scope: Scope, window: int, is_endpoint_specific: bool
+    ) -> str:
+        """Build the key for a per-client concurrency limit."""
+        client_ip = self._get_client_ip_asgi(scope)
+        if is_endpoint_specific:
+            return f"concurrent:{client_ip}:{scope.get('path', '')}"
+        return f"concurrent:{client_ip}"
 
     def _should_exempt_asgi(self, scope: Scope) -> bool:
         """Check if ASGI request should be exempted from rate limiting."""
         # Check exempt paths
-        path = scope.get("path", "")
-        if path in self.exempt_paths:
+        if self._is_exempt_path(scope.get("path", "")):
             return True
 
-        # Check exempt IPs
-        client_ip = self._get_client_ip_asgi(scope)
-        return client_ip in self.exempt_ips
+        # Check exempt IPs. Resolving the client IP may mean scanning proxy
+        # headers, so skip it entirely when no IPs are exempt.
+        if not self.exempt_ips:
+            return False
+        return self._get_client_ip_asgi(scope) in self.exempt_ips
+
+    def _match_limits_asgi(
+        self, path: str
+    ) -> tuple[list[RateLimit], RateLimit | None, RateLimit | None, bool]:
+        """
+        Resolve the limits for a path in one pass over the endpoint prefixes.
+
+        Returns:
+            (window_limits, header_limit, concurrent_limit, is_endpoint_specific)
+        """
+        for endpoint_path, limits in self.endpoint_limits.items():
+            if path.startswith(endpoint_path):
+                plan = self._endpoint_plans.get(endpoint_path)
+                if plan is None:
+                    # endpoint_limits was filled in directly, not via
+                    # add_endpoint_limit
+                    plan = _plan_limits(limits)
+                return (*plan, True)
+
+        return (*self._default_plan, False)
 
     def _get_applicable_limits_asgi(self, scope: Scope) -> list[RateLimit]:
         """Get rate limits applicable to this ASGI request."""
@@ -672,7 +1086,11 @@ class RateLimitMiddleware:
         return self.default_limits
 
     async def _check_rate_limits_asgi(
-        self, scope: Scope, limits: list[RateLimit]
+        self,
+        scope: Scope,
+        limits: list[RateLimit],
+        now: float | None = None,
+        is_endpoint_specific: bool | None = None,
     ) -> tuple[bool, RateLimit | None, int, int]:
         """
         Check all applicable rate limits for ASGI requests.
@@ -680,28 +1098,84 @@ class RateLimitMiddleware:
         Returns:
             (allowed, violated_limit, current_count, limit_count)
         """
+        if now is None:
+            now = time.monotonic()
+
         # Check if this is an endpoint-specific limit
-        path = scope.get("path", "")
-        is_endpoint_specific = any(
-            path.startswith(endpoint_path) for endpoint_path in self.endpoint_limits
-        )
+        if is_endpoint_specific is None:
+            path = scope.get("path", "")
+            is_endpoint_specific = any(
+                path.startswith(endpoint_path) for endpoint_path in self.endpoint_limits
+            )
 
-        for rate_limit in limits:
+        if not limits:
+            # Only a concurrency limit applies; nothing to count in storage
+            return True, None, 0, 0
+
+        # Storages outside the RateLimitStorage hierarchy only get the
+        # documented public API, without the shared clock reading
+        storage = self.storage
+        clock_aware = isinstance(storage, RateLimitStorage)
+
+        if len(limits) == 1:
+            rate_limit = limits[0]
             key = self._get_rate_limit_key_asgi(scope, rate_limit, is_endpoint_specific)
-            current_count = await self.storage.increment(key, rate_limit.window)
+            if clock_aware:
+                count = await storage._increment_at(key, rate_limit.window, now)
+            else:
+                count = await storage.increment(key, rate_limit.window)
+            counts = [count]
+        else:
+            # Several limits cost one storage call (one lock, one round trip)
+            items = [
+                (
+                    self._get_rate_limit_key_asgi(
+                        scope, rate_limit, is_endpoint_specific
+                    ),
+                    rate_limit.window,
+                )
+                for rate_limit in limits
+            ]
+            if clock_aware:
+                counts = await storage._increment_many_at(items, now)
+            else:
+                counts = await storage.increment_many(items)
 
+        for rate_limit, current_count in zip(limits, counts, strict=True):
             if current_count > rate_limit.requests:
                 return False, rate_limit, current_count, rate_limit.requests
 
         return True, None, 0, 0
 
     def _create_error_response_asgi(
-        self, rate_limit: RateLimit, current_count: int, limit_count: int, scope: Scope
+        self,
+        rate_limit: RateLimit,
+        current_count: int,
+        limit_count: int,
+        scope: Scope,
+        reset: float | None = None,
     ) -> Response:
-        """Create rate limit exceeded response for ASGI requests."""
+        """Create rate limit exceeded response for ASGI requests.
+
+        ``reset`` is the number of seconds until the violated window resets,
+        when the storage reports it; it only feeds the draft-RFC headers.
+        """
         headers = {}
 
-        if self.include_headers:
+        if self.include_headers and self.rfc_headers:
+            headers.update(
+                {
+                    "RateLimit": _rfc_header_value(
+                        rate_limit.requests,
+                        max(0, rate_limit.requests - current_count),
+                        reset,
+                    ).decode("latin-1"),
+                    "Retry-After": str(
+                        rate_limit.window if reset is None else math.ceil(reset)
+                    ),
+                }
+            )
+        elif self.include_headers:
             headers.update(
                 {
                     "X-RateLimit-Limit": str(rate_limit.requests),
@@ -7,52 +7,44 @@ and other security enhancements.
 
 import hmac
 import secrets
+from collections.abc import Iterable
+from dataclasses import dataclass
 from urllib.parse import urlparse
 
 from starlette.responses import Response
 from starlette.types import ASGIApp, Receive, Scope, Send
 
 
+@dataclass(slots=True, frozen=True)
 class SecurityConfig:
     """Configuration for security middleware."""
 
-    def __init__(
-        self,
-        # Content Security Policy
-        csp_policy: str | None = None,
-        csp_report_only: bool = False,
-        # HTTP Strict Transport Security
-        hsts_max_age: int = 31536000,  # 1 year
-        hsts_include_subdomains: bool = True,
-        hsts_preload: bool = False,
-        # Frame Options
-        frame_options: str = "DENY",  # DENY, SAMEORIGIN, or ALLOW-FROM
-        # Content Type Options
-        content_type_nosniff: bool = True,
-        # Referrer Policy
-        referrer_policy: str = "strict-origin-when-cross-origin",
-        # Permissions Policy (formerly Feature Policy)
-        permissions_policy: str | None = None,
-        # Trusted Proxies
-        trusted_proxies: list[str] | None = None,
-        # Force HTTPS
-        force_https: bool = False,
-        force_https_permanent: bool = False,
-    ):
-        self.csp_policy = csp_policy
-        self.csp_report_only = csp_report_only
-        self.hsts_max_age = hsts_max_age
-        self.hsts_include_subdomains = hsts_include_subdomains
-        self.hsts_preload = hsts_preload
-        self.frame_options = frame_options
-        self.content_type_nosniff = content_type_nosniff
-        self.referrer_policy = referrer_policy
-        self.permissions_policy = permissions_policy
-
-        # Network security
-        self.trusted_proxies = trusted_proxies or []
-        self.force_https = force_https
-        self.force_https_permanent = force_https_permanent
+    # Content Security Policy
+    csp_policy: str | None = None
+    csp_report_only: bool = False
+    # HTTP Strict Transport Security
+    hsts_max_age: int = 31536000  # 1 year
+    hsts_include_subdomains: bool = True
+    hsts_preload: bool = False
+    # Frame Options
+    frame_options: str | None = "DENY"  # DENY, SAMEORIGIN, or ALLOW-FROM
+    # Content Type Options
+    content_type_nosniff: bool = True
+    # Referrer Policy
+    referrer_policy: str | None = "strict-origin-when-cross-origin"
+    # Permissions Policy (formerly Feature Policy)
+    permissions_policy: str | None = None
+    # Trusted Proxies; any iterable (usually a list), stored as a frozenset
+    trusted_proxies: Iterable[str] | None = None
+    # Force HTTPS
+    force_https: bool = False
+    force_https_permanent: bool = False
+
+    def __post_init__(self) -> None:
+        # Frozen dataclass: normalize through object.__setattr__ so it stays hashable
+        object.__setattr__(
+            self, "trusted_proxies", frozenset(self.trusted_proxies or ())
+        )
 
 
 class SecurityHeadersMiddleware:
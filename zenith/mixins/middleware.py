@@ -30,6 +30,8 @@ Note: Some middleware like CORS must be added early in the stack to handle
 preflight requests before authentication middleware.
 """
 
+import dataclasses
+
 
 class MiddlewareMixin:
     """Mixin for middleware configuration methods."""
@@ -63,17 +65,16 @@ class MiddlewareMixin:
                 # Re-raise the validation error
                 raise
 
-        # Check for existing middleware of the same class
-        existing_middleware = [mw.cls for mw in self.middleware]
-        middleware_exists = middleware_class in existing_middleware
+        # Find existing middleware of the same class in a single pass
+        existing_index = next(
+            (i for i, mw in enumerate(self.middleware) if mw.cls == middleware_class),
+            None,
+        )
 
-        if middleware_exists and not allow_duplicates:
+        if existing_index is not None and not allow_duplicates:
             if replace:
-                # Replace existing middleware with the same class
-                for i, mw in enumerate(self.middleware):
-                    if mw.cls == middleware_class:
-                        self.middleware[i] = Middleware(middleware_class, **kwargs)
-                        break
+                # Replace existing middleware in place, keeping its position
+                self.middleware[existing_index] = Middleware(middleware_class, **kwargs)
             else:
                 # Raise error if duplicate middleware and not replacing
                 raise ValueError(
@@ -148,10 +149,11 @@ class MiddlewareMixin:
             else:
                 config = get_development_security_config()
 
-        # Apply any kwargs overrides
-        for key, value in kwargs.items():
-            if hasattr(config, key):
-                setattr(config, key, value)
+        # Apply any kwargs overrides; SecurityConfig is frozen, so build a copy
+        field_names = {field.name for field in dataclasses.fields(config)}
+        overrides = {key: value for key, value in kwargs.items() if key in field_names}
+        if overrides:
+            config = dataclasses.replace(config, **overrides)
 
         # Remove existing SecurityHeadersMiddleware if present
         from starlette.middleware import Middleware
@@ -9,14 +9,31 @@ from __future__ import annotations
 import base64
 import hmac
 import logging
+from datetime import datetime
 
 import msgspec
 
+from zenith.core.json_encoder import _json_dumps
 from zenith.sessions.manager import Session
 from zenith.sessions.store import SessionStore
 
 logger = logging.getLogger("zenith.sessions.cookie")
 
+# Hex-encoded HMAC-SHA256 signatures are always this long
+_SIGNATURE_LENGTH = 64
+
+
+class _CookiePayload(msgspec.Struct):
+    """Decoded cookie envelope; session values stay raw until read."""
+
+    session_id: str
+    created_at: datetime
+    expires_at: datetime | None = None
+    data: dict[str, msgspec.Raw] = {}
+
+
+_payload_decoder = msgspec.json.Decoder(_CookiePayload)
+
 
 class CookieSessionStore(SessionStore):
     """
@@ -57,13 +74,18 @@ class CookieSessionStore(SessionStore):
 
         self.secret_key = secret_key.encode()
         self.max_cookie_size = max_cookie_size
+        # Keyed once; copying it per cookie skips re-deriving the HMAC pads
+        self._hmac = hmac.new(self.secret_key, digestmod="sha256")
+
+    def _signature(self, data: str) -> str:
+        """Compute the hex HMAC-SHA256 signature of data."""
+        mac = self._hmac.copy()
+        mac.update(data.encode())
+        return mac.hexdigest()
 
     def _sign_data(self, data: str) -> str:
         """Sign data with HMAC."""
-        signature = hmac.new(
-            self.secret_key, data.encode(), digestmod="sha256"
-        ).hexdigest()
-        return f"{data}.{signature}"
+        return f"{data}.{self._signature(data)}"
 
     def _unsign_data(self, signed_data: str) -> str | None:
         """Verify and unsign data."""
@@ -73,11 +95,12 @@ class CookieSessionStore(SessionStore):
             logger.warning("Invalid cookie format: no signature")
             return None
 
-        expected_signature = hmac.new(
-            self.secret_key, data.encode(), digestmod="sha256"
-        ).hexdigest()
+        # A wrong-length signature can never match; reject it before the HMAC
+        if len(signature) != _SIGNATURE_LENGTH:
+            logger.warning("Invalid cookie signature")
+            return None
 
-        if not hmac.compare_digest(signature, expected_signature):
+        if not hmac.compare_digest(signature, self._signature(data)):
             logger.warning("Invalid cookie signature")
             return None
 
@@ -85,10 +108,14 @@ class CookieSessionStore(SessionStore):
 
     def _encode_session(self, session: Session) -> str | None:
         """Encode session to signed cookie value."""
+        # Unchanged since this store last encoded it: reuse the signed value
+        if session._encoded is not None and session._encoded[0] is self:
+            return session._encoded[1]
+
         try:
             # Convert to dict and serialize
             session_dict = session.to_dict()
-            json_bytes = msgspec.json.encode(session_dict)
+            json_bytes = _json_dumps(session_dict, separators=(",", ":")).encode()
 
             # Base64 encode
             b64_data = base64.b64encode(json_bytes).decode()
@@ -103,6 +130,7 @@ class CookieSessionStore(SessionStore):
                 )
                 return None
 
+            session._encoded = (self, signed_data)
             return signed_data
 
         except Exception as e:
@@ -120,13 +148,19 @@ class CookieSessionStore(SessionStore):
                 return None
 
             # Base64 decode
-            json_data = base64.b64decode(b64_data).decode()
+            json_bytes = base64.b64decode(b64_data)
 
-            # Parse JSON
-            session_dict = msgspec.json.decode(json_data)
+            # Parse the envelope, leaving each session value undecoded
+            payload = _payload_decoder.decode(json_bytes)
 
             # Create session object
-            return Session.from_dict(session_dict)
+            return Session(
+                session_id=payload.session_id,
+                created_at=payload.created_at,
+                expires_at=payload.expires_at,
+                is_new=False,  # Loaded sessions are not new
+                raw_data=payload.data,
+            )
 
         except Exception as e:
             logger.error(f"Error decoding session cookie: {e}")
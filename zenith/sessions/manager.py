@@ -10,6 +10,8 @@ import secrets
 from datetime import UTC, datetime, timedelta
 from typing import Any
 
+import msgspec
+
 from zenith.sessions.store import SessionStore
 
 
@@ -28,6 +30,7 @@ class Session:
         created_at: datetime | None = None,
         expires_at: datetime | None = None,
         is_new: bool = True,
+        raw_data: dict[str, msgspec.Raw] | None = None,
     ):
         """
         Initialize session.
@@ -38,33 +41,91 @@ class Session:
             created_at: Session creation timestamp
             expires_at: Session expiration timestamp
             is_new: Whether this is a newly created session
+            raw_data: JSON-encoded values, each decoded on first access
         """
         self.session_id = session_id
         self._data = data or {}
+        # Values not yet decoded; keys never overlap with _data
+        self._raw = raw_data or {}
+        # Raw form of decoded containers, to catch in-place edits like list.append
+        self._watched: dict[str, msgspec.Raw] = {}
         self.created_at = created_at or datetime.now(UTC)
         self.expires_at = expires_at
         self._dirty = False
         self._new = is_new
+        # (encoder, value) cached by a store's encoder; cleared on every change
+        self._encoded: tuple[object, str] | None = None
+
+    def _decode(self, key: str, raw: msgspec.Raw) -> None:
+        """Decode a raw value into the session data."""
+        value = self._data[key] = msgspec.json.decode(raw)
+        if isinstance(value, dict | list):
+            self._watched[key] = raw
+
+    def _load(self, key: str) -> None:
+        """Decode a raw value into the session data if it is still pending."""
+        if key in self._raw:
+            self._decode(key, self._raw.pop(key))
+
+    def _load_all(self) -> dict:
+        """Decode every pending raw value and return the session data."""
+        while self._raw:
+            self._decode(*self._raw.popitem())
+        return self._data
+
+    def _changed_in_place(self) -> bool:
+        """Check whether a decoded container was edited without set()."""
+        return any(
+            self._data.get(key) != msgspec.json.decode(raw)
+            for key, raw in self._watched.items()
+        )
+
+    def _finalize(self) -> None:
+        """
+        Fold edits made in place to decoded containers into the dirty flag.
+
+        Called once when the session is about to be saved, so is_dirty itself
+        stays a plain flag read.
+        """
+        if not self._watched:
+            return
+        if self._dirty or self._changed_in_place():
+            self._dirty = True
+            self._encoded = None
+            # The session is saved in full, so nothing is left to compare
+            self._watched.clear()
 
     def get(self, key: str, default: Any = None) -> Any:
         """Get session value."""
+        if self._raw:
+            self._load(key)
         return self._data.get(key, default)
 
     def set(self, key: str, value: Any) -> None:
         """Set session value."""
+        self._raw.pop(key, None)
         self._data[key] = value
         self._dirty = True
+        self._encoded = None
 
     def delete(self, key: str) -> None:
         """Delete session key."""
-        if key in self._data:
+        if key in self._raw:
+            del self._raw[key]
+            self._dirty = True
+            self._encoded = None
+        elif key in self._data:
             del self._data[key]
             self._dirty = True
+            self._encoded = None
 
     def clear(self) -> None:
         """Clear all session data."""
         self._data.clear()
+        self._raw.clear()
+        self._watched.clear()
         self._dirty = True
+        self._encoded = None
 
     def is_expired(self) -> bool:
         """Check if session is expired."""
@@ -76,6 +137,7 @@ class Session:
         """Refresh session expiration time."""
         self.expires_at = datetime.now(UTC) + max_age
         self._dirty = True
+        self._encoded = None
 
     @property
     def is_dirty(self) -> bool:
@@ -91,12 +153,13 @@ class Session:
         """Mark session as clean (saved)."""
         self._dirty = False
         self._new = False
+        self._watched.clear()
 
     def to_dict(self) -> dict:
         """Convert session to dictionary for storage."""
         return {
             "session_id": self.session_id,
-            "data": self._data,
+            "data": self._load_all(),
             "created_at": self.created_at.isoformat(),
             "expires_at": self.expires_at.isoformat() if self.expires_at else None,
         }
@@ -118,6 +181,8 @@ class Session:
 
     # Dict-like interface
     def __getitem__(self, key: str) -> Any:
+        if self._raw:
+            self._load(key)
         return self._data[key]
 
     def __setitem__(self, key: str, value: Any) -> None:
@@ -127,23 +192,23 @@ class Session:
         self.delete(key)
 
     def __contains__(self, key: str) -> bool:
-        return key in self._data
+        return key in self._data or key in self._raw
 
     def __len__(self) -> int:
-        return len(self._data)
+        return len(self._data) + len(self._raw)
 
     def __bool__(self) -> bool:
         """Sessions are always truthy, even when empty."""
         return True
 
     def keys(self):
-        return self._data.keys()
+        return self._load_all().keys()
 
     def values(self):
-        return self._data.values()
+        return self._load_all().values()
 
     def items(self):
-        return self._data.items()
+        return self._load_all().items()
 
 
 class SessionManager:
@@ -200,6 +265,8 @@ class SessionManager:
         self.same_site = same_site
         self.domain = domain
         self.path = path
+        # Set-Cookie header around the value, encoded once from the settings above
+        self._cookie_prefix, self._cookie_suffix = self._cookie_template()
 
     def generate_session_id(self) -> str:
         """Generate a secure session ID."""
@@ -235,7 +302,8 @@ class SessionManager:
         return session
 
     async def save_session(self, session: Session) -> None:
-        """Save session if dirty."""
+        """Save session if dirty, including edits made in place."""
+        session._finalize()
         if session.is_dirty:
             await self.store.save(session)
             session.mark_clean()
@@ -253,7 +321,7 @@ class SessionManager:
         old_session_id = session.session_id
 
         # Create new session with same data
-        new_session = await self.create_session(session._data.copy())
+        new_session = await self.create_session(dict(session.items()))
 
         # Delete old session
         await self.destroy_session(old_session_id)
@@ -264,6 +332,36 @@ class SessionManager:
         """Clean up expired sessions."""
         return await self.store.cleanup_expired()
 
+    def _cookie_template(self) -> tuple[bytes, bytes]:
+        """Encode the Set-Cookie header parts before and after the value."""
+        config = self.get_cookie_config()
+        attributes = []
+        if config.get("max_age"):
+            attributes.append(f"Max-Age={config['max_age']}")
+        if config.get("path"):
+            attributes.append(f"Path={config['path']}")
+        if config.get("domain"):
+            attributes.append(f"Domain={config['domain']}")
+        if config.get("secure"):
+            attributes.append("Secure")
+        if config.get("httponly"):
+            attributes.append("HttpOnly")
+        if config.get("samesite"):
+            attributes.append(f"SameSite={config['samesite']}")
+
+        prefix = f"{self.cookie_name}=".encode("latin-1")
+        suffix = "".join(f"; {attribute}" for attribute in attributes)
+        return prefix, suffix.encode("latin-1")
+
+    def cookie_header(self, value: str) -> bytes:
+        """
+        Build the Set-Cookie header value for a session cookie value.
+
+        Cookie attributes are encoded once at construction, so changes to
+        them made afterwards are not reflected here.
+        """
+        return self._cookie_prefix + value.encode("latin-1") + self._cookie_suffix
+
     def get_cookie_config(self) -> dict:
         """Get cookie configuration for middleware."""
         config = {
@@ -7,6 +7,7 @@ Provides persistent session storage using Redis with automatic expiration.
 from __future__ import annotations
 
 import logging
+from collections.abc import Iterable
 from datetime import UTC, datetime
 
 import redis.asyncio as redis
@@ -84,6 +85,24 @@ class RedisSessionStore(SessionStore):
             logger.error(f"Error loading session {session_id}: {e}")
             return None
 
+    def _get_ttl(self, session: Session) -> int | None:
+        """
+        Get the Redis TTL for a session.
+
+        Returns:
+            TTL in seconds, None for no expiry, or 0 if already expired
+        """
+        if not session.expires_at:
+            return None
+
+        # Use timezone-aware datetime for consistency
+        now = datetime.now(UTC) if session.expires_at.tzinfo else datetime.utcnow()
+        ttl_seconds = (session.expires_at - now).total_seconds()
+        if ttl_seconds <= 0:
+            return 0
+        # Never round a live session down to 0, which would mean "expired"
+        return max(1, int(ttl_seconds))
+
     async def save(self, session: Session) -> None:
         """Save session to Redis."""
         key = self._get_key(session.session_id)
@@ -94,21 +113,11 @@ class RedisSessionStore(SessionStore):
             data = _json_dumps(session_dict)
 
             # Calculate TTL in seconds
-            ttl = None
-            if session.expires_at:
-                # Use timezone-aware datetime for consistency
-                now = (
-                    datetime.now(UTC)
-                    if session.expires_at.tzinfo
-                    else datetime.utcnow()
-                )
-                ttl_seconds = (session.expires_at - now).total_seconds()
-                if ttl_seconds > 0:
-                    ttl = int(ttl_seconds)
-                else:
-                    # Session already expired
-                    await self.delete(session.session_id)
-                    return
+            ttl = self._get_ttl(session)
+            if ttl == 0:
+                # Session already expired
+                await self.delete(session.session_id)
+                return
 
             # Save to Redis with TTL
             if ttl:
@@ -122,6 +131,26 @@ class RedisSessionStore(SessionStore):
             logger.error(f"Error saving session {session.session_id}: {e}")
             raise
 
+    async def save_many(self, sessions: Iterable[Session]) -> None:
+        """Save several sessions in one pipelined round trip."""
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for session in sessions:
+                    key = self._get_key(session.session_id)
+                    ttl = self._get_ttl(session)
+                    if ttl == 0:
+                        # Session already expired
+                        pipe.delete(key)
+                    elif ttl:
+                        pipe.setex(key, ttl, _json_dumps(session.to_dict()))
+                    else:
+                        pipe.set(key, _json_dumps(session.to_dict()))
+                await pipe.execute()
+
+        except Exception as e:
+            logger.error(f"Error saving sessions: {e}")
+            raise
+
     async def delete(self, session_id: str) -> None:
         """Delete session from Redis."""
         key = self._get_key(session_id)
@@ -10,6 +10,8 @@ from abc import ABC, abstractmethod
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable
+
     from zenith.sessions.manager import Session
 
 
@@ -43,6 +45,19 @@ class SessionStore(ABC):
         """
         pass
 
+    async def save_many(self, sessions: Iterable[Session]) -> None:
+        """
+        Save several sessions.
+
+        Backends override this to batch the writes; the default saves each
+        session in turn.
+
+        Args:
+            sessions: Session objects to save
+        """
+        for session in sessions:
+            await self.save(session)
+
     @abstractmethod
     async def delete(self, session_id: str) -> None:
         """
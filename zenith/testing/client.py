@@ -108,6 +108,15 @@ class ZenithTestClient:
         """Clear authentication token."""
         self._auth_token = None
 
+    @property
+    def cookies(self) -> httpx.Cookies:
+        """Cookies persisted across requests, e.g. to clear between tests."""
+        if not self._client:
+            raise RuntimeError(
+                "TestClient not initialized. Use 'async with' context manager."
+            )
+        return self._client.cookies
+
     def _prepare_headers(self, headers: dict[str, str] | None = None) -> dict[str, str]:
         """Add auth headers if token is set."""
         prepared_headers = headers or {}
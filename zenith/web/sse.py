@@ -14,19 +14,47 @@ Built-in optimizations:
 """
 
 import asyncio
-import json
+import contextlib
 import logging
 import time
 import weakref
+from collections import deque
 from collections.abc import AsyncGenerator
 from dataclasses import dataclass, field
 from enum import Enum
+from functools import lru_cache
 from typing import Any
 
 from starlette.responses import StreamingResponse
 
+from zenith.core.json_encoder import _json_dumps
+
 logger = logging.getLogger("zenith.web.sse")
 
+# Events buffered per connection before the producer backs off
+_MAX_BUFFERED_EVENTS = 100
+
+# Compact separators keep each event's data line as small as possible
+_SSE_JSON_SEPARATORS = (",", ":")
+
+
+# Fixed SSE response headers, encoded once at import instead of per response
+_SSE_RAW_HEADERS: tuple[tuple[bytes, bytes], ...] = (
+    (b"content-type", b"text/event-stream"),
+    (b"cache-control", b"no-cache"),
+    (b"connection", b"keep-alive"),
+    (b"access-control-allow-origin", b"*"),
+    (b"access-control-allow-credentials", b"true"),
+    (b"x-accel-buffering", b"no"),  # Disable nginx buffering
+    (b"x-sse-backpressure", b"enabled"),  # Indicate backpressure support
+)
+
+
+@lru_cache(maxsize=256)
+def _event_line(event_type: str) -> bytes:
+    """Pre-encoded ``event:`` field line, shared by every event of a type."""
+    return f"event: {event_type}\n".encode()
+
 
 class SSEConnectionState(Enum):
     """Server-Sent Events connection states for lifecycle tracking."""
@@ -99,11 +127,17 @@ class ServerSentEvents:
         default_buffer_size: int = 32768,  # 32KB
         heartbeat_interval: int = 30,  # seconds
         enable_adaptive_throttling: bool = True,
+        flush_bytes: int = 16384,  # 16KB, 0 sends every event on its own
+        flush_interval: float = 0.005,  # seconds
+        max_event_bytes: int | None = 65536,  # 64KB of data per event, None for no cap
     ):
         self.max_concurrent_connections = max_concurrent_connections
         self.default_buffer_size = default_buffer_size
         self.heartbeat_interval = heartbeat_interval
         self.enable_adaptive_throttling = enable_adaptive_throttling
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self.max_event_bytes = max_event_bytes
 
         # Memory-efficient connection tracking with weak references
         self._connections: weakref.WeakValueDictionary[str, SSEConnection] = (
@@ -136,28 +170,28 @@ class ServerSentEvents:
         Returns:
             StreamingResponse configured for SSE with optimizations
         """
-        sse_headers = {
-            "Content-Type": "text/event-stream",
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Credentials": "true",
-            "X-Accel-Buffering": "no",  # Disable nginx buffering
-            "X-SSE-Backpressure": "enabled",  # Indicate backpressure support
-        }
+        response = StreamingResponse(
+            self._coalesce_frames(
+                self._stream_events_with_backpressure(event_generator)
+            )
+        )
 
+        # Start from the pre-encoded SSE headers; caller headers override them
+        raw_headers = list(_SSE_RAW_HEADERS)
         if headers:
-            sse_headers.update(headers)
+            extra = [
+                (key.lower().encode("latin-1"), value.encode("latin-1"))
+                for key, value in headers.items()
+            ]
+            overridden = {key for key, _ in extra}
+            raw_headers = [h for h in raw_headers if h[0] not in overridden] + extra
 
-        return StreamingResponse(
-            self._stream_events_with_backpressure(event_generator),
-            media_type="text/event-stream",
-            headers=sse_headers,
-        )
+        response.raw_headers = raw_headers
+        return response
 
     async def _stream_events_with_backpressure(
         self, event_generator: AsyncGenerator[dict[str, Any]]
-    ) -> AsyncGenerator[str]:
+    ) -> AsyncGenerator[bytes]:
         """Stream events with intelligent backpressure handling."""
         # Create connection for tracking
         connection_id = self._generate_connection_id()
@@ -178,8 +212,11 @@ class ServerSentEvents:
             heartbeat_counter = 0
 
             async for event in event_generator:
+                # One clock read per event, shared by the checks and stats below
+                now = time.time()
+
                 # Check backpressure before sending
-                if await self._should_throttle_connection(connection):
+                if await self._should_throttle_connection(connection, now):
                     connection.state = SSEConnectionState.THROTTLED
                     await asyncio.sleep(0.1)  # Brief throttle delay
                     continue
@@ -192,15 +229,15 @@ class ServerSentEvents:
                 # Update connection statistics
                 connection.events_sent += 1
                 connection.bytes_sent += len(formatted_event)
-                connection.last_send_time = time.time()
-                connection.last_activity = time.time()
+                connection.last_send_time = now
+                connection.last_activity = now
 
                 # Update client buffer estimate (simplified model)
                 event_size = len(formatted_event)
                 connection.client_buffer_estimate += event_size
 
                 # Simulate client buffer consumption
-                self._update_client_buffer_estimate(connection)
+                self._update_client_buffer_estimate(connection, now)
 
                 # Update global stats
                 self._stats["events_sent"] += 1
@@ -215,7 +252,7 @@ class ServerSentEvents:
                         {
                             "type": "heartbeat",
                             "data": {
-                                "timestamp": time.time(),
+                                "timestamp": now,
                                 "connection_id": connection.connection_id,
                                 "events_sent": connection.events_sent,
                             },
@@ -231,38 +268,127 @@ class ServerSentEvents:
             # Automatic cleanup
             await self._cleanup_connection(connection)
 
+    async def _coalesce_frames(
+        self, frames: AsyncGenerator[bytes]
+    ) -> AsyncGenerator[bytes]:
+        """
+        Join frames that arrive close together into chunks of up to flush_bytes.
+
+        A buffered chunk is sent once it reaches flush_bytes or once
+        flush_interval has passed since its first frame was buffered, so bursts
+        share a single ASGI body message and no event waits longer than
+        flush_interval. Frames are pulled by one pump task for the whole stream.
+        """
+        if self.flush_bytes <= 0:
+            async for frame in frames:
+                yield frame
+            return
+
+        loop = asyncio.get_running_loop()
+        buffered: list[bytes] = []
+        buffered_size = 0
+        deadline = 0.0
+        finished = False
+        # The pump wakes the consumer only for the first frame of a chunk, a
+        # full chunk and the end of the stream, not for every frame
+        ready = asyncio.Event()
+        drained = asyncio.Event()
+
+        async def pump():
+            nonlocal buffered_size, deadline, finished
+            try:
+                async for frame in frames:
+                    # Read ahead by at most one chunk while the client catches up
+                    while buffered_size >= self.flush_bytes:
+                        drained.clear()
+                        await drained.wait()
+                    if not buffered:
+                        deadline = loop.time() + self.flush_interval
+                        ready.set()
+                    buffered.append(frame)
+                    buffered_size += len(frame)
+                    if buffered_size >= self.flush_bytes:
+                        ready.set()
+            finally:
+                finished = True
+                ready.set()
+                await frames.aclose()
+
+        pump_task = asyncio.create_task(pump())
+        try:
+            while True:
+                if buffered and (
+                    finished
+                    or buffered_size >= self.flush_bytes
+                    or loop.time() >= deadline
+                ):
+                    # Frames are joined once per flush; a lone frame is uncopied
+                    chunk = buffered[0] if len(buffered) == 1 else b"".join(buffered)
+                    buffered.clear()
+                    buffered_size = 0
+                    drained.set()
+                    yield chunk
+                    continue
+                if finished:
+                    break
+
+                ready.clear()
+                if buffered:
+                    with contextlib.suppress(TimeoutError):
+                        await asyncio.wait_for(
+                            ready.wait(), timeout=deadline - loop.time()
+                        )
+                else:
+                    await ready.wait()
+
+            # Surface an error raised by the frame source
+            await pump_task
+        finally:
+            if not pump_task.done():
+                # Cancelling the pump runs the frame source's cleanup
+                pump_task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await pump_task
+
     async def _process_events_concurrent(
         self,
         connection: SSEConnection,
         event_generator: AsyncGenerator[dict[str, Any]],
     ) -> AsyncGenerator[dict[str, Any]]:
         """Process events with concurrent handling and flow control."""
-        event_queue: asyncio.Queue = asyncio.Queue(maxsize=100)
+        # A deque plus one wake-up event avoids asyncio.Queue's per-item futures
+        buffered: deque[dict[str, Any]] = deque()
+        ready = asyncio.Event()
+        finished = False
 
         async def event_producer():
-            """Producer task: generate events and queue them."""
+            """Producer task: generate events and buffer them."""
+            nonlocal finished
             try:
                 async for event in event_generator:
-                    # Check backpressure before queuing
-                    while event_queue.full():
+                    # Check backpressure before buffering
+                    while len(buffered) >= _MAX_BUFFERED_EVENTS:
                         if await self._should_throttle_connection(connection):
                             await asyncio.sleep(0.1)  # Brief throttle delay
                         else:
                             break
 
-                    try:
-                        event_queue.put_nowait(event)
-                        connection.events_queued += 1
-                    except asyncio.QueueFull:
+                    if len(buffered) >= _MAX_BUFFERED_EVENTS:
                         logger.warning(
                             f"Event queue full for connection {connection.connection_id}"
                         )
+                        continue
+
+                    buffered.append(event)
+                    connection.events_queued += 1
+                    ready.set()
 
             except Exception as e:
                 logger.error(f"Event producer error: {e}")
             finally:
                 # Signal end of events
-                await event_queue.put(None)
+                finished = True
+                ready.set()
 
         # Start producer task
         producer_task = asyncio.create_task(event_producer())
@@ -273,31 +399,34 @@ class ServerSentEvents:
                 SSEConnectionState.CONNECTED,
                 SSEConnectionState.THROTTLED,
             ):
-                try:
-                    event = await asyncio.wait_for(event_queue.get(), timeout=1.0)
-
-                    if event is None:  # End of stream
+                if not buffered:
+                    if finished:  # End of stream
                         break
-
-                    connection.events_queued = max(0, connection.events_queued - 1)
-                    yield event
-
-                except TimeoutError:
-                    # Allow state checks during quiet periods
+                    ready.clear()
+                    # Time out to allow state checks during quiet periods
+                    with contextlib.suppress(TimeoutError):
+                        await asyncio.wait_for(ready.wait(), timeout=1.0)
                     continue
 
+                event = buffered.popleft()
+                connection.events_queued = max(0, connection.events_queued - 1)
+                yield event
+
         finally:
             producer_task.cancel()
 
     async def _generate_sse_stream(
         self, connection: SSEConnection, stream_task: asyncio.Task
-    ) -> AsyncGenerator[str]:
+    ) -> AsyncGenerator[bytes]:
         """Generate formatted SSE messages with performance tracking."""
         heartbeat_counter = 0
 
         async for event in stream_task.result():
+            # One clock read per event, shared by the checks and stats below
+            now = time.time()
+
             # Check backpressure before sending
-            if await self._should_throttle_connection(connection):
+            if await self._should_throttle_connection(connection, now):
                 connection.state = SSEConnectionState.THROTTLED
                 await asyncio.sleep(0.1)  # Brief throttle delay
                 continue
@@ -310,15 +439,15 @@ class ServerSentEvents:
             # Update connection statistics
             connection.events_sent += 1
             connection.bytes_sent += len(formatted_event)
-            connection.last_send_time = time.time()
-            connection.last_activity = time.time()
+            connection.last_send_time = now
+            connection.last_activity = now
 
             # Update client buffer estimate (simplified model)
             event_size = len(formatted_event)
             connection.client_buffer_estimate += event_size
 
             # Simulate client buffer consumption
-            self._update_client_buffer_estimate(connection)
+            self._update_client_buffer_estimate(connection, now)
 
             # Update global stats
             self._stats["events_sent"] += 1
@@ -333,7 +462,7 @@ class ServerSentEvents:
                     {
                         "type": "heartbeat",
                         "data": {
-                            "timestamp": time.time(),
+                            "timestamp": now,
                             "connection_id": connection.connection_id,
                             "events_sent": connection.events_sent,
                         },
@@ -341,12 +470,14 @@ class ServerSentEvents:
                 )
                 yield heartbeat
 
-    async def _should_throttle_connection(self, connection: SSEConnection) -> bool:
+    async def _should_throttle_connection(
+        self, connection: SSEConnection, now: float | None = None
+    ) -> bool:
         """Determine if connection should be throttled due to backpressure."""
         if not connection.adaptive_throttling:
             return False
 
-        current_time = time.time()
+        current_time = time.time() if now is None else now
 
         # Check send rate limit - but only if we've actually sent events before
         if connection.events_sent > 0:
@@ -391,9 +522,11 @@ class ServerSentEvents:
                         10.0, connection.send_rate_limit * 1.1
                     )
 
-    def _update_client_buffer_estimate(self, connection: SSEConnection) -> None:
+    def _update_client_buffer_estimate(
+        self, connection: SSEConnection, now: float | None = None
+    ) -> None:
         """Update client buffer estimate based on consumption model."""
-        current_time = time.time()
+        current_time = time.time() if now is None else now
 
         # Initialize last update time if not set
         if not hasattr(connection, "_last_buffer_update"):
@@ -411,32 +544,49 @@ class ServerSentEvents:
         )
         connection._last_buffer_update = current_time
 
-    def _format_sse_message(self, event: dict[str, Any]) -> str:
-        """Format event as Server-Sent Events message."""
-        lines = []
-
-        # Add event ID if present
-        if "id" in event:
-            lines.append(f"id: {event['id']}")
+    def _format_sse_message(self, event: dict[str, Any]) -> bytes:
+        """Format event as an encoded Server-Sent Events message."""
+        # Add data, serialized straight to bytes; ends with a blank line
+        data = event.get("data", {})
+        is_json = isinstance(data, dict)
+        payload = (
+            _json_dumps(data, separators=_SSE_JSON_SEPARATORS).encode()
+            if is_json
+            else str(data).encode()
+        )
 
-        # Add event type if present
-        if "type" in event:
-            lines.append(f"event: {event['type']}")
+        # Send a small marker instead of data over the per-event cap
+        if self.max_event_bytes and len(payload) > self.max_event_bytes:
+            logger.warning(
+                f"SSE event data of {len(payload)} bytes exceeds "
+                f"max_event_bytes={self.max_event_bytes}; sending a marker instead"
+            )
+            payload = _json_dumps(
+                {"truncated": True, "size": len(payload)},
+                separators=_SSE_JSON_SEPARATORS,
+            ).encode()
+            is_json = True
+
+        if is_json:
+            # Serialized JSON never contains a raw newline, so no split is needed
+            message = b"data: " + payload + b"\n\n"
+        else:
+            # Multi-line data becomes one data field per line
+            message = b"data: " + payload.replace(b"\n", b"\ndata: ") + b"\n\n"
 
         # Add retry if present
         if "retry" in event:
-            lines.append(f"retry: {event['retry']}")
+            message = f"retry: {event['retry']}\n".encode() + message
 
-        # Add data (can be multiple lines)
-        data = event.get("data", {})
-        data_str = json.dumps(data) if isinstance(data, dict) else str(data)
+        # Add event type if present
+        if "type" in event:
+            message = _event_line(event["type"]) + message
 
-        # Handle multi-line data
-        for line in data_str.split("\n"):
-            lines.append(f"data: {line}")
+        # Add event ID if present
+        if "id" in event:
+            message = f"id: {event['id']}\n".encode() + message
 
-        # End with double newline
-        return "\n".join(lines) + "\n\n"
+        return message
 
     async def _cleanup_connection(self, connection: SSEConnection) -> None:
         """Clean up SSE connection resources."""